@@ -2,11 +2,13 @@
 Product Analyzer Agent v2 - Extracts product information and retrieves current configuration with extension support
 """
 
+from typing import Optional
 from crewai import Agent, LLM
 from crewai_tools import FileReadTool
-from tools.get_product_config_tool import get_product_configuration
+from llm.factory import DETERMINISTIC_SETTINGS, create_llm
+from tools.get_product_config_tool import get_product_configuration, get_product_configuration_compact
 
-def create_product_analyzer_agent():
+def create_product_analyzer_agent(llm: Optional[LLM] = None, compact: bool = False):
     """
     Creates the Product Analyzer Agent v2
     
@@ -15,28 +17,31 @@ def create_product_analyzer_agent():
     
     v2 Enhancement: Enhanced parsing for extension codes and improved
     configuration handling for code1, code2, code3 updates.
+
+    Args:
+        llm: LLM to use (defaults to a deterministic gpt-4o-mini client,
+            cached when LLM_CACHE_PATH is set)
+        compact: Token-budgeted mode: no file read tool (candidate products
+            are injected into the task) and minified configuration results
     """
     
-    # Initialize LLM with deterministic settings
-    llm = LLM(model="gpt-4o-mini", temperature=0.1)
+    # Initialize LLM with deterministic settings unless one is provided
+    if llm is None:
+        llm = create_llm(**DETERMINISTIC_SETTINGS)
     
-    # Initialize file reading tool
-    file_read_tool = FileReadTool(file_path="./products.txt")
+    if compact:
+        tools = [get_product_configuration_compact]
+    else:
+        # Initialize file reading tool
+        file_read_tool = FileReadTool(file_path="./products.txt")
+        tools = [file_read_tool, get_product_configuration]
     
     return Agent(
         role="Product Analyzer",
         goal="Extract product name from user input and retrieve current product configuration including extension codes",
         backstory="You are a product analysis expert who extracts product names from user requests and retrieves their current configuration data, including extension codes like code1, code2, and code3.",
-        tools=[
-            file_read_tool,
-            get_product_configuration,
-        ],
-        llm_config={
-            "temperature": 0.0,
-            "seed": 42,
-            "top_p": 0.1,
-            "max_tokens": 1500,
-        },
+        tools=tools,
+        llm=llm,
         max_iter=3,
         verbose=True,
     )
\ No newline at end of file
@@ -2,10 +2,12 @@
 Product Configuration Updater Agent v2 - Updates product configurations with extension support
 """
 
+from typing import Optional
 from crewai import Agent, LLM
-from tools.config_updater_tool import update_product_config
+from llm.factory import DETERMINISTIC_SETTINGS, create_llm
+from tools.config_updater_tool import bulk_update_product_config, update_product_config
 
-def create_product_updater_agent():
+def create_product_updater_agent(llm: Optional[LLM] = None, compact: bool = False):
     """
     Creates the Product Configuration Updater Agent v2
     
@@ -14,22 +16,24 @@ def create_product_updater_agent():
     
     v2 Enhancement: Enhanced to handle extension code updates
     (code1, code2, code3) along with traditional section/subsection/coverage updates.
+
+    Args:
+        llm: LLM to use (defaults to a deterministic gpt-4o-mini client,
+            cached when LLM_CACHE_PATH is set)
+        compact: Token-budgeted mode: single-product tool only (the bulk
+            tool's schema is left out of the prompt)
     """
     
-    # Initialize LLM with deterministic settings
-    llm = LLM(model="gpt-4o-mini", temperature=0.1)
+    # Initialize LLM with deterministic settings unless one is provided
+    if llm is None:
+        llm = create_llm(**DETERMINISTIC_SETTINGS)
     
     return Agent(
         role="Product Configuration Updater",
         goal="Parse user update requirements and execute product configuration updates including extension codes",
         backstory="You are a product configuration specialist who understands user update requests for sections, subsections, coverage, and extension codes (code1, code2, code3), and applies configuration changes using the appropriate tools.",
-        tools=[update_product_config],
-        llm_config={
-            "temperature": 0.0,
-            "seed": 42,
-            "top_p": 0.1,
-            "max_tokens": 1500,
-        },
+        tools=[update_product_config] if compact else [update_product_config, bulk_update_product_config],
+        llm=llm,
         max_iter=3,
         verbose=True,
     )
\ No newline at end of file
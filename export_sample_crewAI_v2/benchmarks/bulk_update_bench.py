@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Bulk Update Benchmark - Sequential per-product POSTs versus windowed and bulk-endpoint updates
+
+Runs against the in-process StubServer with a per-request latency, using
+synthetic products (added to the stub's store) so every update targets a
+different product:
+  sequential   - update_product() once per product, one after another
+  window=<n>   - bulk_update_products(bulk_endpoint=False) with n POSTs in flight
+  async w=<n>  - abulk_update_products(bulk_endpoint=False) on one event loop
+  bulk         - bulk_update_products() through POST /api/products/bulk
+
+Usage: python benchmarks/bulk_update_bench.py [updates] [latency_ms]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_product_api import StubServer
+from tools import http_client
+from tools.product_api import abulk_update_products, bulk_update_products, update_product
+
+
+def synthetic_products(count):
+    return [
+        {
+            "name": f"BNX Bench Product {i:03d}",
+            "section": "ABC",
+            "subsection": "BEN",
+            "coverage": "CHMK",
+            "extension": {"code1": "X001", "code2": "XX01", "code3": "XXX1"},
+        }
+        for i in range(count)
+    ]
+
+
+async def warm_async_client():
+    http_client.get_async_client()
+
+
+def measure(label, server, run, count):
+    server.api.reset()
+    server.api.products.extend(synthetic_products(count))
+    started = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - started
+    applied = server.api.counts["update"]
+    requests_sent = server.api.counts["update"] + server.api.counts["rejected"] + server.api.counts["not_found"]
+    http_requests = server.api.counts["bulk"] or requests_sent
+    print(
+        f"{label:>12}: {elapsed * 1000:8.1f} ms  {count / elapsed:8.1f} updates/s  "
+        f"{applied}/{count} applied  {http_requests} HTTP requests"
+    )
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    updates = [(f"BNX Bench Product {i:03d}", "XYZ", None, "SVT", {"code1": "X002"}) for i in range(count)]
+
+    with StubServer(latency_ms=latency_ms) as server:
+        http_client.configure(base_url=server.base_url)
+        print(f"{count} updates, {latency_ms:g} ms per request\n")
+
+        sequential = measure("sequential", server, lambda: [update_product(*update) for update in updates], count)
+        for window in (4, 8, 16):
+            measure(f"window={window}", server, lambda: bulk_update_products(updates, window, bulk_endpoint=False), count)
+
+        # Creating the loop's httpx client (and its SSL context) is a one-time cost, kept out of the timing
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(warm_async_client())
+        measure(
+            "async w=8",
+            server,
+            lambda: loop.run_until_complete(abulk_update_products(updates, 8, bulk_endpoint=False)),
+            count,
+        )
+        loop.run_until_complete(http_client.aclose())
+        loop.close()
+        bulk = measure("bulk", server, lambda: bulk_update_products(updates, bulk_endpoint=True), count)
+
+    print(f"\nBulk endpoint speedup over sequential: {sequential / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+"""
+Coalescing Benchmark - Concurrent reads and writes of the same products with and without coalescing
+
+Against the in-process StubServer, every caller reads a product's
+configuration and then updates one of its fields, all starting together,
+the way concurrent prompts hit the same few products. The callers are
+spread over the stub's products with a different field each, so the end
+state does not depend on arrival order. Run as threads (search_product_config
++ update_product) and as coroutines on one event loop (the async versions),
+with coalescing off and on (tools/coalescing.py):
+  reads    - identical /api/search (and schema) calls in flight share one request
+  updates  - updates to a product queued behind its in-flight POST are merged
+             into the next POST, and every caller still gets its own result
+It also checks that cancelling the caller leading a queued async batch does
+not strand the updates that join that product afterwards.
+
+Usage:
+  python benchmarks/coalescing_bench.py [--callers-per-product 6] [--rounds 5]
+                                        [--api-latency-ms 20] [--window-ms 0]
+                                        [--output benchmarks/results/coalescing.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import percentile
+from benchmarks.stub_product_api import CONFIG, StubServer
+from tools import http_client
+from tools.allowed_values import allowed_values_cache
+from tools.coalescing import UpdateCoalescer, coalescing_stats, read_flight, reset_coalescing_stats, update_coalescer
+from tools.config_cache import product_config_cache
+from tools.product_api import aupdate_product, asearch_product_config, search_product_config, update_product
+
+# One field per caller of a product, so concurrent callers never overwrite each other
+FIELDS = ("section", "subsection", "coverage", "code1", "code2", "code3")
+
+
+def caller_updates(callers_per_product: int, round_index: int) -> List[Tuple[str, Dict[str, Any]]]:
+    updates = []
+    for product, options in CONFIG.items():
+        for field in FIELDS[:callers_per_product]:
+            key = {"section": "sections", "coverage": "coverages"}.get(field, field)
+            choices = options["extensions"][field] if field.startswith("code") else options[key]
+            # Never the initial value (index 0), so every caller's update has to be sent
+            value = choices[1 + round_index % (len(choices) - 1)]
+            kwargs = {"extension": {field: value}} if field.startswith("code") else {field: value}
+            updates.append((product, kwargs))
+    return updates
+
+
+def configure(enabled: bool, window_ms: float) -> None:
+    read_flight.enabled = enabled
+    update_coalescer.enabled = enabled
+    update_coalescer.window_ms = window_ms
+
+
+def run_threads(updates: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, float]]:
+    barrier = threading.Barrier(len(updates))
+
+    def caller(update):
+        product, kwargs = update
+        barrier.wait()
+        started = time.perf_counter()
+        search_product_config(product)
+        result = update_product(product, **kwargs)
+        return result, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=len(updates)) as pool:
+        return list(pool.map(caller, updates))
+
+
+def run_async(loop: asyncio.AbstractEventLoop, updates: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, float]]:
+    async def caller(product, kwargs):
+        started = time.perf_counter()
+        await asearch_product_config(product)
+        result = await aupdate_product(product, **kwargs)
+        return result, time.perf_counter() - started
+
+    async def run_all():
+        return await asyncio.gather(*(caller(product, kwargs) for product, kwargs in updates))
+
+    return loop.run_until_complete(run_all())
+
+
+def cancelled_leader_check(loop: asyncio.AbstractEventLoop, timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Update A is in flight; B leads the next batch (C joins it) and is
+    cancelled while queued behind A; D arrives afterwards. C and D must
+    still be sent once A finishes, instead of waiting on B's batch forever.
+    """
+
+    coalescer = UpdateCoalescer(window_ms=0, enabled=True)
+    release = asyncio.Event()
+    sent: List[List[str]] = []
+
+    async def send(payload):
+        sent.append(sorted(payload))
+        if payload.get("a"):
+            await release.wait()
+        return "ok"
+
+    async def scenario():
+        a = asyncio.create_task(coalescer.asubmit("product", {"a": 1}, send))
+        await asyncio.sleep(0)
+        b = asyncio.create_task(coalescer.asubmit("product", {"b": 1}, send))
+        await asyncio.sleep(0)
+        c = asyncio.create_task(coalescer.asubmit("product", {"c": 1}, send))
+        await asyncio.sleep(0)
+        b.cancel()
+        await asyncio.sleep(0)
+        d = asyncio.create_task(coalescer.asubmit("product", {"d": 1}, send))
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(a, c, d), timeout)
+        return results, b.cancelled()
+
+    try:
+        results, cancelled = loop.run_until_complete(scenario())
+        ok = results == ["ok", "ok", "ok"] and cancelled and ["b"] not in sent
+    except asyncio.TimeoutError:
+        ok = False
+    return {"ok": ok, "requests": sent}
+
+
+def measure(label: str, args, server: StubServer, enabled: bool, run) -> Dict[str, Any]:
+    configure(enabled, args.window_ms)
+    reset_coalescing_stats()
+    server.api.reset()
+    searches = posts = 0
+    latencies, results = [], []
+    final_products = None
+    started = time.perf_counter()
+    for round_index in range(args.rounds):
+        # Each round starts cold, like a burst of prompts for products nobody has read yet
+        server.api.reset()
+        product_config_cache.clear()
+        updates = caller_updates(args.callers_per_product, round_index)
+        round_results = run(updates)
+        searches += server.api.counts["search"]
+        posts += server.api.counts["update"]
+        latencies.extend(latency for _, latency in round_results)
+        results.extend(result for result, _ in round_results)
+        final_products = json.loads(json.dumps(server.api.products))
+    elapsed = time.perf_counter() - started
+
+    callers = len(results)
+    return {
+        "mode": label,
+        "coalescing": enabled,
+        "callers": callers,
+        "search_requests": searches,
+        "update_posts": posts,
+        "callers_succeeded": sum(result.startswith("Successfully updated") for result in results),
+        "caller_ms_p50": percentile(sorted(latencies), 0.5) * 1000,
+        "caller_ms_p95": percentile(sorted(latencies), 0.95) * 1000,
+        "elapsed_s": elapsed,
+        "coalescing_stats": coalescing_stats(),
+        "final_products": final_products,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers-per-product", type=int, default=6, choices=range(1, len(FIELDS) + 1))
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--api-latency-ms", type=float, default=20.0, help="Stub product API delay per request")
+    parser.add_argument("--window-ms", type=float, default=0.0, help="Update batching window")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "coalescing.json"))
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    # The product catalog (canonical names) is read from products.txt in the working directory
+    workdir = tempfile.mkdtemp(prefix="coalescing-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    loop = asyncio.new_event_loop()
+    with StubServer(latency_ms=args.api_latency_ms) as server:
+        http_client.configure(base_url=server.base_url)
+        # Allowed-values schemas are fetched once per product either way; keep them out of the counts
+        for product in CONFIG:
+            allowed_values_cache.schema(product)
+
+        results = []
+        for label, run in (("threads", run_threads), ("async", lambda updates: run_async(loop, updates))):
+            results.append(measure(f"{label}, off", args, server, False, run))
+            results.append(measure(f"{label}, on", args, server, True, run))
+    cancelled_leader = cancelled_leader_check(loop)
+    loop.close()
+    configure(True, args.window_ms)
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    callers = results[0]["callers"]
+    print(
+        f"{callers // args.rounds} concurrent callers ({len(CONFIG)} products x {args.callers_per_product}), "
+        f"{args.rounds} rounds, API {args.api_latency_ms:g} ms/request, window {args.window_ms:g} ms\n"
+    )
+    print(f"  {'mode':<14}{'searches':>10}{'POSTs':>8}{'succeeded':>11}{'p50 ms':>9}{'p95 ms':>9}  same end state")
+    for result in results:
+        result["same_products"] = result["final_products"] == results[0]["final_products"]
+        print(
+            f"  {result['mode']:<14}{result['search_requests']:>10}{result['update_posts']:>8}"
+            f"{result['callers_succeeded']:>6}/{result['callers']:<4}{result['caller_ms_p50']:>9.0f}"
+            f"{result['caller_ms_p95']:>9.0f}  {result['same_products']}"
+        )
+    for result in results:
+        if result["coalescing"]:
+            print(f"{result['mode']}: {json.dumps({k: v['requests_saved'] for k, v in result['coalescing_stats'].items()})} requests saved")
+
+    print(f"cancelled batch leader: {'OK' if cancelled_leader['ok'] else 'FAIL'}, requests sent {cancelled_leader['requests']}")
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": vars(args),
+            "results": [{k: v for k, v in result.items() if k != "final_products"} for result in results],
+            "cancelled_leader": cancelled_leader,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    ok = all(result["same_products"] and result["callers_succeeded"] == result["callers"] for result in results)
+    ok = ok and cancelled_leader["ok"]
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
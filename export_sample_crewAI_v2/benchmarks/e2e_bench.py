@@ -0,0 +1,317 @@
+#!/usr/bin/env python
+"""
+Offline End-to-End Benchmark - Full ProductConfigurationCrew runs without OpenAI or the Node mock server
+
+Runs the real crew, both agents and both tools against:
+  - ScriptedLLM (benchmarks/scripted_llm.py): canned ReAct tool calls and JSON answers
+  - StubServer (benchmarks/stub_product_api.py): in-process /api/search and /api/products/name/:name
+
+Crew memory is disabled (its default embedder calls OpenAI) and the fast
+path is off so every prompt goes through both tasks. The run happens in a
+temporary directory holding products.txt (from configs/sample_products.txt)
+so the analyzer's file read tool finds its product list. Stage timings come from
+the CrewAI event bus:
+  analysis_task / update_task - TaskStarted -> TaskCompleted
+  tool:<name>                 - ToolUsageStarted -> ToolUsageFinished
+  llm_call                    - LLMCallStarted -> LLMCallCompleted
+
+Usage:
+  python benchmarks/e2e_bench.py [--prompts 40] [--concurrency 1,4,8,16]
+                                 [--llm-latency-ms 50] [--api-latency-ms 2]
+                                 [--output benchmarks/results/e2e.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("CREWAI_TRACING_ENABLED", "false")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+# Skips CrewAI's interactive first-run trace prompt, which blocks each kickoff for 20s
+os.environ.setdefault("CREWAI_TESTING", "true")
+
+import crewai
+from crewai.events import (
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+    crewai_event_bus,
+)
+
+from benchmarks.scripted_llm import ScriptedLLM
+from benchmarks.stub_product_api import StubServer
+from configs.crew_configuration import ProductConfigurationCrew
+from tools import http_client
+from tools.config_cache import product_config_cache
+from tools.update_diff import update_diff_stats
+
+# Grammar-conforming prompts with values the stub API accepts
+PROMPTS = [
+    "Update the product TRE TreMoon Shop with section XYZ and subsection to MOO",
+    "Update the product EDU EduTech Solutions code1 to E002 and code2 to ED03",
+    "Update the product GAM GameZone Pro section to EFG and code1 to G004",
+    "Update the product MED MediCare Plus coverage to OKIJ",
+    "Update the product BIL Billon SASKC subsection to LON and code3 to BIL2",
+    "Update the product TRE TreMoon Shop code1 to T003",
+    "Update the product EDU EduTech Solutions section to CDE and coverage to CVER",
+    "Update the product GAM GameZone Pro subsection to PRO",
+]
+
+STAGE_BY_ROLE = {
+    "Product Analyzer": "analysis_task",
+    "Product Configuration Updater": "update_task",
+}
+
+
+class StageRecorder:
+    """
+    Collects per-stage durations from the CrewAI event bus.
+
+    Task spans are keyed by task object (every warm crew has its own task
+    copies); LLM spans by thread, since a kickoff runs on one thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._open: Dict[Any, float] = {}
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._open.clear()
+            self.samples.clear()
+            self.errors.clear()
+
+    def _start(self, key: Any) -> None:
+        with self._lock:
+            self._open[key] = time.perf_counter()
+
+    def _finish(self, key: Any, stage: str) -> None:
+        ended = time.perf_counter()
+        with self._lock:
+            started = self._open.pop(key, None)
+            if started is not None:
+                self.samples[stage].append(ended - started)
+
+    def _error(self, key: Any, stage: str) -> None:
+        with self._lock:
+            self._open.pop(key, None)
+            self.errors[stage] += 1
+
+    @staticmethod
+    def _task_stage(task: Any) -> str:
+        role = getattr(getattr(task, "agent", None), "role", "")
+        return STAGE_BY_ROLE.get(role, f"task:{role or 'unknown'}")
+
+    def register(self) -> None:
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            self._start(("task", id(source)))
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            self._finish(("task", id(source)), self._task_stage(source))
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            self._error(("task", id(source)), self._task_stage(source))
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            self._start(("tool", threading.get_ident()))
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            self._finish(("tool", threading.get_ident()), f"tool:{event.tool_name}")
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            self._error(("tool", threading.get_ident()), f"tool:{event.tool_name}")
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            self._start(("llm", threading.get_ident()))
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            self._finish(("llm", threading.get_ident()), "llm_call")
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            self._error(("llm", threading.get_ident()), "llm_call")
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            stages = {stage: summarize(samples) for stage, samples in sorted(self.samples.items())}
+            for stage, count in self.errors.items():
+                stages.setdefault(stage, summarize([]))["errors"] = count
+            return stages
+
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(int(p * len(ordered)), len(ordered) - 1)]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    to_ms = lambda value: None if value is None else value * 1000
+    return {
+        "count": len(ordered),
+        "errors": 0,
+        "mean_ms": to_ms(sum(ordered) / len(ordered)) if ordered else None,
+        "p50_ms": to_ms(percentile(ordered, 0.50)),
+        "p95_ms": to_ms(percentile(ordered, 0.95)),
+        "p99_ms": to_ms(percentile(ordered, 0.99)),
+        "max_ms": to_ms(ordered[-1]) if ordered else None,
+    }
+
+
+def run_level(crew, recorder, server, llm, prompts, concurrency):
+    server.api.reset()
+    product_config_cache.clear()
+    http_client.reset_pool_stats()
+    update_diff_stats.reset()
+    recorder.reset()
+    llm_calls_before = llm.calls
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        summary = crew.run_batch(prompts, concurrency=concurrency)
+
+    prompt_latency = summarize([record["latency_s"] for record in summary["results"]])
+    return {
+        "concurrency": concurrency,
+        "prompts": summary["total"],
+        "failed": summary["failed"],
+        "elapsed_s": summary["elapsed_s"],
+        "prompts_per_s": summary["throughput_per_s"],
+        "prompt_latency": prompt_latency,
+        "stages": recorder.report(),
+        "llm_calls": llm.calls - llm_calls_before,
+        "api_requests": dict(server.api.counts),
+        "http_pool": http_client.get_pool_stats(),
+        "update_diff": update_diff_stats.snapshot(),
+        "warm_crews": crew.runtime.stats(),
+    }
+
+
+def print_level(level):
+    print(
+        f"\nconcurrency {level['concurrency']}: {level['prompts']} prompts, {level['failed']} failed, "
+        f"{level['prompts_per_s']:.2f} prompts/s, prompt p50 {level['prompt_latency']['p50_ms']:.1f} ms "
+        f"p95 {level['prompt_latency']['p95_ms']:.1f} ms p99 {level['prompt_latency']['p99_ms']:.1f} ms"
+    )
+    print(f"  {'stage':<36} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for stage, stats in level["stages"].items():
+        if not stats["count"]:
+            print(f"  {stage:<36} {0:>6} {'-':>9} {'-':>9} {'-':>9}  errors {stats['errors']}")
+            continue
+        print(
+            f"  {stage:<36} {stats['count']:>6} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+            + (f"  errors {stats['errors']}" if stats["errors"] else "")
+        )
+    print(f"  api requests: {level['api_requests']}, llm calls: {level['llm_calls']}")
+    diff = level["update_diff"]
+    print(
+        f"  update diff: {diff['fields_sent']}/{diff['fields_requested']} fields sent, "
+        f"{diff['bytes_saved']} body bytes and {diff['requests_skipped']} requests saved"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=40, help="Prompts per concurrency level")
+    parser.add_argument("--concurrency", default="1,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Simulated model time per LLM call")
+    parser.add_argument("--api-latency-ms", type=float, default=2.0, help="Simulated product API time per request")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "e2e.json"))
+    parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="e2e-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    recorder = StageRecorder()
+    recorder.register()
+    llm = ScriptedLLM(latency_ms=args.llm_latency_ms)
+
+    with StubServer(latency_ms=args.api_latency_ms) as server:
+        http_client.configure(base_url=server.base_url)
+        crew = ProductConfigurationCrew(
+            "sk-offline",
+            fast_path=False,
+            llm=llm,
+            memory=False,
+            pool_size=max(levels),
+        )
+
+        # Pay one-time setup (template crew, product index) before measuring
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            crew.runtime.warm_up(max(levels))
+            crew.run(PROMPTS[0])
+
+        results = []
+        for concurrency in levels:
+            level = run_level(crew, recorder, server, llm, prompts, concurrency)
+            print_level(level)
+            results.append(level)
+
+    report = {
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "crewai": crewai.__version__,
+            "cpu_count": os.cpu_count(),
+        },
+        "settings": {
+            "prompts": args.prompts,
+            "concurrency": levels,
+            "llm_latency_ms": args.llm_latency_ms,
+            "api_latency_ms": args.api_latency_ms,
+            "memory": False,
+            "fast_path": False,
+        },
+        "levels": results,
+    }
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0 if all(level["failed"] == 0 for level in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Fake LLM Endpoint - Local OpenAI-compatible chat completions server that enforces rate limits with 429s
+
+Serves POST /v1/chat/completions with a fixed answer after latency_ms, and
+enforces requests-per-minute and tokens-per-minute limits the way providers
+describe them: budgets that replenish continuously but hold only window_s
+seconds' worth, so a burst is refused even when the minute's budget is not
+spent. A refused request gets 429 with an OpenAI-style error body and a
+retry-after-ms header (unless retry_after is off). Tokens are counted as the
+provider does at admission: prompt tokens plus max_tokens (or the answer's length).
+
+Point an LLM at it with model="openai/gpt-4o-mini", base_url=<server>/v1 and any api_key.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+from llm.tokens import count_message_tokens, count_tokens
+
+ANSWER = "Thought: I now know the final answer\nFinal Answer: ok"
+
+
+class FakeLLMAPI:
+    """Request and token budgets plus counters, shared by the handler threads"""
+
+    def __init__(
+        self,
+        rpm: float = 600.0,
+        tpm: float = 600000.0,
+        latency_ms: float = 100.0,
+        window_s: float = 1.0,
+        retry_after: bool = True,
+    ):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.latency_ms = latency_ms
+        self.window_s = window_s
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests = self._tokens = None  # budget levels, refilled from self._updated
+            self._updated = time.monotonic()
+            self.counts = {"requests": 0, "completed": 0, "rate_limited": 0}
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def admit(self, tokens: int) -> Tuple[bool, float]:
+        """Admits a request of `tokens` or returns (False, seconds until it would fit)"""
+
+        max_requests = self.rpm / 60 * self.window_s
+        max_tokens = self.tpm / 60 * self.window_s
+        with self._lock:
+            now = time.monotonic()
+            self.counts["requests"] += 1
+            elapsed, self._updated = now - self._updated, now
+            self._requests = min(max_requests, (max_requests if self._requests is None else self._requests) + elapsed * self.rpm / 60)
+            self._tokens = min(max_tokens, (max_tokens if self._tokens is None else self._tokens) + elapsed * self.tpm / 60)
+            needed = min(tokens, max_tokens)
+            if self._requests < 1 or self._tokens < needed:
+                self.counts["rate_limited"] += 1
+                wait_s = max((1 - self._requests) / (self.rpm / 60), (needed - self._tokens) / (self.tpm / 60))
+                return False, max(wait_s, 0.001)
+            self._requests -= 1
+            self._tokens -= tokens
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return True, 0.0
+
+    def finish(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.counts["completed"] += 1
+
+
+def request_tokens(body: Dict[str, Any]) -> Tuple[int, int]:
+    """(prompt tokens, tokens charged at admission) of a chat completions request"""
+
+    prompt = count_message_tokens(body.get("messages") or [])
+    completion = body.get("max_tokens") or body.get("max_completion_tokens") or count_tokens(ANSWER)
+    return prompt, prompt + completion
+
+
+def _make_handler(api: FakeLLMAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+                return
+
+            prompt_tokens, charged = request_tokens(body)
+            admitted, wait_s = api.admit(charged)
+            if not admitted:
+                headers = {"retry-after-ms": str(int(wait_s * 1000) + 1)} if api.retry_after else {}
+                self._send(429, {
+                    "error": {
+                        "message": f"Rate limit reached for {body.get('model')}: try again in {wait_s * 1000:.0f}ms.",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                }, headers)
+                return
+
+            try:
+                time.sleep(api.latency_ms / 1000)
+                completion_tokens = count_tokens(ANSWER)
+                self._send(200, {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": ANSWER}, "finish_reason": "stop"}],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                })
+            finally:
+                api.finish()
+
+    return Handler
+
+
+class _FakeHTTPServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class FakeLLMServer:
+    """
+    Runs a FakeLLMAPI on a background thread
+
+    Usage:
+        with FakeLLMServer(rpm=600, tpm=60000) as server:
+            llm = LLM(model="openai/gpt-4o-mini", base_url=server.base_url, api_key="sk-fake")
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **limits):
+        self.api = FakeLLMAPI(**limits)
+        self._server = _FakeHTTPServer((host, port), _make_handler(self.api))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
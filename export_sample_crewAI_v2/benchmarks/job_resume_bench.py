@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""
+Job Resume Benchmark - Re-running a killed batch from scratch versus resuming it from the job store
+
+Runs a batch of prompts offline (ScriptedLLM + StubServer, crew execution
+with the fast path off, one prompt at a time) in a worker process and
+kills it with SIGKILL partway through a prompt. Then the batch is finished
+two ways:
+  rerun   - a new process runs every prompt again (what `main.py batch` allows)
+  resume  - a new process calls run_jobs on the same JobStore (configs/job_store.py):
+            done jobs are skipped, a job whose analysis was checkpointed is
+            applied without the LLM, and updates already applied are not resent
+A run that is never killed gives the baseline. LLM calls are counted across
+both processes; update POSTs are counted by the stub server.
+
+A separate in-doubt check resumes a checkpointed job whose update was sent
+(and applied by the server) but never answered. The resume must re-read the
+product and send no second POST.
+
+Usage:
+  python benchmarks/job_resume_bench.py [--prompts 16] [--kill-after 8]
+                                        [--llm-latency-ms 100] [--api-latency-ms 2]
+                                        [--output benchmarks/results/job_resume.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_product_api import CONFIG, StubServer
+
+
+def batch_prompts(count: int) -> List[str]:
+    # Each product's coverage changes on every visit, so every prompt needs its own POST
+    names = list(CONFIG)
+    return [
+        f"Update the product {names[i % len(names)]} coverage to "
+        f"{CONFIG[names[i % len(names)]]['coverages'][(i // len(names) + 1) % 5]}"
+        for i in range(count)
+    ]
+
+
+def child(args) -> int:
+    from benchmarks.scripted_llm import ScriptedLLM
+    from configs.crew_configuration import ProductConfigurationCrew
+    from configs.job_store import JobStore
+    from tools import http_client
+
+    class CountingLLM(ScriptedLLM):
+        # Appends one line per call, so calls made before a SIGKILL are still counted
+        def call(self, *call_args, **kwargs):
+            with open(args.calls_file, "a") as calls:
+                calls.write("1\n")
+            return super().call(*call_args, **kwargs)
+
+    http_client.configure(base_url=args.base_url)
+    progress = sys.stdout
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        crew = ProductConfigurationCrew(
+            "sk-offline", fast_path=False, llm=CountingLLM(latency_ms=args.llm_latency_ms), memory=False
+        )
+
+        def report(record: Any) -> None:
+            progress.write("done\n")
+            progress.flush()
+
+        if args.child == "rerun":
+            for prompt in batch_prompts(args.prompts):
+                crew.run(prompt)
+                report(prompt)
+        else:
+            store = JobStore(args.store)
+            store.add(batch_prompts(args.prompts))
+            store.recover()
+            crew.run_jobs(store, concurrency=1, on_result=report)
+    return 0
+
+
+def run_child(mode: str, args, base_url: str, store: str, calls_file: str, kill_after: Optional[int] = None) -> int:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--child", mode, "--base-url", base_url, "--store", store,
+        "--calls-file", calls_file, "--prompts", str(args.prompts), "--llm-latency-ms", str(args.llm_latency_ms),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    finished = 0
+    for _ in process.stdout:
+        finished += 1
+        if kill_after is not None and finished == kill_after:
+            # Land inside the next prompt: after its analysis, around its update
+            time.sleep(args.llm_latency_ms * 2.5 / 1000)
+            process.kill()
+            break
+    process.wait()
+    return finished
+
+
+def count_calls(calls_file: str) -> int:
+    if not os.path.exists(calls_file):
+        return 0
+    with open(calls_file) as calls:
+        return sum(1 for _ in calls)
+
+
+def scenario(name: str, args, server: StubServer, workdir: str, kill: bool, finish: Optional[str]) -> Dict[str, Any]:
+    server.api.reset()
+    store = os.path.join(workdir, f"{name}.db")
+    calls_file = os.path.join(workdir, f"{name}.calls")
+    first = "jobs" if finish != "rerun" else "rerun"
+    finished_first = run_child(first, args, server.base_url, store, calls_file, args.kill_after if kill else None)
+    if finish is not None:
+        run_child(finish, args, server.base_url, store, calls_file)
+
+    result = {
+        "scenario": name,
+        "finished_before_kill": finished_first if kill else None,
+        "llm_calls": count_calls(calls_file),
+        "update_posts": server.api.counts["update"],
+        "final_products": json.loads(json.dumps(server.api.products)),
+    }
+    if first == "jobs":
+        from configs.job_store import JobStore
+
+        result["jobs"] = JobStore(store).stats()
+    return result
+
+
+def in_doubt_check(server: StubServer, workdir: str) -> Dict[str, Any]:
+    from urllib.parse import quote
+
+    from configs.job_store import JobStore, run_jobs
+    from tools import http_client
+    from tools.config_cache import product_config_cache
+    from tools.idempotency import update_key
+
+    server.api.reset()
+    product_config_cache.clear()
+    http_client.configure(base_url=server.base_url)
+    product = next(iter(CONFIG))
+    payload = {"coverage": CONFIG[product]["coverages"][1]}
+
+    # A worker checkpointed the job, recorded the update as sent and died before the answer arrived
+    store = JobStore(os.path.join(workdir, "in-doubt.db"), lease_s=0)
+    store.add([f"Update the product {product} coverage to {payload['coverage']}"])
+    job = store.claim("dead-worker:0")
+    store.checkpoint(job, product, payload, "fast_path")
+    store.record_update_sent(update_key(job.key, product, payload), product, payload)
+    http_client.post(f"/api/products/name/{quote(product)}", json=payload).raise_for_status()
+
+    # The checkpointed job is applied without the crew
+    stats = run_jobs(None, store, concurrency=1)
+    return {
+        "update_posts": server.api.counts["update"],
+        "jobs_done": stats["stages"].get("done", 0),
+        "ok": server.api.counts["update"] == 1 and stats["stages"].get("done", 0) == 1,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=16)
+    parser.add_argument("--kill-after", type=int, default=8, help="Prompts finished before the worker is killed")
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0, help="Scripted LLM delay per call")
+    parser.add_argument("--api-latency-ms", type=float, default=2.0, help="Stub product API delay per request")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "job_resume.json"))
+    parser.add_argument("--child", choices=("jobs", "rerun"), help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--store", help=argparse.SUPPRESS)
+    parser.add_argument("--calls-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="job-resume-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer(latency_ms=args.api_latency_ms) as server:
+        results = [
+            scenario("uninterrupted", args, server, workdir, kill=False, finish=None),
+            scenario("killed + rerun", args, server, workdir, kill=True, finish="rerun"),
+            scenario("killed + resume", args, server, workdir, kill=True, finish="jobs"),
+        ]
+        in_doubt = in_doubt_check(server, workdir)
+
+    baseline = results[0]
+    print(f"{args.prompts} prompts, worker killed after {args.kill_after}, LLM {args.llm_latency_ms:g} ms/call\n")
+    print(f"  {'scenario':<18}{'LLM calls':>11}{'update POSTs':>14}  same products")
+    for result in results:
+        result["same_products"] = result["final_products"] == baseline["final_products"]
+        print(f"  {result['scenario']:<18}{result['llm_calls']:>11}{result['update_posts']:>14}  {result['same_products']}")
+    resume = results[2]
+    print(f"\nResume: {json.dumps(resume['jobs']['stages'])}, {resume['jobs']['checkpoints']} checkpoints, {resume['jobs']['attempts']} attempts")
+    print(
+        f"In-doubt update resumed: {'OK' if in_doubt['ok'] else 'FAIL'}, "
+        f"{in_doubt['update_posts']} POST(s) in total, {in_doubt['jobs_done']} job done"
+    )
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("child", "base_url", "store", "calls_file")},
+            "scenarios": [{k: v for k, v in result.items() if k != "final_products"} for result in results],
+            "in_doubt_resume": in_doubt,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0 if all(result["same_products"] for result in results) and in_doubt["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
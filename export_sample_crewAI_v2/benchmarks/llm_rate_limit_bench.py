@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+LLM Rate Limit Benchmark - Parallel LLM callers against a rate-limited endpoint, with and without the shared limiter
+
+Many callers (threads, like parallel crews) make LLM calls through real
+crewai/litellm clients pointed at the local fake endpoint
+(benchmarks/fake_llm_endpoint.py), which enforces requests/min and
+tokens/min with 1s of burst and answers 429 beyond them:
+  no limiter  - crewai.LLM as before; the OpenAI SDK retries a 429 twice, then
+                the call fails (in a crew, the agent loses an iteration)
+  AIMD        - RateLimitedLLM with the process-wide limiter and no configured
+                budgets: concurrency backs off on 429s and ramps up on success
+  AIMD + RPM/TPM - the same limiter, also given the endpoint's budgets
+
+Reports calls that failed, 429s the endpoint sent, achieved throughput and
+the limiter's queueing delay.
+
+Usage:
+  python benchmarks/llm_rate_limit_bench.py [--callers 24] [--calls 3]
+                                            [--rpm 600] [--tpm 120000] [--latency-ms 200]
+                                            [--output benchmarks/results/llm_rate_limit.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import percentile
+from benchmarks.fake_llm_endpoint import FakeLLMServer
+
+# About 300 prompt tokens, the size of an agent turn's task context
+PROMPT = (
+    "You are Product Analyzer. Extract the product name from the user request and report the current "
+    "configuration, including section, subsection, coverage and extension codes code1, code2 and code3. "
+) * 6
+
+MAX_TOKENS = 100
+
+
+def run_callers(args, llm, server: FakeLLMServer) -> Dict[str, Any]:
+    barrier = threading.Barrier(args.callers)
+
+    def caller(index: int):
+        barrier.wait()
+        outcomes = []
+        for call in range(args.calls):
+            started = time.perf_counter()
+            try:
+                llm.call(f"{PROMPT}\nRequest {index}.{call}")
+                outcomes.append((True, time.perf_counter() - started))
+            except Exception:
+                outcomes.append((False, time.perf_counter() - started))
+        return outcomes
+
+    started = time.perf_counter()
+    # crewai prints a panel for every failed call
+    with contextlib.redirect_stdout(open(os.devnull, "w")), ThreadPoolExecutor(max_workers=args.callers) as pool:
+        outcomes = [outcome for outcomes in pool.map(caller, range(args.callers)) for outcome in outcomes]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for ok, latency in outcomes if ok)
+    succeeded = len(latencies)
+    return {
+        "calls": len(outcomes),
+        "succeeded": succeeded,
+        "failed": len(outcomes) - succeeded,
+        "endpoint_requests": server.api.counts["requests"],
+        "endpoint_429s": server.api.counts["rate_limited"],
+        "endpoint_max_in_flight": server.api.max_in_flight,
+        "elapsed_s": elapsed,
+        "throughput_per_s": succeeded / elapsed,
+        "call_ms_p50": percentile(latencies, 0.5) * 1000 if latencies else None,
+        "call_ms_p95": percentile(latencies, 0.95) * 1000 if latencies else None,
+    }
+
+
+def measure(label: str, args, server: FakeLLMServer, rpm: Optional[float] = None, tpm: Optional[float] = None) -> Dict[str, Any]:
+    from crewai import LLM
+
+    from llm.rate_limited_llm import RateLimitedLLM
+    from llm.rate_limiter import RateLimiter
+
+    # Start each scenario with the endpoint's budgets full
+    time.sleep(server.api.window_s)
+    server.api.reset()
+    settings = {"model": "openai/gpt-4o-mini", "base_url": server.base_url, "api_key": "sk-fake", "max_tokens": MAX_TOKENS}
+    if rpm is None:
+        llm, limiter = LLM(**settings), None
+    else:
+        limiter = RateLimiter(rpm=rpm, tpm=tpm, max_concurrency=args.max_concurrency)
+        llm = RateLimitedLLM(rate_limiter=limiter, **settings)
+
+    result = {"mode": label, **run_callers(args, llm, server)}
+    if limiter is not None:
+        report = limiter.report()
+        result.update({
+            "queued_ms_p50": report["queued_ms_p50"],
+            "queued_ms_p95": report["queued_ms_p95"],
+            "limiter_retries": report["retries"],
+            "lowest_concurrency_limit": report["lowest_concurrency_limit"],
+            "final_concurrency_limit": report["concurrency_limit"],
+        })
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=24, help="Concurrent callers (parallel crews)")
+    parser.add_argument("--calls", type=int, default=3, help="LLM calls per caller")
+    parser.add_argument("--rpm", type=float, default=600.0, help="Endpoint requests per minute")
+    parser.add_argument("--tpm", type=float, default=120000.0, help="Endpoint tokens per minute")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Endpoint time per completion")
+    parser.add_argument("--max-concurrency", type=int, default=16, help="Ceiling of the adaptive concurrency limit")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "llm_rate_limit.json"))
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    with FakeLLMServer(rpm=args.rpm, tpm=args.tpm, latency_ms=args.latency_ms) as server:
+        results = [
+            measure("no limiter", args, server),
+            measure("AIMD", args, server, rpm=0, tpm=0),
+            measure("AIMD + RPM/TPM", args, server, rpm=args.rpm, tpm=args.tpm),
+        ]
+
+    print(
+        f"{args.callers} callers x {args.calls} calls, endpoint {args.rpm:g} RPM / {args.tpm:g} TPM "
+        f"(1s burst), {args.latency_ms:g} ms per completion\n"
+    )
+    print(f"  {'mode':<16}{'failed':>8}{'429s':>7}{'calls/s':>9}{'call p50':>10}{'call p95':>10}{'queue p50':>11}{'queue p95':>11}")
+    for result in results:
+        queued = (
+            f"{result['queued_ms_p50']:>11.0f}{result['queued_ms_p95']:>11.0f}" if "queued_ms_p50" in result else f"{'-':>11}{'-':>11}"
+        )
+        print(
+            f"  {result['mode']:<16}{result['failed']:>5}/{result['calls']:<3}{result['endpoint_429s']:>6}"
+            f"{result['throughput_per_s']:>9.2f}{result['call_ms_p50'] or 0:>10.0f}{result['call_ms_p95'] or 0:>10.0f}{queued}"
+        )
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({"timestamp": datetime.now(timezone.utc).isoformat(), "settings": vars(args), "results": results}, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0 if all(result["failed"] == 0 for result in results[1:]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
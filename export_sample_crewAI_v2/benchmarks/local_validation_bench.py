@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Local Validation Benchmark - Invalid updates rejected by the server versus locally from the cached schema
+
+Sends the same invalid updates (bad section, subsection, coverage or
+extension code) to products with allowed-values lists in the in-process
+StubServer:
+  server     - no schema endpoint: every update is a POST answered with 400
+  local      - the schema is fetched once per product, then every update is
+               rejected in-process with the valid options and nothing is sent
+  local warm - the same with the schemas already cached
+  validator  - AllowedValues.errors() alone, without the updater around it
+
+Also reports whether the stub's stored products changed: like
+mock-api-server.js, the stub applies an update before validating it, so
+server-side rejections leave the invalid values behind.
+
+Usage: python benchmarks/local_validation_bench.py [updates] [latency_ms]
+"""
+
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_product_api import CONFIG, StubServer
+from tools import http_client
+from tools.allowed_values import allowed_values_cache
+from tools.product_api import update_product
+
+INVALID_FIELDS = [
+    {"section": "BAD"},
+    {"subsection": "BAD"},
+    {"coverage": "BAD"},
+    {"extension": {"code1": "BAD1"}},
+    {"section": "BAD", "extension": {"code2": "BAD2", "code3": "BAD3"}},
+]
+
+
+def invalid_updates(count):
+    names = list(CONFIG)
+    return [(names[i % len(names)], INVALID_FIELDS[i % len(INVALID_FIELDS)]) for i in range(count)]
+
+
+def measure(label, schema_endpoint, updates, latency_ms, warm=False):
+    allowed_values_cache.clear()
+    with StubServer(latency_ms=latency_ms, schema_endpoint=schema_endpoint) as server:
+        http_client.configure(base_url=server.base_url)
+        if warm:
+            for name in CONFIG:
+                allowed_values_cache.schema(name)
+            server.api.reset()
+        before = copy.deepcopy(server.api.products)
+        started = time.perf_counter()
+        results = [update_product(name, **fields) for name, fields in updates]
+        elapsed = time.perf_counter() - started
+        requests_sent = sum(server.api.counts.values())
+        changed = server.api.products != before
+
+    with_options = sum("Valid " in result for result in results)
+    print(
+        f"{label:>10}: {elapsed / len(updates) * 1e6:10.1f} us/update  {requests_sent:4d} HTTP requests  "
+        f"{with_options}/{len(updates)} answers list the valid options  stored products changed: {changed}"
+    )
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    updates = invalid_updates(count)
+    print(f"{count} invalid updates over {len(CONFIG)} products, {latency_ms:g} ms per request\n")
+
+    server = measure("server", False, updates, latency_ms)
+    measure("local", True, updates, latency_ms)
+    local = measure("local warm", True, updates, latency_ms, warm=True)
+
+    schemas = {}
+    with StubServer() as stub:
+        http_client.configure(base_url=stub.base_url)
+        for name in CONFIG:
+            schemas[name] = allowed_values_cache.schema(name)
+    payloads = [(schemas[name], fields) for name, fields in updates]
+    rounds = 50
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for schema, fields in payloads:
+            schema.errors(fields)
+    validator = (time.perf_counter() - started) / (rounds * len(payloads))
+    print(f"{'validator':>10}: {validator * 1e6:10.2f} us/update")
+
+    print(f"\nWarm local rejection speedup over the server round trip: {server / local:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+"""
+Memory Benchmark - Per-prompt memory latency and RSS growth, CrewAI default memory versus the keyword store
+
+Replays the memory traffic of a long batch without the LLM. Each prompt runs
+two tasks. For each task, CrewAI builds the contextual memory for the task
+description (ContextualMemory.build_context_for_task) and then saves the
+task's output. The backends are:
+  crewai   - memory=True: short-term and entity memory in ChromaDB (RAGStorage)
+             and long-term memory in SQLite. An offline hashing embedder with
+             1536 dimensions stands in for the OpenAI one and counts its calls.
+             Each task also saves a long-term item and an entity, which in a
+             real run first costs a TaskEvaluator LLM call (counted, not made).
+  keyword  - short-term memory in KeywordMemoryStorage (configs/crew_memory.py),
+             scoped per prompt to its products with memory_subjects() as
+             ProductConfigurationCrew does
+
+Every built context is also checked for other products: a catalog product
+name in the context other than the prompt's own is an unrelated recall, and
+the benchmark fails if the keyword store makes any.
+
+Each backend runs in a fresh subprocess, so its RSS is measured from the same
+baseline. Storage goes to a temporary directory.
+
+Usage:
+  python benchmarks/memory_bench.py [--prompts 10000] [--embed-latency-ms 0]
+                                    [--max-entries 1000] [--output benchmarks/results/memory.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from contextlib import nullcontext
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS, percentile
+
+BACKENDS = ("crewai", "keyword")
+
+EMBEDDING_DIMENSIONS = 1536
+
+# Snapshot RSS this often (prompts)
+RSS_EVERY = 1000
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process, in MiB"""
+
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def task_descriptions(prompt: str) -> List[SimpleNamespace]:
+    from tasks.analysis_task import create_analysis_task
+    from tasks.update_task import create_update_task
+
+    # Only the description and expected output are read; agents are not needed
+    analysis = create_analysis_task(None)
+    update = create_update_task(None, analysis)
+    return [
+        SimpleNamespace(description=task.description.format(prompt=prompt), expected_output=task.expected_output)
+        for task in (analysis, update)
+    ]
+
+
+def task_output(index: int, prompt: str, step: int) -> str:
+    # Unique per prompt, like real outputs (they carry the update timestamp)
+    if step == 0:
+        return json.dumps({"prompt": prompt, "product_name": prompt.split(" with ")[0][19:], "confidence": 0.9})
+    return f"Successfully applied '{prompt}'. Response: {{\"success\": true, \"timestamp\": \"run-{index}\"}}"
+
+
+def offline_embedder(latency_ms: float, counter: List[int]):
+    import numpy as np
+    from crewai.rag.embeddings.providers.custom.embedding_callable import CustomEmbeddingFunction
+
+    class HashingEmbedder(CustomEmbeddingFunction):
+        """Hashed bag-of-words vectors; one call per document, like a remote embedder"""
+
+        def __init__(self, **kwargs):
+            pass
+
+        @staticmethod
+        def name() -> str:
+            # ChromaDB checks the function name against the collection's configuration
+            return "memory-bench-hashing"
+
+        def get_config(self) -> Dict[str, Any]:
+            return {}
+
+        def __call__(self, input):
+            vectors = []
+            for document in input:
+                counter[0] += 1
+                if latency_ms:
+                    time.sleep(latency_ms / 1000)
+                vector = np.zeros(EMBEDDING_DIMENSIONS, dtype=np.float32)
+                for word in str(document).lower().split():
+                    vector[hash(word) % EMBEDDING_DIMENSIONS] += 1.0
+                vectors.append(vector / (np.linalg.norm(vector) or 1.0))
+            return vectors
+
+    return HashingEmbedder
+
+
+def run_child(args) -> Dict[str, Any]:
+    from crewai.memory.contextual.contextual_memory import ContextualMemory
+
+    embed_calls = [0]
+    evaluator_calls = 0
+    if args.backend == "crewai":
+        from crewai.memory.entity.entity_memory import EntityMemory
+        from crewai.memory.entity.entity_memory_item import EntityMemoryItem
+        from crewai.memory.long_term.long_term_memory import LongTermMemory
+        from crewai.memory.long_term.long_term_memory_item import LongTermMemoryItem
+        from crewai.memory.short_term.short_term_memory import ShortTermMemory
+
+        embedder = {"provider": "custom", "config": {"embedding_callable": offline_embedder(args.embed_latency_ms, embed_calls)}}
+        stm = ShortTermMemory(embedder_config=embedder)
+        em = EntityMemory(embedder_config=embedder)
+        ltm = LongTermMemory(path=os.path.join(args.storage_dir, "long_term_memory_storage.db"))
+        storage = None
+    else:
+        from configs.crew_memory import KeywordMemoryStorage, crew_memory_options
+
+        storage = KeywordMemoryStorage(max_entries=args.max_entries)
+        stm = crew_memory_options(True, storage)["short_term_memory"]
+        em = ltm = None
+
+    from configs.crew_memory import memory_subjects
+    from tasks.prompt_parser import candidate_products
+    from tools.product_catalog import load_product_names
+
+    contextual = ContextualMemory(stm, ltm, em, None)
+    templates = {prompt: task_descriptions(prompt) for prompt in PROMPTS}
+    subjects = {prompt: candidate_products(prompt) for prompt in PROMPTS}
+    catalog = load_product_names()
+    unrelated = 0
+    rss_start = rss_mb()
+    rss_samples = []
+    latencies = []
+    context_chars = 0
+    for index in range(args.prompts):
+        prompt = PROMPTS[index % len(PROMPTS)]
+        started = time.perf_counter()
+        scope = memory_subjects(subjects[prompt]) if storage is not None else nullcontext()
+        with scope:
+            for step, task in enumerate(templates[prompt]):
+                context = contextual.build_context_for_task(task, "")
+                context_chars += len(context)
+                unrelated += sum(name in context for name in catalog if name not in subjects[prompt])
+                output = task_output(index, prompt, step)
+                stm.save(output, {"observation": task.description})
+                if ltm is not None:
+                    evaluator_calls += 1
+                    ltm.save(LongTermMemoryItem(
+                        task=task.description,
+                        agent="Product Analyzer",
+                        quality=8,
+                        datetime=str(time.time()),
+                        expected_output=task.expected_output,
+                        metadata={"suggestions": ["Use the exact product name"], "quality": 8},
+                    ))
+                    em.save([EntityMemoryItem(name=subjects[prompt][0], type="product", description=output, relationships="")])
+        latencies.append(time.perf_counter() - started)
+        if (index + 1) % RSS_EVERY == 0:
+            rss_samples.append(round(rss_mb() - rss_start, 2))
+
+    latencies.sort()
+    return {
+        "backend": args.backend,
+        "prompts": args.prompts,
+        "memory_ms_mean": sum(latencies) / len(latencies) * 1000,
+        "memory_ms_p95": percentile(latencies, 0.95) * 1000,
+        "total_s": sum(latencies),
+        "rss_start_mb": rss_start,
+        "rss_growth_mb": rss_mb() - rss_start,
+        "rss_growth_every_1000_prompts_mb": rss_samples,
+        "embedding_calls_per_prompt": embed_calls[0] / args.prompts,
+        "evaluator_llm_calls_per_prompt": evaluator_calls / args.prompts,
+        "context_chars_per_prompt": context_chars / args.prompts,
+        "unrelated_recalls_per_prompt": unrelated / args.prompts,
+        "store": storage.stats() if storage is not None else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=10000)
+    parser.add_argument("--embed-latency-ms", type=float, default=0.0, help="Delay per embedded document (crewai backend)")
+    parser.add_argument("--max-entries", type=int, default=1000, help="Keyword store entry cap")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "memory.json"))
+    parser.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--storage-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_child(args)))
+        return 0
+
+    results = []
+    for backend in BACKENDS:
+        storage_dir = tempfile.mkdtemp(prefix="memory-bench-")
+        # CrewAI keeps ChromaDB and SQLite files under the XDG data directory
+        env = dict(os.environ, XDG_DATA_HOME=storage_dir, CREWAI_STORAGE_DIR="memory-bench", CREWAI_TESTING="true")
+        command = [
+            sys.executable, os.path.abspath(__file__), "--backend", backend, "--storage-dir", storage_dir,
+            "--prompts", str(args.prompts), "--embed-latency-ms", str(args.embed_latency_ms),
+            "--max-entries", str(args.max_entries),
+        ]
+        try:
+            completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+        finally:
+            shutil.rmtree(storage_dir, ignore_errors=True)
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print(f"{args.prompts} prompts (2 tasks each), embedder {args.embed_latency_ms:g} ms/document\n")
+    columns = [
+        ("memory_ms_mean", "mean ms"),
+        ("memory_ms_p95", "p95 ms"),
+        ("total_s", "total s"),
+        ("rss_growth_mb", "RSS +MiB"),
+        ("embedding_calls_per_prompt", "embeds"),
+        ("evaluator_llm_calls_per_prompt", "eval LLM"),
+        ("context_chars_per_prompt", "context"),
+        ("unrelated_recalls_per_prompt", "unrelated"),
+    ]
+    print(f"  {'backend':<9}" + "".join(f"{label:>11}" for _, label in columns))
+    for result in results:
+        print(f"  {result['backend']:<9}" + "".join(f"{result[key]:>11.2f}" for key, _ in columns))
+    for result in results:
+        print(f"\n{result['backend']}: RSS growth per 1000 prompts (MiB): {result['rss_growth_every_1000_prompts_mb']}")
+    default, keyword = results
+    print(
+        f"\nkeyword store: {default['memory_ms_mean'] / keyword['memory_ms_mean']:.0f}x less memory time per prompt, "
+        f"{default['rss_growth_mb'] - keyword['rss_growth_mb']:.0f} MiB less RSS growth, "
+        f"{default['embedding_calls_per_prompt']:.0f} embedding and {default['evaluator_llm_calls_per_prompt']:.0f} "
+        "evaluator LLM calls per prompt avoided"
+    )
+
+    output_path = os.path.abspath(args.output)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("backend", "storage_dir")},
+            "backends": results,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    if keyword["unrelated_recalls_per_prompt"]:
+        print("FAIL: the keyword store recalled memories of other products")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
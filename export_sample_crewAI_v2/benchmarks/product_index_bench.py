@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Product Name Index Benchmark - Build time and lookup latency at catalog scale
+
+Usage: python benchmarks/product_index_bench.py [n_products] [n_queries]
+"""
+
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.product_index import ProductNameIndex
+
+
+def synthetic_names(count: int, seed: int = 42):
+    """Generates unique names shaped like the sample catalog: 'TRE TreMoon Shop'"""
+
+    rng = random.Random(seed)
+    syllables = ["tre", "moon", "bil", "lon", "game", "zone", "medi", "care", "edu", "tech", "pro", "plus", "shop", "sas", "kor", "vex"]
+    suffixes = ["Shop", "Pro", "Plus", "Solutions", "Store", "Hub", "Center", "Online", "Group", "Labs"]
+    names = set()
+    while len(names) < count:
+        prefix = "".join(rng.choices(string.ascii_uppercase, k=3))
+        word = "".join(rng.choices(syllables, k=rng.randint(2, 3))).capitalize()
+        names.add(f"{prefix} {word} {rng.choice(suffixes)}{rng.randint(0, 99)}")
+    return sorted(names)
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """Drops or swaps one character and changes case, like a sloppy prompt"""
+
+    chars = list(name.lower())
+    i = rng.randrange(1, len(chars) - 1)
+    if rng.random() < 0.5:
+        del chars[i]
+    else:
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(int(p * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    rng = random.Random(7)
+
+    names = synthetic_names(count)
+
+    started = time.perf_counter()
+    index = ProductNameIndex(names)
+    print(f"Indexed {count:,} products in {time.perf_counter() - started:.2f}s")
+
+    samples = rng.sample(names, n_queries)
+    for label, queries in (("exact", samples), ("misspelled", [misspell(n, rng) for n in samples])):
+        latencies, correct = [], 0
+        for query, expected in zip(queries, samples):
+            started = time.perf_counter()
+            matches = index.lookup(query, k=5)
+            latencies.append(time.perf_counter() - started)
+            correct += bool(matches) and matches[0][0] == expected
+        print(
+            f"{label:>10}: p50 {percentile(latencies, 0.5) * 1e3:.3f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1e3:.3f} ms  "
+            f"top-1 accuracy {correct / n_queries:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Prompt Token Report - Input/output tokens per crew run for the full and compact prompt modes
+
+Runs the real crew offline (ScriptedLLM + StubServer, as in e2e_bench.py)
+once per prompt in each mode and counts, with the model tokenizer, every
+message sent to and received from the LLM (instrumentation llm_call
+records). Reports tokens per run, per task and LLM calls per run, plus the
+size of the rendered task descriptions alone.
+
+Token counts use tiktoken when its encoding files are available and fall
+back to a 4-characters-per-token estimate otherwise (shown as the source).
+
+Usage:
+  python benchmarks/prompt_tokens_report.py [--prompts 8] [--model gpt-4o-mini]
+                                            [--output benchmarks/results/prompt_tokens.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS
+from benchmarks.scripted_llm import ScriptedLLM
+from benchmarks.stub_product_api import StubServer
+from configs.crew_configuration import PROMPT_MODES, ProductConfigurationCrew
+from instrumentation.recorder import configure_instrumentation
+from llm.tokens import count_tokens, token_source
+from tools import http_client
+from tools.config_cache import product_config_cache
+
+
+def measure_mode(mode: str, prompts: List[str], model: str, server: StubServer) -> Dict[str, Any]:
+    # ScriptedLLM reports its own model name; count tokens as the production model would see them
+    llm = ScriptedLLM(model=model)
+    crew = ProductConfigurationCrew("sk-offline", fast_path=False, llm=llm, memory=False, prompt_mode=mode)
+
+    records: List[Dict[str, Any]] = []
+    instrumentation = configure_instrumentation()
+    instrumentation.add_sink(records.append)
+
+    description_tokens = []
+    server.api.reset()
+    product_config_cache.clear()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for prompt in prompts:
+            inputs = crew.kickoff_inputs(prompt)
+            description_tokens.append(sum(
+                count_tokens(task.description.format(**inputs), model)
+                for task in (crew.analysis_task, crew.update_task)
+            ))
+            crew.run(prompt)
+    instrumentation.sinks.remove(records.append)
+
+    runs: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for record in records:
+        if record["type"] == "llm_call":
+            run = runs[record["kickoff_id"]]
+            run["tokens_in"] += record["tokens_in"]
+            run["tokens_out"] += record["tokens_out"]
+            run["llm_calls"] += 1
+            run[f"{record['stage']}_tokens_in"] += record["tokens_in"]
+
+    def mean(key: str) -> float:
+        return statistics.mean(run[key] for run in runs.values()) if runs else 0.0
+
+    return {
+        "mode": mode,
+        "runs": len(runs),
+        "tokens_in_per_run": mean("tokens_in"),
+        "tokens_out_per_run": mean("tokens_out"),
+        "llm_calls_per_run": mean("llm_calls"),
+        "analysis_task_tokens_in": mean("analysis_task_tokens_in"),
+        "update_task_tokens_in": mean("update_task_tokens_in"),
+        "task_description_tokens": statistics.mean(description_tokens),
+        "updates_applied": server.api.counts["update"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=len(PROMPTS), help="Crew runs per mode")
+    parser.add_argument("--model", default="gpt-4o-mini", help="Tokenizer model")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "prompt_tokens.json"))
+    args = parser.parse_args()
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="prompt-tokens-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer() as server:
+        http_client.configure(base_url=server.base_url)
+        modes = [measure_mode(mode, prompts, args.model, server) for mode in PROMPT_MODES]
+
+    print(f"Tokens per crew run ({args.prompts} runs per mode, {args.model}, source: {token_source(args.model)})\n")
+    columns = [
+        ("tokens_in_per_run", "input"),
+        ("tokens_out_per_run", "output"),
+        ("analysis_task_tokens_in", "analysis in"),
+        ("update_task_tokens_in", "update in"),
+        ("task_description_tokens", "descriptions"),
+        ("llm_calls_per_run", "llm calls"),
+    ]
+    print(f"  {'mode':<8}" + "".join(f"{label:>14}" for _, label in columns))
+    for mode in modes:
+        print(f"  {mode['mode']:<8}" + "".join(f"{mode[key]:>14.1f}" for key, _ in columns))
+
+    full, compact = modes
+    for key, label in columns[:2]:
+        if full[key]:
+            print(f"\n{label} tokens per run: {100 * (1 - compact[key] / full[key]):.1f}% fewer in compact mode", end="")
+    print()
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "model": args.model,
+            "token_source": token_source(args.model),
+            "prompts": args.prompts,
+            "modes": modes,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0 if all(mode["runs"] == args.prompts for mode in modes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Scripted LLM - Deterministic stand-in for the OpenAI model in offline benchmarks
+
+Replies in the ReAct text format CrewAI agents parse (Thought / Action /
+Action Input / Final Answer), following the mandatory tool sequence of each
+task, and answers single-call update requests with the update payload (a
+submit_product_update call when function_calling is on, JSON otherwise).
+Tool arguments come from the deterministic prompt parser and from the
+observations already in the conversation, so the real tools, the real HTTP
+client and the stub product API all run as they would with a live model.
+"""
+
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Union
+
+from crewai import BaseLLM
+from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+
+from tasks.prompt_parser import parse_update_prompt
+from tasks.single_call_task import UPDATE_FUNCTION_NAME
+
+PROMPT_PATTERN = re.compile(r'(?:User prompt|USER REQUEST): "([^"]*)"')
+OBSERVATION_PATTERN = re.compile(r"Observation:\s*(.*)", re.DOTALL)
+ROLE_PATTERN = re.compile(r"You are (.+?)\. ")
+CANDIDATES_PATTERN = re.compile(r"Candidate products: (.*)")
+
+PRODUCT_LIST_FILE = "./products.txt"
+READ_FILE_TOOL = "Read a file's content"
+
+
+def _text(messages: Union[str, List[Dict[str, str]]]) -> List[Dict[str, str]]:
+    if isinstance(messages, str):
+        return [{"role": "user", "content": messages}]
+    return messages
+
+
+def _json_objects(text: str) -> List[Dict[str, Any]]:
+    # Every top-level JSON object embedded in free text
+    decoder = json.JSONDecoder()
+    found, index = [], text.find("{")
+    while index != -1:
+        try:
+            value, end = decoder.raw_decode(text, index)
+        except ValueError:
+            index = text.find("{", index + 1)
+            continue
+        if isinstance(value, dict):
+            found.append(value)
+        index = text.find("{", end)
+    return found
+
+
+def _react(thought: str, action: Optional[str] = None, action_input: Any = None, final: Any = None) -> str:
+    if action is not None:
+        return f"Thought: {thought}\nAction: {action}\nAction Input: {json.dumps(action_input)}"
+    return f"Thought: {thought}\nFinal Answer: {json.dumps(final, indent=2)}"
+
+
+def _drifted(fields: Dict[str, Any]) -> Dict[str, Any]:
+    # "null" placeholders and the extension as a JSON-encoded string
+    drifted = {field: "null" if value is None else value for field, value in fields.items()}
+    if isinstance(fields.get("extension"), dict):
+        drifted["extension"] = json.dumps(fields["extension"])
+    return drifted
+
+
+class ScriptedLLM(BaseLLM):
+    """
+    Replays the tool sequence a well-behaved model produces for each task.
+
+    Analyzer: read the product list (when the agent has the file tool), fetch
+    the product configuration, answer with the analysis JSON. Updater: call ProductConfigUpdaterTool with all
+    five parameters, then confirm. Each call sleeps latency_ms to model model
+    time without holding the GIL, and emits the same LLM call events as
+    crewai.LLM so event-bus instrumentation sees it.
+
+    With drift=True it makes the formatting mistakes real models make: the
+    analysis JSON wrapped in prose and a code fence, "null" strings, the
+    extension as a JSON string, confidence as a percentage, and the same
+    placeholders in the updater's tool arguments.
+
+    Agents take shallow copies of their LLM, so the call counter lives in a
+    dict shared by every copy.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, model: str = "scripted", function_calling: bool = False, drift: bool = False):
+        super().__init__(model=model)
+        self.latency_ms = latency_ms
+        self.function_calling = function_calling
+        self.drift = drift
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0}
+
+    @property
+    def calls(self) -> int:
+        return self._counters["calls"]
+
+    def supports_function_calling(self) -> bool:
+        return self.function_calling
+
+    def get_context_window_size(self) -> int:
+        return 128000
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> str:
+        with self._lock:
+            self._counters["calls"] += 1
+
+        messages = _text(messages)
+        crewai_event_bus.emit(
+            self,
+            LLMCallStartedEvent(messages=messages, model=self.model, from_task=from_task, from_agent=from_agent),
+        )
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000)
+
+        if messages and UPDATE_FUNCTION_NAME in messages[0].get("content", ""):
+            response = self._single_call(messages, tools, available_functions)
+        else:
+            response = self._respond(messages, from_agent)
+        crewai_event_bus.emit(
+            self,
+            LLMCallCompletedEvent(
+                messages=messages,
+                response=response,
+                call_type=LLMCallType.LLM_CALL,
+                model=self.model,
+                from_task=from_task,
+                from_agent=from_agent,
+            ),
+        )
+        return response
+
+    def _single_call(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[dict]],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Any:
+        conversation = "\n".join(m.get("content", "") for m in messages)
+        match = PROMPT_PATTERN.search(conversation)
+        prompt = match.group(1) if match else ""
+        candidates = CANDIDATES_PATTERN.search(conversation)
+
+        parsed = parse_update_prompt(prompt)
+        if parsed is None:
+            product_name = candidates.group(1).split(";")[0].strip() if candidates else prompt
+            parsed = {"product_name": product_name, "requested_updates": {}}
+        arguments = {"product_name": parsed["product_name"], **parsed["requested_updates"]}
+
+        # Like crewai.LLM, a function call is executed and its result returned
+        if tools and available_functions and UPDATE_FUNCTION_NAME in available_functions:
+            return available_functions[UPDATE_FUNCTION_NAME](**arguments)
+        return json.dumps(arguments)
+
+    def _respond(self, messages: List[Dict[str, str]], from_agent: Optional[Any]) -> str:
+        conversation = "\n".join(m.get("content", "") for m in messages)
+        match = PROMPT_PATTERN.search(conversation)
+        prompt = match.group(1) if match else ""
+
+        # Observations the executor has appended after our earlier actions
+        observations = [
+            OBSERVATION_PATTERN.search(m["content"]).group(1)
+            for m in messages
+            if m.get("role") == "assistant" and OBSERVATION_PATTERN.search(m.get("content", ""))
+        ]
+
+        # CrewAI does not always pass from_agent; the system prompt names the role
+        role = getattr(from_agent, "role", None)
+        if role is None:
+            role_match = ROLE_PATTERN.search(messages[0].get("content", "")) if messages else None
+            role = role_match.group(1) if role_match else ""
+        if role == "Product Analyzer":
+            # Compact prompts inject candidate products instead of offering the file tool
+            reads_file = bool(messages) and READ_FILE_TOOL in messages[0].get("content", "")
+            return self._analyze(prompt, observations, reads_file)
+        return self._update(prompt, conversation, observations)
+
+    def _analyze(self, prompt: str, observations: List[str], reads_file: bool = True) -> str:
+        parsed = parse_update_prompt(prompt) or {"product_name": prompt, "requested_updates": {}}
+        product_name = parsed["product_name"]
+
+        if reads_file and len(observations) == 0:
+            return _react("I need the product list first.", READ_FILE_TOOL, {"file_path": PRODUCT_LIST_FILE})
+        if len(observations) == int(reads_file):
+            return _react(
+                "Now I need the current configuration.",
+                "Get Product Configuration",
+                {"product_name": product_name},
+            )
+
+        current: Dict[str, Any] = {}
+        for result in _json_objects(observations[-1]):
+            for product in result.get("products", []):
+                if product.get("name") == product_name or not current:
+                    current = {k: product.get(k) for k in ("section", "subsection", "coverage", "extension")}
+
+        final = {
+            "product_name": product_name,
+            "current_config": current,
+            "requested_updates": parsed["requested_updates"],
+            "confidence": 1.0 if parsed.get("confidence") else 0.5,
+        }
+        if self.drift:
+            final = {
+                **final,
+                "requested_updates": _drifted(final["requested_updates"]),
+                "confidence": f"{final['confidence']:.0%}",
+            }
+            return f"Thought: I now know the final answer\nFinal Answer: Here is the analysis:\n```json\n{json.dumps(final)}\n```"
+        return _react("I now know the final answer", final=final)
+
+    def _update(self, prompt: str, conversation: str, observations: List[str]) -> str:
+        if observations:
+            return _react("I now know the final answer", final={"update_result": observations[-1].strip()})
+
+        parsed = parse_update_prompt(prompt) or {"product_name": prompt, "requested_updates": {}}
+        analysis = next((obj for obj in _json_objects(conversation) if "current_config" in obj), {})
+        current = analysis.get("current_config") or {}
+        requested = parsed["requested_updates"]
+
+        arguments = {"product_name": analysis.get("product_name") or parsed["product_name"]}
+        if self.drift:
+            arguments.update(_drifted(requested))
+            return _react("I will apply the update.", "ProductConfigUpdaterTool", arguments)
+        for field in ("section", "subsection", "coverage"):
+            arguments[field] = requested.get(field) or current.get(field)
+        arguments["extension"] = requested.get("extension")
+        return _react("I will apply the update.", "ProductConfigUpdaterTool", arguments)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Search Response Benchmark - Bytes and tokens the product configuration tool returns per call, before and after
+
+Against the in-process StubServer with its catalog grown by product
+variants (outlets, whose names contain a sample product's name, and depots,
+which share its 3-letter code), get_product_configuration is asked for:
+  canonical - the sample products by full name (resolved by the product index)
+  variant   - full names of depots the index does not know (3-char prefix search)
+  partial   - unknown names whose prefix matches many products but none exactly
+and the response is measured in UTF-8 bytes and tokens (the agent's next
+prompt grows by exactly this much), as:
+  before           - every substring match, indented JSON (the previous behavior)
+  exact-first      - the exact match alone, else at most --max-results matches
+  + compact        - the same, minified
+  + compact/fields - the same, with only --fields per product (plus the name)
+
+Usage:
+  python benchmarks/search_response_bench.py [--variants 40] [--max-results 5]
+                                              [--fields section,coverage]
+                                              [--output benchmarks/results/search_response.json]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.stub_product_api import StubServer, initial_products
+from llm.tokens import count_tokens
+from tools import http_client
+from tools.config_cache import product_config_cache
+from tools.product_api import _format_search_response, _search_term, search_product_config
+from tools.product_index import resolve_product_name
+
+QUERIES = {
+    "canonical": [product["name"] for product in initial_products()],
+    "variant": ["TRE Depot 7", "MED Depot 12", "EDU Depot 3"],
+    "partial": ["Trex Marketplace", "Gamma Arcade", "Bilbo Traders"],
+}
+
+
+def catalog(variants: int) -> List[Dict[str, Any]]:
+    products = initial_products()
+    next_id = len(products) + 1
+    for original in initial_products():
+        for index in range(1, variants + 1):
+            code = original["name"].split()[0]
+            for name in (f"{original['name']} Outlet {index}", f"{code} Depot {index}"):
+                products.append({**original, "id": next_id, "name": name})
+                next_id += 1
+    return products
+
+
+def previous_response(product_name: str) -> str:
+    # The search tool before exact-match filtering and max_results: every match, indented
+    term = _search_term(product_name, resolve_product_name(product_name))
+    response = http_client.get("/api/search", params={"q": term})
+    return _format_search_response(response.json())
+
+
+def measure(label: str, server: StubServer, call) -> Dict[str, Any]:
+    groups = {}
+    for group, names in QUERIES.items():
+        sizes, tokens, products = [], [], []
+        server.api.counts["search"] = 0
+        for name in names:
+            # Every call goes to the server; cached reads return the same text
+            product_config_cache.clear()
+            text = call(name)
+            sizes.append(len(text.encode("utf-8")))
+            tokens.append(count_tokens(text))
+            products.append(json.loads(text).get("total_products", 0))
+        groups[group] = {
+            "calls": len(names),
+            "bytes_per_call": sum(sizes) / len(names),
+            "tokens_per_call": sum(tokens) / len(names),
+            "products_per_call": sum(products) / len(names),
+            "search_requests_per_call": server.api.counts["search"] / len(names),
+        }
+    return {"mode": label, "groups": groups}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--variants", type=int, default=40, help="Outlets and depots added per sample product")
+    parser.add_argument("--max-results", type=int, default=5, help="Cap on products per search")
+    parser.add_argument("--fields", default="section,coverage", help="Comma-separated fields for the projected mode")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "search_response.json"))
+    args = parser.parse_args()
+
+    output_path = os.path.abspath(args.output)
+    fields: Optional[List[str]] = [field.strip() for field in args.fields.split(",") if field.strip()]
+    # The product catalog (canonical names) is read from products.txt in the working directory
+    workdir = tempfile.mkdtemp(prefix="search-response-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer() as server:
+        http_client.configure(base_url=server.base_url)
+        server.api.products = catalog(args.variants)
+        results = [
+            measure("before", server, previous_response),
+            measure("exact-first", server, lambda name: search_product_config(name, max_results=args.max_results)),
+            measure("+ compact", server, lambda name: search_product_config(name, True, args.max_results)),
+            measure("+ compact/fields", server, lambda name: search_product_config(name, True, args.max_results, fields)),
+        ]
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    print(
+        f"{len(server.api.products)} products ({args.variants} outlets and depots per sample product), "
+        f"max_results {args.max_results}, fields {','.join(fields)}\n"
+    )
+    print(f"  {'mode':<18}{'query':<11}{'products':>9}{'bytes':>8}{'tokens':>8}{'searches':>10}")
+    for result in results:
+        for group, stats in result["groups"].items():
+            print(
+                f"  {result['mode']:<18}{group:<11}{stats['products_per_call']:>9.1f}{stats['bytes_per_call']:>8.0f}"
+                f"{stats['tokens_per_call']:>8.0f}{stats['search_requests_per_call']:>10.1f}"
+            )
+
+    before = results[0]["groups"]
+    for result in results[1:]:
+        result["token_reduction"] = {
+            group: 1 - stats["tokens_per_call"] / before[group]["tokens_per_call"] for group, stats in result["groups"].items()
+        }
+        print(f"{result['mode']}: tokens per call " + ", ".join(
+            f"{group} -{reduction:.0%}" for group, reduction in result["token_reduction"].items()
+        ))
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({"timestamp": datetime.now(timezone.utc).isoformat(), "settings": vars(args), "results": results}, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+"""
+Service Benchmark - One process per prompt versus the long-running crew service
+
+Runs prompts offline (ScriptedLLM + StubServer, crew execution with the
+fast path off, as in e2e_bench.py) three ways:
+  process per prompt - a fresh interpreter imports CrewAI, builds the crew and
+                       runs one prompt, like `python main.py run`
+  service            - POST /run to a CrewService (configs/crew_service.py)
+                       with warm worker processes, at a sustained concurrency
+  overload           - a burst of requests larger than workers + queue size:
+                       the excess is refused with 429 at once, and a request
+                       with a deadline shorter than its queue wait gets 504
+
+Usage:
+  python benchmarks/service_bench.py [--requests 64] [--workers 4] [--queue-size 8]
+                                     [--concurrency 8] [--cold-prompts 4]
+                                     [--llm-latency-ms 50] [--api-latency-ms 2]
+                                     [--output benchmarks/results/service.json]
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS, percentile
+from benchmarks.stub_product_api import StubServer
+
+
+def offline_crew(base_url: str, llm_latency_ms: float):
+    """Crew factory for the service workers: ScriptedLLM, stub API, no memory, crew execution"""
+
+    from benchmarks.scripted_llm import ScriptedLLM
+    from configs.crew_configuration import ProductConfigurationCrew
+    from tools import http_client
+
+    # Workers share the terminal; keep the crew's verbose output out of it
+    sys.stdout = open(os.devnull, "w")
+    http_client.configure(base_url=base_url)
+    return ProductConfigurationCrew("sk-offline", fast_path=False, llm=ScriptedLLM(latency_ms=llm_latency_ms), memory=False)
+
+
+def post_run(base_url: str, prompt: str, timeout_s: Optional[float] = None) -> Tuple[int, Dict[str, Any], float]:
+    import requests
+
+    started = time.perf_counter()
+    body = {"prompt": prompt} if timeout_s is None else {"prompt": prompt, "timeout_s": timeout_s}
+    response = requests.post(f"{base_url}/run", json=body, timeout=600)
+    return response.status_code, response.json(), time.perf_counter() - started
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "throughput_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms_p50": percentile(latencies, 0.5) * 1000 if latencies else 0.0,
+        "latency_ms_p95": percentile(latencies, 0.95) * 1000 if latencies else 0.0,
+    }
+
+
+def measure_cold(args, base_url: str) -> Dict[str, Any]:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(args.cold_prompts):
+        command = [
+            sys.executable, os.path.abspath(__file__), "--cold-child", PROMPTS[i % len(PROMPTS)],
+            "--base-url", base_url, "--llm-latency-ms", str(args.llm_latency_ms),
+        ]
+        prompt_started = time.perf_counter()
+        subprocess.run(command, check=True, capture_output=True)
+        latencies.append(time.perf_counter() - prompt_started)
+    return {"mode": "process per prompt", **summarize(latencies, time.perf_counter() - started)}
+
+
+def measure_service(args, service_url: str) -> Dict[str, Any]:
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.requests)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        responses = list(pool.map(lambda prompt: post_run(service_url, prompt), prompts))
+    elapsed = time.perf_counter() - started
+    statuses = [status for status, _, _ in responses]
+    result = summarize([latency for _, _, latency in responses], elapsed)
+    result["mode"] = f"service, {args.concurrency} concurrent"
+    result["statuses"] = {str(status): statuses.count(status) for status in sorted(set(statuses))}
+    result["workers_used"] = len({body.get("worker_pid") for status, body, _ in responses if status == 200})
+    return result
+
+
+def measure_overload(args, service_url: str, capacity: int) -> Dict[str, Any]:
+    burst = capacity * 3
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(burst)]
+    barrier = threading.Barrier(burst)
+
+    def send(prompt):
+        barrier.wait()
+        return post_run(service_url, prompt)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=burst) as pool:
+        responses = list(pool.map(send, prompts))
+    elapsed = time.perf_counter() - started
+
+    refused = [latency for status, _, latency in responses if status == 429]
+    served = [latency for status, _, latency in responses if status == 200]
+    # A queued request whose deadline is shorter than its wait is never run
+    with ThreadPoolExecutor(max_workers=capacity) as pool:
+        blockers = [pool.submit(post_run, service_url, prompt) for prompt in prompts[:capacity - 1]]
+        time.sleep(0.2)
+        deadline_status, deadline_body, deadline_latency = post_run(service_url, PROMPTS[0], timeout_s=0.5)
+        for blocker in blockers:
+            blocker.result()
+
+    return {
+        "mode": f"overload burst of {burst}",
+        **summarize(served, elapsed),
+        "refused_429": len(refused),
+        "refused_latency_ms_p95": percentile(sorted(refused), 0.95) * 1000 if refused else None,
+        "short_deadline_status": deadline_status,
+        "short_deadline_latency_ms": deadline_latency * 1000,
+        "short_deadline_error": deadline_body.get("error"),
+    }
+
+
+def cold_child(args) -> int:
+    # What `python main.py run` pays: interpreter, CrewAI import, crew construction, one prompt
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        crew = offline_crew(args.base_url, args.llm_latency_ms)
+        crew.run(args.cold_child)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=64, help="Requests in the sustained service run")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients in the sustained run")
+    parser.add_argument("--cold-prompts", type=int, default=4, help="Prompts run one process each")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Scripted LLM delay per call")
+    parser.add_argument("--api-latency-ms", type=float, default=2.0, help="Stub product API delay per request")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "service.json"))
+    parser.add_argument("--cold-child", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_child:
+        return cold_child(args)
+
+    from configs.crew_service import CrewService, create_server
+
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="service-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer(latency_ms=args.api_latency_ms) as stub:
+        cold = measure_cold(args, stub.base_url)
+
+        factory = functools.partial(offline_crew, stub.base_url, args.llm_latency_ms)
+        service = CrewService(factory, workers=args.workers, queue_size=args.queue_size)
+        start_started = time.perf_counter()
+        with service:
+            startup_s = time.perf_counter() - start_started
+            server = create_server(service, port=0)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address[:2]
+            service_url = f"http://{host}:{port}"
+            try:
+                sustained = measure_service(args, service_url)
+                overload = measure_overload(args, service_url, service.capacity)
+                stats = service.stats()
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    print(
+        f"LLM {args.llm_latency_ms:g} ms/call, API {args.api_latency_ms:g} ms/request; "
+        f"service: {args.workers} workers, queue {args.queue_size}, started in {startup_s:.1f}s\n"
+    )
+    print(f"  {'mode':<28}{'requests':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    for result in (cold, sustained, overload):
+        print(
+            f"  {result['mode']:<28}{result['requests']:>9}{result['throughput_per_s']:>9.2f}"
+            f"{result['latency_ms_p50']:>10.0f}{result['latency_ms_p95']:>10.0f}"
+        )
+    print(f"\nSustained run statuses: {sustained['statuses']}, {sustained['workers_used']} workers used")
+    print(
+        f"Overload: {overload['refused_429']} refused with 429 "
+        f"(p95 {overload['refused_latency_ms_p95'] or 0:.1f} ms), "
+        f"short-deadline request answered {overload['short_deadline_status']} after {overload['short_deadline_latency_ms']:.0f} ms"
+    )
+    print(f"Per-prompt latency: {cold['latency_ms_p50'] / sustained['latency_ms_p50']:.1f}x lower than a process per prompt")
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("cold_child", "base_url")},
+            "startup_s": startup_s,
+            "results": [cold, sustained, overload],
+            "service_stats": stats,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
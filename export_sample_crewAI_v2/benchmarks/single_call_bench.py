@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Single-Call Benchmark - Two-agent crew versus one structured LLM call per prompt
+
+Runs every prompt offline (ScriptedLLM + StubServer, as in e2e_bench.py)
+through ProductConfigurationCrew in each execution mode, one prompt at a time:
+  crew              - analyzer and updater agents (Process.sequential)
+  single_call       - one LLM call answered with JSON, then fetch + update in code
+  single_call (fc)  - the same with a submit_product_update function call
+
+Reports LLM round trips, input/output tokens and latency per prompt, and
+checks the end result: the stub's final product state after each mode must
+equal the crew's.
+
+Usage:
+  python benchmarks/single_call_bench.py [--prompts 16] [--llm-latency-ms 200] [--api-latency-ms 5]
+                                         [--output benchmarks/results/single_call.json]
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS, percentile
+from benchmarks.scripted_llm import ScriptedLLM
+from benchmarks.stub_product_api import StubServer
+from configs.crew_configuration import ProductConfigurationCrew
+from instrumentation.recorder import configure_instrumentation
+from tools import http_client
+from tools.config_cache import product_config_cache
+
+MODES = [
+    ("crew", "crew", False),
+    ("single_call", "single_call", False),
+    ("single_call (fc)", "single_call", True),
+]
+
+
+def measure_mode(label: str, execution_mode: str, function_calling: bool, prompts: List[str], args, server: StubServer) -> Dict[str, Any]:
+    llm = ScriptedLLM(latency_ms=args.llm_latency_ms, function_calling=function_calling)
+    crew = ProductConfigurationCrew("sk-offline", fast_path=False, llm=llm, memory=False, execution_mode=execution_mode)
+
+    records: List[Dict[str, Any]] = []
+    instrumentation = configure_instrumentation()
+    instrumentation.add_sink(records.append)
+
+    server.api.reset()
+    product_config_cache.clear()
+    latencies = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for prompt in prompts:
+            started = time.perf_counter()
+            crew.run(prompt)
+            latencies.append(time.perf_counter() - started)
+    instrumentation.sinks.remove(records.append)
+
+    llm_records = [record for record in records if record["type"] == "llm_call"]
+    return {
+        "mode": label,
+        "execution_mode": execution_mode,
+        "function_calling": function_calling,
+        "prompts": len(prompts),
+        "llm_calls_per_prompt": llm.calls / len(prompts),
+        "tokens_in_per_prompt": sum(record["tokens_in"] for record in llm_records) / len(prompts),
+        "tokens_out_per_prompt": sum(record["tokens_out"] for record in llm_records) / len(prompts),
+        "latency_ms_mean": statistics.mean(latencies) * 1000,
+        "latency_ms_p95": percentile(sorted(latencies), 0.95) * 1000,
+        "updates_applied": server.api.counts["update"],
+        "searches": server.api.counts["search"],
+        "single_call": crew.single_call_stats.snapshot() if crew.single_call is not None else None,
+        "final_products": copy.deepcopy(server.api.products),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=2 * len(PROMPTS), help="Prompts per mode")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Scripted LLM delay per call")
+    parser.add_argument("--api-latency-ms", type=float, default=5.0, help="Stub product API delay per request")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "single_call.json"))
+    args = parser.parse_args()
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="single-call-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer(latency_ms=args.api_latency_ms) as server:
+        http_client.configure(base_url=server.base_url)
+        modes = [measure_mode(label, mode, fc, prompts, args, server) for label, mode, fc in MODES]
+
+    print(f"{args.prompts} prompts per mode, LLM {args.llm_latency_ms:g} ms/call, API {args.api_latency_ms:g} ms/request\n")
+    columns = [
+        ("llm_calls_per_prompt", "llm calls"),
+        ("tokens_in_per_prompt", "tokens in"),
+        ("tokens_out_per_prompt", "tokens out"),
+        ("latency_ms_mean", "mean ms"),
+        ("latency_ms_p95", "p95 ms"),
+        ("updates_applied", "updates"),
+    ]
+    print(f"  {'mode':<18}" + "".join(f"{label:>12}" for _, label in columns) + "  same result")
+    crew_mode = modes[0]
+    for mode in modes:
+        mode["same_result"] = mode["final_products"] == crew_mode["final_products"]
+        print(f"  {mode['mode']:<18}" + "".join(f"{mode[key]:>12.1f}" for key, _ in columns) + f"  {mode['same_result']}")
+
+    single = modes[1]
+    print(
+        f"\nsingle_call: {single['llm_calls_per_prompt'] / crew_mode['llm_calls_per_prompt']:.0%} of the crew's LLM round trips, "
+        f"{crew_mode['latency_ms_mean'] / single['latency_ms_mean']:.1f}x faster per prompt"
+    )
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": vars(args),
+            "modes": [{k: v for k, v in mode.items() if k != "final_products"} for mode in modes],
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0 if all(mode["same_result"] for mode in modes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Startup Budget Check - Fails when lightweight CLI commands get slow or start importing CrewAI
+
+Run from export_sample_crewAI_v2/:
+
+    python benchmarks/startup_budget.py [--help-budget 0.5] [--updater-budget 1.5] [--runs 3]
+
+Each command is run --runs times in a fresh interpreter under -X importtime;
+the best wall time is compared with its budget. test_updater is pointed at a
+closed local port so only startup and the refused connections are timed.
+Exits non-zero when a command is over budget or imports a forbidden module.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that only the crew code paths may load
+FORBIDDEN_PREFIXES = ("crewai", "crewai_tools", "litellm", "chromadb", "httpx")
+
+
+def run_command(args: List[str]) -> Tuple[float, int, List[str]]:
+    env = dict(os.environ)
+    env["PRODUCT_API_BASE_URL"] = "http://127.0.0.1:9"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            modules.append(line.rsplit("|", 1)[1].strip())
+    return elapsed, completed.returncode, modules
+
+
+def check(name: str, args: List[str], budget: float, runs: int) -> Dict[str, object]:
+    best = float("inf")
+    returncode = 0
+    modules: List[str] = []
+    for _ in range(runs):
+        elapsed, returncode, modules = run_command(args)
+        best = min(best, elapsed)
+
+    forbidden = sorted({m for m in modules if m.split(".")[0] in FORBIDDEN_PREFIXES})
+    return {
+        "command": name,
+        "best_s": best,
+        "budget_s": budget,
+        "modules": len(modules),
+        "forbidden": forbidden,
+        "returncode": returncode,
+        "ok": best <= budget and not forbidden and returncode == 0,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--help-budget", type=float, default=0.5, help="Seconds allowed for main.py --help")
+    parser.add_argument("--updater-budget", type=float, default=1.5, help="Seconds allowed for main.py test_updater")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per command (best is kept)")
+    args = parser.parse_args()
+
+    results = [
+        check("--help", ["--help"], args.help_budget, args.runs),
+        check("test_updater", ["test_updater"], args.updater_budget, args.runs),
+    ]
+
+    for result in results:
+        status = "OK  " if result["ok"] else "FAIL"
+        print(
+            f"{status} main.py {result['command']:<13} {result['best_s']:.3f}s "
+            f"(budget {result['budget_s']:.3f}s, {result['modules']} modules imported)"
+        )
+        if result["returncode"] != 0:
+            print(f"     exited with status {result['returncode']}")
+        if result["forbidden"]:
+            print(f"     forbidden imports: {', '.join(result['forbidden'][:10])}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
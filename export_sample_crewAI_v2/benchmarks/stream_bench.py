@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Stream Benchmark - First-event latency of run_stream()/astream() versus end-to-end latency of run()
+
+Runs every prompt offline (ScriptedLLM + StubServer, as in e2e_bench.py)
+through ProductConfigurationCrew.run_stream() and astream() on each
+execution path:
+  fast_path    - parseable prompts, no LLM call
+  single_call  - one structured LLM call, then fetch + update in code
+  crew         - analyzer and updater agents
+
+Reports when each event type arrives (ms since the run started, mean over
+prompts) next to the time of the final result, which is all run() shows.
+Each run must end with exactly one FinalResult and leave the stub's
+products in the same state as run() does for that prompt.
+
+Usage:
+  python benchmarks/stream_bench.py [--prompts 16] [--llm-latency-ms 200] [--api-latency-ms 5]
+                                    [--output benchmarks/results/stream.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import copy
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS
+from benchmarks.scripted_llm import ScriptedLLM
+from benchmarks.stub_product_api import StubServer
+from configs.crew_configuration import ProductConfigurationCrew
+from instrumentation.run_events import FinalResult
+from tools import http_client
+from tools.config_cache import product_config_cache
+
+# (label, fast_path, execution_mode)
+PATHS = [
+    ("fast_path", True, "crew"),
+    ("single_call", False, "single_call"),
+    ("crew", False, "crew"),
+]
+
+
+def collect_sync(crew: ProductConfigurationCrew, prompt: str) -> List[Any]:
+    return list(crew.run_stream(prompt))
+
+
+def collect_async(crew: ProductConfigurationCrew, prompt: str) -> List[Any]:
+    async def consume():
+        return [event async for event in crew.astream(prompt)]
+
+    return asyncio.run(consume())
+
+
+def measure(label: str, fast_path: bool, execution_mode: str, api: str, prompts: List[str], args, server: StubServer) -> Dict[str, Any]:
+    llm = ScriptedLLM(latency_ms=args.llm_latency_ms)
+    crew = ProductConfigurationCrew("sk-offline", fast_path=fast_path, llm=llm, memory=False, execution_mode=execution_mode)
+    collect = collect_sync if api == "run_stream" else collect_async
+
+    arrivals: Dict[str, List[float]] = {}
+    first_event, total, mismatches, paths = [], [], 0, set()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for prompt in prompts:
+            server.api.reset()
+            product_config_cache.clear()
+            started = time.perf_counter()
+            events = collect(crew, prompt)
+            total.append((time.perf_counter() - started) * 1000)
+            first_event.append(events[0].elapsed_ms)
+            for event in events:
+                arrivals.setdefault(event.type, []).append(event.elapsed_ms)
+
+            final = [event for event in events if isinstance(event, FinalResult)]
+            streamed = copy.deepcopy(server.api.products)
+            server.api.reset()
+            product_config_cache.clear()
+            crew.run(prompt)
+            if len(final) != 1 or events[-1] is not final[0] or streamed != server.api.products:
+                mismatches += 1
+            else:
+                paths.add(final[0].path)
+
+    return {
+        "path": label,
+        "api": api,
+        "prompts": len(prompts),
+        "executed_as": sorted(paths),
+        "first_event_ms_mean": statistics.mean(first_event),
+        "final_result_ms_mean": statistics.mean(arrivals.get("final_result", [0.0])),
+        "total_ms_mean": statistics.mean(total),
+        "event_ms_mean": {kind: statistics.mean(times) for kind, times in arrivals.items()},
+        "events_per_prompt": {kind: len(times) / len(prompts) for kind, times in arrivals.items()},
+        "mismatches": mismatches,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=2 * len(PROMPTS), help="Prompts per path and API")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="Scripted LLM delay per call")
+    parser.add_argument("--api-latency-ms", type=float, default=5.0, help="Stub product API delay per request")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "stream.json"))
+    args = parser.parse_args()
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="stream-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer(latency_ms=args.api_latency_ms) as server:
+        http_client.configure(base_url=server.base_url)
+        results = [
+            measure(label, fast_path, mode, api, prompts, args, server)
+            for label, fast_path, mode in PATHS
+            for api in ("run_stream", "astream")
+        ]
+
+    print(f"{args.prompts} prompts per path, LLM {args.llm_latency_ms:g} ms/call, API {args.api_latency_ms:g} ms/request")
+    print("Mean arrival of each event, ms since the run started\n")
+    kinds = ["product_resolved", "config_fetched", "updates_parsed", "update_posted", "final_result"]
+    print(f"  {'path':<12}{'api':<11}" + "".join(f"{kind:>17}" for kind in kinds) + "  first/final")
+    for result in results:
+        cells = "".join(
+            f"{result['event_ms_mean'][kind]:>17.1f}" if kind in result["event_ms_mean"] else f"{'-':>17}" for kind in kinds
+        )
+        ratio = result["first_event_ms_mean"] / result["final_result_ms_mean"]
+        print(f"  {result['path']:<12}{result['api']:<11}{cells}  {ratio:>10.0%}")
+
+    mismatches = sum(result["mismatches"] for result in results)
+    print(f"\nRuns ending differently from run(): {mismatches}")
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": vars(args),
+            "results": results,
+        }, output, indent=2)
+    print(f"Results written to {output_path}")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Structured Output Benchmark - Agent iterations and LLM calls per prompt with a clean and a drifting model
+
+Runs the crew offline (ScriptedLLM + StubServer, as in e2e_bench.py) twice:
+  clean  - the model answers in the exact analysis JSON format
+  drift  - the model wraps the JSON in prose and a code fence, writes "null"
+           strings, a JSON-string extension and a percentage confidence, and
+           passes the same placeholders to ProductConfigUpdaterTool
+
+Reports LLM calls and agent iterations per prompt (instrumentation records)
+and the structured output counters: outputs taken as-is, repaired in-process,
+converted by the LLM or rejected, repaired tool arguments, and the LLM calls
+and iterations those repairs saved. Both runs must leave the stub with the
+same final product state.
+
+Usage:
+  python benchmarks/structured_output_bench.py [--prompts 16] [--output benchmarks/results/structured_output.json]
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.e2e_bench import PROMPTS
+from benchmarks.scripted_llm import ScriptedLLM
+from benchmarks.stub_product_api import StubServer
+from configs.crew_configuration import ProductConfigurationCrew
+from instrumentation.recorder import configure_instrumentation
+from tasks.schemas import structured_output_stats
+from tools import http_client
+from tools.config_cache import product_config_cache
+
+
+def measure(label: str, drift: bool, prompts: List[str], server: StubServer) -> Dict[str, Any]:
+    llm = ScriptedLLM(drift=drift)
+    crew = ProductConfigurationCrew("sk-offline", fast_path=False, llm=llm, memory=False)
+
+    records: List[Dict[str, Any]] = []
+    instrumentation = configure_instrumentation()
+    instrumentation.add_sink(records.append)
+
+    server.api.reset()
+    product_config_cache.clear()
+    structured_output_stats.reset()
+    failures = 0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for prompt in prompts:
+            try:
+                crew.run(prompt)
+            except Exception:
+                failures += 1
+    instrumentation.sinks.remove(records.append)
+
+    tasks = [record for record in records if record["type"] == "task"]
+    return {
+        "mode": label,
+        "prompts": len(prompts),
+        "failures": failures,
+        "llm_calls_per_prompt": llm.calls / len(prompts),
+        "iterations_per_prompt": sum(task["iterations"] for task in tasks) / len(prompts),
+        "task_runs_per_prompt": len(tasks) / len(prompts),
+        "updates_applied": server.api.counts["update"],
+        "rejected_updates": server.api.counts["rejected"],
+        "structured_output": structured_output_stats.snapshot(),
+        "final_products": copy.deepcopy(server.api.products),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prompts", type=int, default=2 * len(PROMPTS), help="Prompts per mode")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "structured_output.json"))
+    args = parser.parse_args()
+
+    prompts = [PROMPTS[i % len(PROMPTS)] for i in range(args.prompts)]
+    output_path = os.path.abspath(args.output)
+    workdir = tempfile.mkdtemp(prefix="structured-output-bench-")
+    shutil.copy(os.path.join(ROOT, "configs", "sample_products.txt"), os.path.join(workdir, "products.txt"))
+    os.chdir(workdir)
+
+    with StubServer() as server:
+        http_client.configure(base_url=server.base_url)
+        modes = [measure("clean", False, prompts, server), measure("drift", True, prompts, server)]
+
+    print(f"{args.prompts} prompts per mode\n")
+    columns = [
+        ("llm_calls_per_prompt", "llm calls"),
+        ("iterations_per_prompt", "iterations"),
+        ("task_runs_per_prompt", "task runs"),
+        ("updates_applied", "updates"),
+        ("failures", "failures"),
+    ]
+    print(f"  {'mode':<8}" + "".join(f"{label:>12}" for _, label in columns) + "  same result")
+    for mode in modes:
+        mode["same_result"] = mode["final_products"] == modes[0]["final_products"]
+        print(f"  {mode['mode']:<8}" + "".join(f"{mode[key]:>12.2f}" for key, _ in columns) + f"  {mode['same_result']}")
+
+    for mode in modes:
+        stats = mode["structured_output"]
+        print(
+            f"\n{mode['mode']}: outputs exact {stats['outputs_exact']}, repaired {stats['outputs_repaired']}, "
+            f"LLM-converted {stats['outputs_llm_converted']}, rejected {stats['outputs_rejected']}; "
+            f"tool calls {stats['tool_calls']}, arguments repaired {stats['tool_arguments_repaired']}; "
+            f"saved {stats['llm_calls_saved_per_output']:.2f} LLM calls per prompt"
+        )
+
+    os.chdir(ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as output:
+        json.dump({
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "settings": vars(args),
+            "modes": [{k: v for k, v in mode.items() if k != "final_products"} for mode in modes],
+        }, output, indent=2)
+    print(f"\nResults written to {output_path}")
+    return 0 if all(mode["same_result"] and not mode["failures"] for mode in modes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
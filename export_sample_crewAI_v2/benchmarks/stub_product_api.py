@@ -0,0 +1,365 @@
+"""
+Stub Product API - In-process Python stand-in for mock-api-server.js
+
+Serves the endpoints the tools call, with the same products, CONFIG
+validation and response shapes as the Node mock server:
+
+    GET  /api/search?q=<text>[&max_results=<n>]
+    GET  /api/products/name/<name>/schema   (allowed values per field)
+    POST /api/products/name/<name>
+
+plus an optional bulk endpoint the Node server does not have, which applies
+each update in order exactly like the per-product endpoint:
+
+    POST /api/products/bulk  {"updates": [{"name": ..., "section": ..., ...}]}
+      -> {"success": true, "results": [{"name": ..., "status": 200, "body": {...}}]}
+
+Like the mock server, an update is applied before it is validated, so a
+rejected update still changes the stored product. Every request can be
+delayed by latency_ms to model network and server time.
+"""
+
+import copy
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+CONFIG = {
+    "TRE TreMoon Shop": {
+        "sections": ["ABC", "XYZ", "PQR", "STU", "VWX"],
+        "subsection": ["TRE", "MOO", "SHO"],
+        "coverages": ["AKH", "SVT", "SAEL", "QWER", "ZXCV"],
+        "extensions": {
+            "code1": ["T001", "T002", "T003", "T004", "T005"],
+            "code2": ["TR01", "TR02", "TR03", "TR04", "TR05"],
+            "code3": ["TRE1", "TRE2", "TRE3", "TRE4", "TRE5"],
+        },
+    },
+    "BIL Billon SASKC": {
+        "sections": ["DEF", "RST", "UVW", "YZA", "BCD"],
+        "subsection": ["BIL", "LON", "SAS"],
+        "coverages": ["MNBV", "HJKL", "TYUI", "DFGH", "POIU"],
+        "extensions": {
+            "code1": ["B001", "B002", "B003", "B004", "B005"],
+            "code2": ["BL01", "BL02", "BL03", "BL04", "BL05"],
+            "code3": ["BIL1", "BIL2", "BIL3", "BIL4", "BIL5"],
+        },
+    },
+    "GAM GameZone Pro": {
+        "sections": ["GHI", "EFG", "HIJ", "KLM", "NOP"],
+        "subsection": ["GAM", "ZON", "PRO"],
+        "coverages": ["LKJH", "GFDS", "WERT", "VCXZ", "NBMQ"],
+        "extensions": {
+            "code1": ["G001", "G002", "G003", "G004", "G005"],
+            "code2": ["GM01", "GM02", "GM03", "GM04", "GM05"],
+            "code3": ["GAM1", "GAM2", "GAM3", "GAM4", "GAM5"],
+        },
+    },
+    "MED MediCare Plus": {
+        "sections": ["JKL", "QRS", "TUV", "WXY", "ZAB"],
+        "subsection": ["MED", "CAR", "PLU"],
+        "coverages": ["PLMN", "OKIJ", "UHYG", "RFED", "WSAQ"],
+        "extensions": {
+            "code1": ["M001", "M002", "M003", "M004", "M005"],
+            "code2": ["MD01", "MD02", "MD03", "MD04", "MD05"],
+            "code3": ["MED1", "MED2", "MED3", "MED4", "MED5"],
+        },
+    },
+    "EDU EduTech Solutions": {
+        "sections": ["MNO", "CDE", "FGH", "IJK", "LMN"],
+        "subsection": ["EDU", "TEC", "SOL"],
+        "coverages": ["XZAQ", "CVER", "BNMT", "YUIO", "HGJK"],
+        "extensions": {
+            "code1": ["E001", "E002", "E003", "E004", "E005"],
+            "code2": ["ED01", "ED02", "ED03", "ED04", "ED05"],
+            "code3": ["EDU1", "EDU2", "EDU3", "EDU4", "EDU5"],
+        },
+    },
+}
+
+INITIAL_PRODUCTS = [
+    (1, "TRE TreMoon Shop", "ABC", "TRE", "AKH", ("T001", "TR01", "TRE1")),
+    (2, "BIL Billon SASKC", "DEF", "BIL", "MNBV", ("B001", "BL01", "BIL1")),
+    (3, "GAM GameZone Pro", "GHI", "GAM", "LKJH", ("G001", "GM01", "GAM1")),
+    (4, "MED MediCare Plus", "JKL", "MED", "PLMN", ("M001", "MD01", "MED1")),
+    (5, "EDU EduTech Solutions", "MNO", "EDU", "XZAQ", ("E001", "ED01", "EDU1")),
+]
+
+
+def initial_products() -> List[Dict[str, Any]]:
+    """Returns a fresh copy of the mock server's product table"""
+
+    return [
+        {
+            "id": product_id,
+            "name": name,
+            "section": section,
+            "subsection": subsection,
+            "coverage": coverage,
+            "extension": {"code1": codes[0], "code2": codes[1], "code3": codes[2]},
+        }
+        for product_id, name, section, subsection, coverage, codes in INITIAL_PRODUCTS
+    ]
+
+
+def _matches(product: Dict[str, Any], text: str) -> bool:
+    fields = [product["name"], product["section"], product["subsection"], product["coverage"]]
+    fields.extend(product["extension"].values())
+    return any(text in field.lower() for field in fields)
+
+
+def _validation_error(product: Dict[str, Any], body: Dict[str, Any]) -> Optional[str]:
+    config = CONFIG.get(product["name"])
+    if config is None:
+        return None
+
+    name = product["name"]
+    checks = [
+        ("section", body.get("section"), config["sections"], "Valid sections"),
+        ("subsection", body.get("subsection"), config["subsection"], "Valid subsection"),
+        ("coverage", body.get("coverage"), config["coverages"], "Valid coverages"),
+    ]
+    for field, value, valid, label in checks:
+        if value and value not in valid:
+            return f"Invalid {field} '{value}' for product '{name}'. {label}: {', '.join(valid)}"
+
+    extension = body.get("extension") or {}
+    for code in ("code1", "code2", "code3"):
+        value = extension.get(code)
+        valid = config["extensions"][code]
+        if value and value not in valid:
+            return f"Invalid extension {code} '{value}' for product '{name}'. Valid {code}: {', '.join(valid)}"
+    return None
+
+
+def _change(before: Any, after: Any) -> Optional[Dict[str, Any]]:
+    return {"from": before, "to": after} if before != after else None
+
+
+class StubProductAPI:
+    """
+    Product store and request counters behind the stub HTTP server.
+
+    All mutations go through one lock, so concurrent updates behave like
+    the single-threaded Node server.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Restores the initial products and clears the counters"""
+
+        with self._lock:
+            self.products = initial_products()
+            self.counts = {"search": 0, "update": 0, "rejected": 0, "not_found": 0, "bulk": 0, "schema": 0}
+
+    def search(self, query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any]]:
+        text = query.get("q", [""])[0]
+        if not text:
+            return 400, {"success": False, "error": "Search query (q) is required"}
+
+        with self._lock:
+            self.counts["search"] += 1
+            results = [p for p in self.products if _matches(p, text.lower())]
+            if "max_results" in query:
+                results = results[:int(query["max_results"][0])]
+            products = [{k: copy.deepcopy(v) for k, v in p.items() if k != "id"} for p in results]
+        return 200, {"success": True, "products": products}
+
+    def schema(self, name: str) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            self.counts["schema"] += 1
+        # Products without a CONFIG entry are not validated: allowed is null
+        config = CONFIG.get(name)
+        allowed = None if config is None else {
+            "section": config["sections"],
+            "subsection": config["subsection"],
+            "coverage": config["coverages"],
+            "extension": config["extensions"],
+        }
+        return 200, {"success": True, "name": name, "allowed": allowed}
+
+    def update(self, name: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            product = next((p for p in self.products if p["name"] == name), None)
+            if product is None:
+                self.counts["not_found"] += 1
+                return 404, {"success": False, "error": f"Product with name '{name}' not found"}
+
+            original = copy.deepcopy(product)
+            for field in ("section", "subsection", "coverage"):
+                if body.get(field) is not None:
+                    product[field] = body[field]
+            for code, value in (body.get("extension") or {}).items():
+                if code in product["extension"] and value is not None:
+                    product["extension"][code] = value
+
+            error = _validation_error(product, body)
+            if error is not None:
+                self.counts["rejected"] += 1
+                return 400, {"success": False, "error": error}
+
+            self.counts["update"] += 1
+            return 200, {
+                "success": True,
+                "message": f"Product '{name}' updated successfully",
+                "product": copy.deepcopy(product),
+                "changes": {
+                    "section": _change(original["section"], product["section"]),
+                    "subsection": _change(original["subsection"], product["subsection"]),
+                    "coverage": _change(original["coverage"], product["coverage"]),
+                    "extension": {
+                        code: _change(original["extension"][code], product["extension"][code])
+                        for code in ("code1", "code2", "code3")
+                    },
+                },
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+
+    def bulk_update(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        updates = body.get("updates")
+        if not isinstance(updates, list):
+            return 400, {"success": False, "error": "Body must be {\"updates\": [...]}"}
+
+        with self._lock:
+            self.counts["bulk"] += 1
+        results = []
+        for update in updates:
+            fields = {key: value for key, value in update.items() if key != "name"}
+            status, response = self.update(update.get("name", ""), fields)
+            results.append({"name": update.get("name"), "status": status, "body": response})
+        return 200, {"success": True, "results": results}
+
+
+def _make_handler(api: StubProductAPI, bulk_endpoint: bool, schema_endpoint: bool):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; without TCP_NODELAY every
+        # keep-alive response waits ~40ms for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _delay(self) -> None:
+            if api.latency_ms > 0:
+                time.sleep(api.latency_ms / 1000)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            self._delay()
+            prefix, suffix = "/api/products/name/", "/schema"
+            if url.path == "/api/search":
+                self._send(*api.search(parse_qs(url.query)))
+            elif schema_endpoint and url.path.startswith(prefix) and url.path.endswith(suffix):
+                self._send(*api.schema(unquote(url.path[len(prefix):-len(suffix)])))
+            else:
+                self._send(404, {"success": False, "error": f"Unknown endpoint {url.path}"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get("Content-Length", 0))
+            raw = self.rfile.read(length) if length else b""
+            self._delay()
+
+            prefix = "/api/products/name/"
+            bulk = bulk_endpoint and url.path == "/api/products/bulk"
+            if not bulk and not url.path.startswith(prefix):
+                self._send(404, {"success": False, "error": f"Unknown endpoint {url.path}"})
+                return
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                self._send(400, {"success": False, "error": "Invalid JSON body"})
+                return
+            if bulk:
+                self._send(*api.bulk_update(body))
+            else:
+                self._send(*api.update(unquote(url.path[len(prefix):]), body))
+
+    return Handler
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connects from concurrent clients
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubServer:
+    """
+    Runs a StubProductAPI on a background thread
+
+    Usage:
+        with StubServer(latency_ms=5) as server:
+            http_client.configure(base_url=server.base_url)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        bulk_endpoint: bool = True,
+        schema_endpoint: bool = True,
+    ):
+        self.api = StubProductAPI(latency_ms=latency_ms)
+        self._server = _StubHTTPServer((host, port), _make_handler(self.api, bulk_endpoint, schema_endpoint))
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the stub product API")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-bulk", action="store_true", help="Answer 404 on /api/products/bulk like the Node server")
+    parser.add_argument("--no-schema", action="store_true", help="Answer 404 on /api/products/name/<name>/schema")
+    args = parser.parse_args()
+
+    server = StubServer(
+        port=args.port,
+        latency_ms=args.latency_ms,
+        bulk_endpoint=not args.no_bulk,
+        schema_endpoint=not args.no_schema,
+    )
+    print(f"Stub product API running at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Warm Crew Benchmark - Per-call setup cost of cold crew construction versus the warm runtime pool
+
+Measures only setup (no kickoff, no LLM calls), so it runs offline:
+  rebuild     - new ProductConfigurationCrew + create_crew() per prompt (one prompt per process)
+  create_crew - create_crew() per prompt (previous ProductConfigurationCrew.run behaviour)
+  warm        - lease a crew from WarmCrewRuntime (current run/arun behaviour)
+
+Usage: python benchmarks/warm_crew_bench.py [iterations]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from configs.crew_configuration import ProductConfigurationCrew
+
+
+def measure(label, setup, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        setup()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:>12}: mean {statistics.mean(samples):8.3f} ms  p50 {statistics.median(samples):8.3f} ms  max {max(samples):8.3f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    api_key = os.environ["OPENAI_API_KEY"]
+
+    crew = ProductConfigurationCrew(api_key)
+    crew.runtime.warm_up(1)
+
+    def warm_lease():
+        with crew.runtime.lease():
+            pass
+
+    rebuild = measure("rebuild", lambda: ProductConfigurationCrew(api_key).create_crew(), iterations)
+    cold = measure("create_crew", crew.create_crew, iterations)
+    warm = measure("warm", warm_lease, iterations)
+
+    print(f"\nSetup removed per call: {cold - warm:.3f} ms vs create_crew, {rebuild - warm:.3f} ms vs rebuild")
+    print(f"Runtime stats: {crew.runtime.stats()}")
+    print(
+        "Note: with a configured crew embedder, every cold Crew construction also makes one "
+        "embedding round trip to validate it; the warm pool pays that once per process."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Batch Runner - Bounded-concurrency execution of many update prompts with streaming results
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+def read_prompts(path: str) -> Iterator[str]:
+    """
+    Reads update prompts from a JSONL file, one per line
+
+    Each line is either a JSON object with a "prompt" key or a bare JSON
+    string. Blank lines are skipped.
+
+    Args:
+        path: Path to the input JSONL file
+
+    Yields:
+        Prompt strings in file order
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                yield record
+            elif isinstance(record, dict) and "prompt" in record:
+                yield record["prompt"]
+            else:
+                raise ValueError(f"{path}:{line_number}: expected a JSON string or an object with a 'prompt' key")
+
+
+async def run_concurrently(
+    run_one: Callable[[str], Awaitable[Any]],
+    prompts: Iterable[str],
+    concurrency: int = 8,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs prompts through run_one with at most `concurrency` in flight
+
+    Prompts are pulled lazily from the iterable, so arbitrarily large inputs
+    are never fully materialized. Results are yielded in completion order.
+
+    Args:
+        run_one: Coroutine function executing a single prompt
+        prompts: Iterable of prompt strings
+        concurrency: Maximum number of prompts in flight
+
+    Yields:
+        Result records with index, prompt, result, error and latency_s
+
+    Raises:
+        Exception: Whatever the prompts iterable raised (e.g. read_prompts on a
+            malformed line), once the prompts already in flight have finished
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    source = iter(enumerate(prompts))
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    done = object()
+
+    async def worker():
+        # Every worker ends by putting (done, error), so the consumer never waits for
+        # a worker that stopped early; error is what the prompts iterable raised
+        error = None
+        try:
+            for index, prompt in source:
+                started = time.perf_counter()
+                record = {"index": index, "prompt": prompt, "result": None, "error": None}
+                try:
+                    record["result"] = str(await run_one(prompt))
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                record["latency_s"] = time.perf_counter() - started
+                await results.put(record)
+        except Exception as e:
+            error = e
+        finally:
+            if not cancelled:
+                await results.put((done, error))
+
+    cancelled = False
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        remaining = len(workers)
+        failure = None
+        while remaining:
+            record = await results.get()
+            if isinstance(record, tuple) and record[0] is done:
+                remaining -= 1
+                failure = failure or record[1]
+            else:
+                yield record
+        # The source is finished after raising, so the other workers ran out of prompts
+        if failure is not None:
+            raise failure
+    finally:
+        # The consumer is gone; cancelled workers must not wait to put their done marker
+        cancelled = True
+        for task in workers:
+            task.cancel()
+
+
+class BatchSummary:
+    """
+    Accumulates per-prompt outcomes into a throughput and latency report
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.latencies: List[float] = []
+        self.failed = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.latencies.append(record["latency_s"])
+        if record["error"] is not None:
+            self.failed += 1
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        total = len(self.latencies)
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return ordered[min(int(p * total), total - 1)]
+
+        return {
+            "total": total,
+            "succeeded": total - self.failed,
+            "failed": self.failed,
+            "elapsed_s": elapsed,
+            "throughput_per_s": total / elapsed if elapsed > 0 else 0.0,
+            "latency_p50_s": percentile(0.50),
+            "latency_p95_s": percentile(0.95),
+            "latency_max_s": ordered[-1] if ordered else None,
+        }
+
+
+# Stats fields that are levels or maxima rather than running totals; reported as they stand
+STATS_GAUGES = frozenset({"entries", "max_entries", "index_terms", "largest_batch"})
+
+# Ratios recomputed from the counter differences: field -> (numerator, denominator)
+STATS_RATIOS = {
+    "hit_rate": ("hits", "attempts"),
+    "recall_rate": ("recalls", "searches"),
+    "llm_calls_saved_per_output": ("llm_calls_saved", "outputs"),
+}
+
+
+def stats_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The part of a stats snapshot accumulated between two snapshots
+
+    The crew's counters (fast path, single call, structured output, update
+    diff, coalescing, memory) run for the crew's lifetime; a batch reports
+    only what it added.
+
+    Args:
+        before: Snapshot taken when the batch started
+        after: Snapshot taken when it finished (nested dicts are compared field by field)
+
+    Returns:
+        after with every counter replaced by its increase and the ratios
+        recomputed from those increases
+    """
+
+    delta = {}
+    for key, value in after.items():
+        if isinstance(value, dict):
+            delta[key] = stats_delta(before.get(key) or {}, value)
+        elif isinstance(value, int) and not isinstance(value, bool) and key not in STATS_GAUGES:
+            delta[key] = value - before.get(key, 0)
+        else:
+            delta[key] = value
+    for key, (numerator, denominator) in STATS_RATIOS.items():
+        if key in delta and numerator in delta and denominator in delta:
+            delta[key] = delta[numerator] / delta[denominator] if delta[denominator] else 0.0
+    return delta
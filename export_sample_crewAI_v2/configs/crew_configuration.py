@@ -3,8 +3,17 @@ Crew Configuration v2 - Main crew setup and orchestration with extension support
 """
 
 import os
-from crewai import Agent, Crew, Process, LLM
-from crewai_tools import FileReadTool
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Callable, ContextManager, Dict, Iterable, Iterator, Optional, Tuple
+from crewai import BaseLLM, Crew, Process
+
+# Import LLM factory
+from llm.factory import DETERMINISTIC_SETTINGS, create_llm, resolve_cache, resolve_cassette
 
 # Import agents
 from agents.product_analyzer_agent import create_product_analyzer_agent
@@ -14,6 +23,43 @@ from agents.product_updater_agent import create_product_updater_agent
 from tasks.analysis_task import create_analysis_task
 from tasks.update_task import create_update_task
 
+# Import deterministic fast path
+from tasks.prompt_parser import FastPathStats, candidate_products, parse_update_prompt, updater_arguments
+from tools.config_updater_tool import update_product_config
+from tools.update_diff import run_scope, update_diff_stats
+from tools.coalescing import coalescing_stats
+from tasks.schemas import AnalysisResult, structured_output_stats
+
+# Import batch helpers
+from configs.batch_runner import BatchSummary, run_concurrently, stats_delta
+
+# Import warm crew pool
+from configs.crew_runtime import WarmCrewRuntime
+
+# Import single-call execution
+from configs.single_call import SingleCallUpdater
+
+# Import durable job queue
+from configs.job_store import JobStore, run_jobs
+
+# Import memory backends
+from configs.crew_memory import MEMORY_BACKENDS, crew_memory_options, memory_subjects
+
+# Import instrumentation
+from instrumentation.recorder import configure_instrumentation, instrumentation_from_env
+from instrumentation import run_events
+from instrumentation.run_events import FinalResult, ProductResolved, RunEvent, RunFailed, UpdatesParsed
+
+# Crew time budget per kickoff, in seconds
+MAX_EXECUTION_TIME = 300
+
+# Task/agent prompt variants: "full" (original wording) or "compact" (token-budgeted)
+PROMPT_MODES = ("full", "compact")
+
+# How prompts the fast path cannot parse are executed: "crew" (analyzer and
+# updater agents) or "single_call" (one structured LLM call plus direct tool calls)
+EXECUTION_MODES = ("crew", "single_call")
+
 
 class ProductConfigurationCrew:
     """
@@ -24,29 +70,121 @@ class ProductConfigurationCrew:
     2. Product Updater - Applies configuration updates for all fields including extension codes
     
     v2 Enhancement: Added support for extension code updates (code1, code2, code3)
+
+    Prompts that follow the documented grammar exactly are parsed locally and
+    sent straight to the updater tool (fast path); only the rest go to the crew,
+    or in single_call execution mode to one structured LLM call (falling back
+    to the crew when its answer is unusable).
     """
 
-    def __init__(self, openai_api_key: str):
+    def __init__(
+        self,
+        openai_api_key: str,
+        fast_path: bool = True,
+        llm_cache: Optional[str] = None,
+        pool_size: int = 8,
+        llm: Optional[BaseLLM] = None,
+        memory: Optional[bool] = None,
+        cassette: Optional[str] = None,
+        cassette_mode: Optional[str] = None,
+        metrics_jsonl: Optional[str] = None,
+        metrics_port: Optional[int] = None,
+        prompt_mode: Optional[str] = None,
+        execution_mode: Optional[str] = None,
+        memory_backend: Any = None,
+    ):
         """
         Initialize the crew with API key and LLM configuration
         
         Args:
             openai_api_key: OpenAI API key for GPT model access
+            fast_path: Handle fully parseable prompts without LLM calls
+            llm_cache: SQLite completion cache path (defaults to LLM_CACHE_PATH;
+                caching is off when neither is set)
+            pool_size: Maximum number of warm crews kept for concurrent kickoffs
+            llm: LLM used by the crew and both agents instead of the OpenAI
+                clients (e.g. a scripted stand-in for offline benchmarks)
+            memory: Enable crew memory; its default embedder calls OpenAI
+                (defaults to CREW_MEMORY, on unless set to "false")
+            cassette: LLM record/replay cassette file (defaults to LLM_CASSETTE_PATH;
+                takes precedence over llm_cache)
+            cassette_mode: "record" or "replay" (defaults to LLM_CASSETTE_MODE, then "replay")
+            metrics_jsonl: Append per-stage instrumentation records to this file
+                (defaults to CREW_METRICS_JSONL)
+            metrics_port: Serve Prometheus metrics on this port (defaults to
+                CREW_METRICS_PORT; instrumentation is off when neither is set)
+            prompt_mode: "full" or "compact" task prompts (defaults to
+                CREW_PROMPT_MODE, then "full"); compact injects candidate
+                products instead of reading the product file and returns
+                minified tool results, with the same output contract
+            execution_mode: "crew" or "single_call" (defaults to
+                CREW_EXECUTION_MODE, then "crew"); single_call replaces the
+                two agent tasks with one structured LLM call, then fetches the
+                config and applies the update in code
+            memory_backend: "crewai" (default memory, with embedder and
+                evaluator calls), "keyword" (bounded in-process keyword store,
+                no embedding calls) or a Storage-like object with save,
+                search and reset (defaults to CREW_MEMORY_BACKEND, then "crewai")
         """
         
         # Set up environment
         os.environ["OPENAI_API_KEY"] = openai_api_key
         
         # Configure LLM
-        self.llm = LLM(model="gpt-4o-mini", temperature=0.1)
+        self.cassette = resolve_cassette(cassette, cassette_mode)
+        self.llm_cache = resolve_cache(llm_cache) if self.cassette is None else None
+        llm_options = {"cache_path": llm_cache, "cassette_path": cassette, "cassette_mode": cassette_mode}
+        self.llm = llm or create_llm(temperature=0.1, **llm_options)
+        if memory is None:
+            memory = os.environ.get("CREW_MEMORY", "true").lower() not in ("0", "false", "no")
+        self.memory = memory
+        if memory_backend is None:
+            memory_backend = (os.environ.get("CREW_MEMORY_BACKEND") or "crewai").lower()
+        if isinstance(memory_backend, str) and memory_backend not in MEMORY_BACKENDS:
+            raise ValueError(f"Unknown memory backend '{memory_backend}', expected one of: {', '.join(MEMORY_BACKENDS)}")
+        self.memory_backend = memory_backend
+        # Built once: the warm crews built from create_crew share the store
+        self.memory_options = crew_memory_options(memory, memory_backend)
+        short_term_memory = self.memory_options.get("short_term_memory")
+        self.memory_storage = short_term_memory.storage if short_term_memory is not None else None
+
+        # Per-stage timings, tokens and tool metrics
+        if metrics_jsonl or metrics_port is not None:
+            self.instrumentation = configure_instrumentation(metrics_jsonl, metrics_port, MAX_EXECUTION_TIME)
+        else:
+            self.instrumentation = instrumentation_from_env(MAX_EXECUTION_TIME)
+        
+        # Prompt variant
+        self.prompt_mode = (prompt_mode or os.environ.get("CREW_PROMPT_MODE") or "full").lower()
+        if self.prompt_mode not in PROMPT_MODES:
+            raise ValueError(f"Unknown prompt mode '{self.prompt_mode}', expected one of: {', '.join(PROMPT_MODES)}")
+        compact = self.prompt_mode == "compact"
+
+        # Execution mode
+        self.execution_mode = (execution_mode or os.environ.get("CREW_EXECUTION_MODE") or "crew").lower()
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode '{self.execution_mode}', expected one of: {', '.join(EXECUTION_MODES)}")
         
         # Create agents
-        self.product_analyzer = create_product_analyzer_agent()
-        self.product_updater = create_product_updater_agent()
+        self.product_analyzer = create_product_analyzer_agent(llm or create_llm(**llm_options, **DETERMINISTIC_SETTINGS), compact)
+        self.product_updater = create_product_updater_agent(llm or create_llm(**llm_options, **DETERMINISTIC_SETTINGS), compact)
         
         # Create tasks
-        self.analysis_task = create_analysis_task(self.product_analyzer)
-        self.update_task = create_update_task(self.product_updater, self.analysis_task)
+        self.analysis_task = create_analysis_task(self.product_analyzer, compact)
+        self.update_task = create_update_task(self.product_updater, self.analysis_task, compact)
+
+        # Fast path configuration
+        self.fast_path = fast_path
+        self.fast_path_stats = FastPathStats()
+
+        # Single-call execution; hits are prompts it handled, fallbacks went to the crew
+        self.single_call = None
+        self.single_call_stats = FastPathStats()
+        if self.execution_mode == "single_call":
+            self.single_call = SingleCallUpdater(llm or create_llm(**llm_options, **DETERMINISTIC_SETTINGS))
+
+        # Warm crews reused by run/arun; built on first use
+        self.runtime = WarmCrewRuntime(self.create_crew, max_size=pool_size)
 
     def create_crew(self) -> Crew:
         """
@@ -67,11 +205,112 @@ class ProductConfigurationCrew:
             ],
             process=Process.sequential,
             verbose=True,
-            memory=True,
-            max_execution_time=300,
+            **self.memory_options,
+            max_execution_time=MAX_EXECUTION_TIME,
             llm=self.llm,
+            task_callback=self._task_finished,
         )
 
+    def _task_finished(self, output: Any) -> None:
+        # Streams the analysis result as soon as the first task is done
+        analysis = getattr(output, "pydantic", None)
+        if isinstance(analysis, AnalysisResult):
+            updates = {field: value for field, value in analysis.requested_updates.model_dump().items() if value is not None}
+            run_events.emit(UpdatesParsed, product_name=analysis.product_name, updates=updates, source="analysis_task")
+
+    def kickoff_inputs(self, user_prompt: str) -> Dict[str, Any]:
+        """
+        Builds the crew kickoff inputs for a prompt
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            {"prompt": ...}, plus "candidates" (the likely products) in compact mode
+        """
+
+        inputs = {"prompt": user_prompt}
+        if self.prompt_mode == "compact":
+            inputs["candidates"] = "; ".join(candidate_products(user_prompt)) or "none found, use the name in the prompt"
+        return inputs
+
+    def parse_fast_path(self, user_prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Try to parse a prompt without the LLM and record the outcome
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            Parsed product name and requested updates, or None to use the crew
+        """
+
+        if not self.fast_path:
+            return None
+
+        parsed = parse_update_prompt(user_prompt)
+        self.fast_path_stats.record(parsed is not None)
+        if parsed is not None and run_events.capturing():
+            arguments = updater_arguments(parsed)
+            product_name = arguments.pop("product_name")
+            run_events.emit(ProductResolved, product_name=product_name, requested_name=product_name, source="fast_path")
+            run_events.emit(UpdatesParsed, product_name=product_name, updates=arguments, source="fast_path")
+        return parsed
+
+    def memory_scope(self, user_prompt: str) -> ContextManager:
+        """
+        Scopes the in-process memory store to the products a prompt refers to
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            memory_subjects() over the prompt's candidate products when the crew
+            uses an in-process store, otherwise a no-op context
+        """
+
+        if self.memory_storage is None:
+            return nullcontext()
+        return memory_subjects(candidate_products(user_prompt))
+
+    def _execute(self, user_prompt: str) -> Tuple[str, Any]:
+        # Returns the execution path ("fast_path", "single_call" or "crew") and the result;
+        # updates are diffed only against configurations fetched during this prompt
+        with run_scope():
+            return self._execute_prompt(user_prompt)
+
+    def _execute_prompt(self, user_prompt: str) -> Tuple[str, Any]:
+        parsed = self.parse_fast_path(user_prompt)
+        if parsed is not None:
+            return "fast_path", update_product_config._run(**updater_arguments(parsed))
+
+        if self.single_call is not None:
+            result = self.single_call.run(user_prompt)
+            self.single_call_stats.record(result is not None)
+            if result is not None:
+                return "single_call", result
+
+        with self.memory_scope(user_prompt):
+            return "crew", self.runtime.kickoff(self.kickoff_inputs(user_prompt))
+
+    async def _aexecute(self, user_prompt: str) -> Tuple[str, Any]:
+        with run_scope():
+            return await self._aexecute_prompt(user_prompt)
+
+    async def _aexecute_prompt(self, user_prompt: str) -> Tuple[str, Any]:
+        parsed = self.parse_fast_path(user_prompt)
+        if parsed is not None:
+            return "fast_path", await update_product_config._arun(**updater_arguments(parsed))
+
+        if self.single_call is not None:
+            result = await self.single_call.arun(user_prompt)
+            self.single_call_stats.record(result is not None)
+            if result is not None:
+                return "single_call", result
+
+        with self.memory_scope(user_prompt):
+            return "crew", await self.runtime.kickoff_async(self.kickoff_inputs(user_prompt))
+
     def run(self, user_prompt: str):
         """
         Execute the crew with a user prompt
@@ -80,11 +319,216 @@ class ProductConfigurationCrew:
             user_prompt: Natural language request for product configuration update
             
         Returns:
-            Crew execution result
+            Crew execution result, or the updater tool result for fast-path and
+            single-call prompts
         """
         
-        inputs = {"prompt": user_prompt}
-        return self.create_crew().kickoff(inputs=inputs)
+        return self._execute(user_prompt)[1]
+
+    async def arun(self, user_prompt: str):
+        """
+        Execute the crew with a user prompt without blocking the event loop
+
+        Each call leases its own warm crew from the runtime pool (agents and
+        tasks are per crew; tools, LLM clients and memory stores are shared),
+        so many prompts can be in flight on one event loop at the same time.
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            Crew execution result, or the updater tool result for fast-path and
+            single-call prompts
+        """
+
+        return (await self._aexecute(user_prompt))[1]
+
+    def run_stream(self, user_prompt: str) -> Iterator[RunEvent]:
+        """
+        Execute a prompt like run(), yielding progress events as they happen
+
+        The run executes on a worker thread; events are yielded in the order
+        they were emitted: ProductResolved, ConfigFetched, UpdatesParsed and
+        UpdatePosted (as the execution path reaches them; a path may skip or
+        repeat some), then exactly one FinalResult or RunFailed. Leaving the
+        loop early does not stop the run.
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Yields:
+            RunEvent instances (see instrumentation/run_events.py)
+        """
+
+        events: "queue.SimpleQueue[Optional[RunEvent]]" = queue.SimpleQueue()
+
+        def work():
+            with run_events.capture(events.put):
+                try:
+                    path, result = self._execute(user_prompt)
+                    run_events.emit(FinalResult, result=str(result), path=path)
+                except Exception as e:
+                    run_events.emit(RunFailed, error=str(e), error_type=type(e).__name__)
+                finally:
+                    events.put(None)
+
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(work,), name="crew-run-stream", daemon=True)
+        worker.start()
+        while (event := events.get()) is not None:
+            yield event
+        worker.join()
+
+    async def astream(self, user_prompt: str) -> AsyncIterator[RunEvent]:
+        """
+        Execute a prompt like arun(), yielding progress events as they happen
+
+        Same events as run_stream(). Closing the iterator early cancels the run.
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Yields:
+            RunEvent instances (see instrumentation/run_events.py)
+        """
+
+        loop = asyncio.get_running_loop()
+        events: "asyncio.Queue[Optional[RunEvent]]" = asyncio.Queue()
+
+        def sink(event: Optional[RunEvent]) -> None:
+            # Tool calls and crew kickoffs emit from worker threads
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        async def work():
+            with run_events.capture(sink):
+                try:
+                    path, result = await self._aexecute(user_prompt)
+                    run_events.emit(FinalResult, result=str(result), path=path)
+                except Exception as e:
+                    run_events.emit(RunFailed, error=str(e), error_type=type(e).__name__)
+                finally:
+                    sink(None)
+
+        task = asyncio.create_task(work())
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def arun_batch(self, prompts: Iterable[str], concurrency: int = 8) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute many prompts concurrently, yielding results as they finish
+
+        Crew kickoffs run on the event loop's default executor, so its worker
+        count also bounds the effective concurrency.
+
+        Args:
+            prompts: Iterable of natural language update requests
+            concurrency: Maximum number of prompts in flight
+
+        Yields:
+            Result records with index, prompt, result, error and latency_s
+        """
+
+        async for record in run_concurrently(self.arun, prompts, concurrency):
+            yield record
+
+    def counter_stats(self) -> Dict[str, Any]:
+        """
+        Returns the crew's running counters, accumulated since it was created
+
+        Returns:
+            Dict with fast_path, single_call (in single_call mode),
+            structured_output, update_diff, coalescing and memory (with the
+            keyword backend) stats
+        """
+
+        stats = {"fast_path": self.fast_path_stats.snapshot()}
+        if self.single_call is not None:
+            stats["single_call"] = self.single_call_stats.snapshot()
+        stats["structured_output"] = structured_output_stats.snapshot()
+        stats["update_diff"] = update_diff_stats.snapshot()
+        stats["coalescing"] = coalescing_stats()
+        if hasattr(self.memory_storage, "stats"):
+            stats["memory"] = self.memory_storage.stats()
+        return stats
+
+    def run_batch(
+        self,
+        prompts: Iterable[str],
+        concurrency: int = 8,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute many prompts with bounded parallelism
+
+        Args:
+            prompts: Iterable of natural language update requests
+            concurrency: Maximum number of prompts in flight
+            on_result: Called with each result record as soon as it finishes.
+                When omitted, records are collected into the summary instead.
+
+        Returns:
+            Summary with counts, throughput, latency percentiles, plus what
+            this batch added to counter_stats() (fast-path hit rate, single-call
+            counts, structured output repairs, update diff savings, coalescing
+            and memory store stats), plus "results" when no on_result callback is given
+        """
+
+        collected = []
+        counters = self.counter_stats()
+        summary = BatchSummary()
+
+        async def consume():
+            loop = asyncio.get_running_loop()
+            loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+            async for record in self.arun_batch(prompts, concurrency):
+                summary.add(record)
+                if on_result is not None:
+                    on_result(record)
+                else:
+                    collected.append(record)
+
+        # Keep enough warm crews for every in-flight prompt, for this batch only
+        with self.runtime.resized(concurrency):
+            asyncio.run(consume())
+
+        report = summary.report()
+        report.update(stats_delta(counters, self.counter_stats()))
+        if on_result is None:
+            report["results"] = sorted(collected, key=lambda record: record["index"])
+        return report
+
+    def run_jobs(
+        self,
+        store: JobStore,
+        concurrency: int = 8,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Work through the unfinished jobs of a durable job store
+
+        Progress is recorded per job (parsed, fetched, updated, done), so a
+        run that dies can be resumed by calling this again: finished jobs are
+        skipped, jobs whose analysis was checkpointed are applied without the
+        LLM, and updates already applied are not sent again.
+
+        Args:
+            store: JobStore holding the prompts (see configs/job_store.py)
+            concurrency: Jobs run at the same time
+            on_result: Called with a record after each job attempt
+
+        Returns:
+            Job store stats (jobs per stage, checkpoints, attempts and updates
+            sent), plus what this run added to counter_stats()
+        """
+
+        counters = self.counter_stats()
+        with self.runtime.resized(concurrency):
+            report = run_jobs(self, store, concurrency, on_result)
+        report.update(stats_delta(counters, self.counter_stats()))
+        return report
 
 
 # Example usage
@@ -0,0 +1,206 @@
+"""
+Crew Memory - Pluggable crew memory backends, including a bounded in-process keyword store
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
+
+# "crewai": CrewAI's default short-term, entity and long-term memory (embedder
+# calls, a TaskEvaluator LLM call per task, stores that grow without limit);
+# "keyword": short-term memory in a bounded KeywordMemoryStorage
+MEMORY_BACKENDS = ("crewai", "keyword")
+
+# Entry cap of the keyword store
+DEFAULT_MAX_ENTRIES = int(os.environ.get("CREW_MEMORY_MAX_ENTRIES") or 1000)
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words too common in prompts and task outputs to tell memories apart
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the this to was with "
+    "product products update updated updates".split()
+)
+
+
+# Products the current prompt is about (set by ProductConfigurationCrew per prompt)
+_subjects: ContextVar[Optional[FrozenSet[str]]] = ContextVar("crew_memory_subjects", default=None)
+
+
+@contextmanager
+def memory_subjects(product_names: Iterable[str]) -> Iterator[FrozenSet[str]]:
+    """
+    Scopes keyword memory to the products of one prompt
+
+    CrewAI searches memory with the whole task description, whose template
+    text (and example product names) is shared by every prompt, so keyword
+    overlap alone recalls other products' memories. Inside this scope,
+    memories are saved under these products and only memories saved under
+    one of them are recalled. With no product names, nothing is recalled.
+    """
+
+    subjects = frozenset(name.lower() for name in product_names)
+    token = _subjects.set(subjects)
+    try:
+        yield subjects
+    finally:
+        _subjects.reset(token)
+
+
+def keywords(text: str) -> FrozenSet[str]:
+    """Lower-cased words (minus stop words) and adjacent-word bigrams of a text"""
+
+    words = [word for word in TOKEN.findall(text.lower()) if len(word) > 1 and word not in STOP_WORDS]
+    return frozenset(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+class KeywordMemoryStorage:
+    """
+    Bounded in-process memory store with keyword and bigram recall
+
+    Implements the CrewAI Storage interface (save/search/reset) without an
+    embedder: entries are indexed by keywords() in an inverted index and
+    scored by the overlap coefficient of query and entry terms. Inside
+    memory_subjects(), only memories saved under the same products are
+    candidates. At most max_entries are kept; the least recently saved or recalled entry is
+    evicted first. Saving a text that is already stored only refreshes it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_chars: int = 2000, min_score: float = 0.2):
+        """
+        Args:
+            max_entries: Maximum number of stored memories
+            max_chars: Longer values are truncated to this many characters
+            min_score: Minimum overlap score for a memory to be recalled. It
+                replaces CrewAI's score_threshold, which is tuned for
+                embedding similarity.
+        """
+
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._index: Dict[str, Set[str]] = {}
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.saves = 0
+        self.searches = 0
+        self.recalls = 0
+        self.evictions = 0
+
+    def _remove(self, text: str) -> None:
+        _, terms, _ = self._entries.pop(text)
+        for term in terms:
+            texts = self._index[term]
+            texts.discard(text)
+            if not texts:
+                del self._index[term]
+
+    def save(self, value: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Stores a memory, evicting least-recently-used ones over max_entries"""
+
+        if self.max_entries <= 0:
+            return
+        text = str(value)[: self.max_chars]
+        terms = keywords(text)
+        # Metadata strings (CrewAI stores the task description) are capped too
+        metadata = {key: v[: self.max_chars] if isinstance(v, str) else v for key, v in (metadata or {}).items()}
+        with self._lock:
+            self.saves += 1
+            if text in self._entries:
+                self._remove(text)
+            self._entries[text] = (metadata, terms, _subjects.get())
+            for term in terms:
+                self._index.setdefault(term, set()).add(text)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def search(self, query: str, limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Returns the memories that share the most keywords with a query
+
+        Args:
+            query: Text to recall memories for (CrewAI passes the task description)
+            limit: Maximum number of memories
+            score_threshold: Ignored, see min_score
+
+        Returns:
+            Dicts with content, metadata and score, best match first
+        """
+
+        terms = keywords(query)
+        subjects = _subjects.get()
+        with self._lock:
+            self.searches += 1
+            candidates = set()
+            for term in terms:
+                candidates.update(self._index.get(term, ()))
+            scored = []
+            for text in candidates:
+                metadata, entry_terms, entry_subjects = self._entries[text]
+                # Outside a subject scope every memory is a candidate
+                if subjects is not None and not (entry_subjects and subjects & entry_subjects):
+                    continue
+                score = len(terms & entry_terms) / min(len(terms), len(entry_terms))
+                if score >= self.min_score:
+                    scored.append((score, text, metadata))
+            scored.sort(key=lambda item: item[0], reverse=True)
+            results = scored[:limit]
+            for _, text, _ in results:
+                self._entries.move_to_end(text)
+            self.recalls += bool(results)
+        return [{"content": text, "metadata": metadata, "score": score} for score, text, metadata in results]
+
+    def reset(self) -> None:
+        """Drops every memory"""
+
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._reset_counters()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "index_terms": len(self._index),
+                "saves": self.saves,
+                "searches": self.searches,
+                "recalls": self.recalls,
+                "recall_rate": self.recalls / self.searches if self.searches else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+def crew_memory_options(memory: bool, backend: Any = "crewai") -> Dict[str, Any]:
+    """
+    Builds the Crew(...) memory keyword arguments for a backend
+
+    Args:
+        memory: Whether the crew has memory at all
+        backend: "crewai", "keyword", or a Storage-like object (save, search,
+            reset) to use as short-term memory storage
+
+    Returns:
+        Keyword arguments for crewai.Crew: memory=True for the CrewAI default,
+        otherwise memory=False plus a short_term_memory on the given storage
+        (no entity or long-term memory, so no embedder and no evaluator calls)
+    """
+
+    if not memory:
+        return {"memory": False}
+    if backend == "crewai":
+        return {"memory": True}
+
+    from crewai.memory.short_term.short_term_memory import ShortTermMemory
+
+    storage = KeywordMemoryStorage() if backend == "keyword" else backend
+    return {"memory": False, "short_term_memory": ShortTermMemory(storage=storage)}
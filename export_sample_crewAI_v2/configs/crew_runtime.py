@@ -0,0 +1,211 @@
+"""
+Warm Crew Runtime - Long-lived pool of ready-to-run crews that share agents' tools, LLMs and memory
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from crewai import Crew
+from crewai.agents.cache.cache_handler import CacheHandler
+
+
+def clone_crew(template: Crew) -> Crew:
+    """
+    Creates an independent crew from a template without rebuilding shared resources
+
+    Agents and tasks are cloned so each crew has its own execution state
+    (task outputs, agent executors). Tools, LLM clients and the memory stores
+    (short-term, long-term, entity and external) are shared with the
+    template, so no embedder or storage is created again.
+
+    Args:
+        template: Fully built crew to clone
+
+    Returns:
+        New Crew instance ready for kickoff
+    """
+
+    agents = [agent.copy() for agent in template.agents]
+
+    task_mapping = {}
+    tasks = []
+    for task in template.tasks:
+        cloned = task.copy(agents, task_mapping)
+        task_mapping[task.key] = cloned
+        tasks.append(cloned)
+    for cloned, original in zip(tasks, template.tasks):
+        if isinstance(original.context, list):
+            cloned.context = [task_mapping[context_task.key] for context_task in original.context]
+
+    return Crew(
+        agents=agents,
+        tasks=tasks,
+        process=template.process,
+        verbose=template.verbose,
+        memory=template.memory,
+        short_term_memory=template._short_term_memory,
+        long_term_memory=template._long_term_memory,
+        entity_memory=template._entity_memory,
+        external_memory=template.external_memory,
+        embedder=template.embedder,
+        max_rpm=template.max_rpm,
+        step_callback=template.step_callback,
+        task_callback=template.task_callback,
+    )
+
+
+class WarmCrewRuntime:
+    """
+    Pool of pre-built crews reused across kickoffs.
+
+    The template crew is built once by build_crew and never run itself;
+    pool members are clones that share its tools, LLM clients and memory
+    stores. Each kickoff leases one crew for its whole duration, so
+    concurrent kickoffs never share per-run state. At most max_size crews
+    are kept; when all are leased, callers wait for one to be returned.
+    resized() raises the limit for the duration of a batch.
+    """
+
+    def __init__(self, build_crew: Callable[[], Crew], max_size: int = 4):
+        """
+        Args:
+            build_crew: Builds the template crew (called once, on first use)
+            max_size: Maximum number of crews in the pool
+        """
+
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._build_crew = build_crew
+        self.max_size = max_size
+        self._base_size = max_size
+        self._size_requests: List[int] = []
+        self._template: Optional[Crew] = None
+        self._idle: "queue.LifoQueue[Crew]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.crews_built = 0
+        self.kickoffs = 0
+        self.build_time_total = 0.0
+        self.lease_wait_total = 0.0
+
+    def _new_crew(self) -> Crew:
+        started = time.perf_counter()
+        if self._template is None:
+            self._template = self._build_crew()
+        crew = clone_crew(self._template)
+        self.build_time_total += time.perf_counter() - started
+        self.crews_built += 1
+        return crew
+
+    def warm_up(self, count: int = 1) -> None:
+        """Builds crews ahead of time so the first kickoffs pay no setup cost"""
+
+        with self._lock:
+            while self.crews_built < min(count, self.max_size):
+                self._idle.put(self._new_crew())
+
+    @contextmanager
+    def resized(self, max_size: int) -> Iterator[None]:
+        """
+        Raises max_size to at least max_size for the duration of a block
+
+        On exit, max_size goes back to the largest size still requested (the
+        size before the first resized() call once none are active). Crews
+        beyond it are dropped when idle or when returned from their lease.
+        """
+
+        with self._lock:
+            if not self._size_requests:
+                self._base_size = self.max_size
+            self._size_requests.append(max_size)
+            self.max_size = max([self._base_size] + self._size_requests)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._size_requests.remove(max_size)
+                self.max_size = max([self._base_size] + self._size_requests)
+                while self.crews_built > self.max_size:
+                    try:
+                        self._idle.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.crews_built -= 1
+
+    @contextmanager
+    def lease(self) -> Iterator[Crew]:
+        """
+        Borrows a crew for one kickoff and returns it to the pool afterwards
+        """
+
+        started = time.perf_counter()
+        try:
+            crew = self._idle.get_nowait()
+        except queue.Empty:
+            crew = None
+            with self._lock:
+                if self.crews_built < self.max_size:
+                    crew = self._new_crew()
+            if crew is None:
+                crew = self._idle.get()
+
+        with self._lock:
+            self.lease_wait_total += time.perf_counter() - started
+            self.kickoffs += 1
+
+        # CrewAI caches tool results per crew; start every kickoff with an empty
+        # cache, as a fresh crew would, so reads are never stale and repeated
+        # updates are never skipped
+        if crew.cache:
+            cache_handler = CacheHandler()
+            for agent in crew.agents:
+                # What set_cache_handler() assigns, without its executor rebuild:
+                # execute_task builds a new executor from tools_handler for every task
+                agent.cache_handler = cache_handler
+                agent.tools_handler.cache = cache_handler
+        # Guardrail retries are counted per task object; each kickoff gets the full allowance
+        for task in crew.tasks:
+            task.retry_count = 0
+        try:
+            yield crew
+        finally:
+            with self._lock:
+                # The pool may have shrunk while this crew was leased (see resized())
+                keep = self.crews_built <= self.max_size
+                if not keep:
+                    self.crews_built -= 1
+            if keep:
+                self._idle.put(crew)
+
+    def kickoff(self, inputs: Dict[str, Any]):
+        """Runs one kickoff on a leased crew"""
+
+        with self.lease() as crew:
+            return crew.kickoff(inputs=inputs)
+
+    async def kickoff_async(self, inputs: Dict[str, Any]):
+        """Runs one kickoff on a leased crew in a worker thread"""
+
+        return await asyncio.to_thread(self.kickoff, inputs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns pool usage
+
+        Returns:
+            Dict with crews built, kickoffs served, idle crews and setup/wait times in ms
+        """
+
+        with self._lock:
+            return {
+                "crews_built": self.crews_built,
+                "max_size": self.max_size,
+                "idle": self._idle.qsize(),
+                "kickoffs": self.kickoffs,
+                "build_time_total_ms": self.build_time_total * 1000,
+                "lease_wait_total_ms": self.lease_wait_total * 1000,
+            }
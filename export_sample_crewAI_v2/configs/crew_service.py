@@ -0,0 +1,411 @@
+"""
+Crew Service - Long-running HTTP/JSON service around ProductConfigurationCrew with a pre-warmed worker process pool
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from configs.crew_configuration import MAX_EXECUTION_TIME
+from instrumentation.exporters import PrometheusMetrics
+
+# Worker processes, each with its own warm crew
+DEFAULT_WORKERS = int(os.environ.get("CREW_SERVICE_WORKERS") or 2)
+
+# Requests admitted beyond the busy workers; more than that are answered with 429
+DEFAULT_QUEUE_SIZE = int(os.environ.get("CREW_SERVICE_QUEUE_SIZE") or 16)
+
+# Seconds a client refused with 429 is asked to wait (Retry-After)
+RETRY_AFTER_S = 1
+
+# Largest accepted /run request body
+MAX_BODY_BYTES = 64 * 1024
+
+# Crew of this worker process, built by _init_worker
+_worker_crew = None
+
+
+def build_crew(api_key: str):
+    """Default crew factory: a ProductConfigurationCrew configured from the environment"""
+
+    from configs.crew_configuration import ProductConfigurationCrew
+
+    return ProductConfigurationCrew(api_key)
+
+
+def _init_worker(crew_factory: Callable[[], Any]) -> None:
+    global _worker_crew
+    _worker_crew = crew_factory()
+    # Build the pooled crew now rather than on the first request
+    _worker_crew.runtime.warm_up(1)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+def _run_prompt(prompt: str, deadline: float) -> Optional[Dict[str, Any]]:
+    # deadline is wall-clock time (it crosses processes); None means it passed while queued
+    if time.time() >= deadline:
+        return None
+    started = time.perf_counter()
+    final = None
+    for event in _worker_crew.run_stream(prompt):
+        final = event
+    return {"event": final.to_dict(), "worker_pid": os.getpid(), "run_ms": (time.perf_counter() - started) * 1000}
+
+
+class CrewService:
+    """
+    Runs prompts on a pool of worker processes, each holding a warm crew
+
+    Workers are spawned (not forked) and build their crew before the service
+    accepts requests, so no request pays for interpreter startup, the CrewAI
+    import or crew construction. At most workers + queue_size requests are
+    admitted at a time; the rest are refused with 429 instead of queueing
+    without bound. Each request has a deadline of at most the crew's
+    max_execution_time: a request still queued at its deadline is never run,
+    and a running one is answered with 504 while its worker finishes (the
+    request's slot is freed only then). A worker that dies is replaced with
+    a fresh pool.
+    """
+
+    def __init__(
+        self,
+        crew_factory: Callable[[], Any],
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        deadline_s: float = MAX_EXECUTION_TIME,
+        start_timeout_s: float = 300.0,
+    ):
+        """
+        Args:
+            crew_factory: Picklable callable building a ProductConfigurationCrew
+                in each worker (e.g. functools.partial(build_crew, api_key))
+            workers: Number of worker processes
+            queue_size: Requests admitted while all workers are busy
+            deadline_s: Longest deadline a request may have (requests can ask for less)
+            start_timeout_s: How long start() waits for the workers to build their crews
+        """
+
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 0:
+            raise ValueError("queue_size must not be negative")
+
+        self.crew_factory = crew_factory
+        self.workers = workers
+        self.queue_size = queue_size
+        self.capacity = workers + queue_size
+        self.deadline_s = deadline_s
+        self.start_timeout_s = start_timeout_s
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.workers_ready = 0
+        self.in_flight = 0
+        self.restarts = 0
+        self.responses: Dict[int, int] = {}
+
+        self.metrics = PrometheusMetrics(namespace="crew_service")
+        self.metrics.counter("requests_total", "Requests by endpoint and HTTP status")
+        self.metrics.histogram("request_duration_seconds", "Time from admission to response of /run requests")
+        self.metrics.histogram("run_duration_seconds", "Time a worker spent running a prompt")
+        self.metrics.gauge("in_flight", "Admitted /run requests, queued or running")
+        self.metrics.gauge("capacity", "Maximum admitted /run requests (workers + queue size)")
+        self.metrics.gauge("workers_ready", "Worker processes with a warm crew")
+        self.metrics.set("capacity", self.capacity)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Forking would copy the HTTP server's and CrewAI's threads and locks mid-use
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.crew_factory,),
+        )
+
+    def _warm_up(self, executor: ProcessPoolExecutor) -> None:
+        # The pool starts a process per submitted task while none is idle, and
+        # each process builds its crew before its first task
+        started = time.monotonic()
+        pids = set()
+        while len(pids) < self.workers:
+            remaining = self.start_timeout_s - (time.monotonic() - started)
+            if remaining <= 0:
+                raise TimeoutError(f"Only {len(pids)} of {self.workers} workers started within {self.start_timeout_s:g}s")
+            futures = [executor.submit(_worker_pid) for _ in range(self.workers - len(pids))]
+            pids.update(future.result(timeout=remaining) for future in futures)
+            if len(pids) < self.workers:
+                time.sleep(0.05)
+        with self._lock:
+            self.workers_ready = len(pids)
+        self.metrics.set("workers_ready", len(pids))
+
+    def start(self) -> "CrewService":
+        """Starts the workers and waits until each has built its crew"""
+
+        executor = self._new_executor()
+        try:
+            self._warm_up(executor)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._executor = executor
+        return self
+
+    def stop(self) -> None:
+        """Stops the workers; queued requests are cancelled"""
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "CrewService":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._restart_lock:
+            if self._executor is not broken:
+                return
+            with self._lock:
+                self.workers_ready = 0
+                self.restarts += 1
+            self.metrics.set("workers_ready", 0)
+            broken.shutdown(wait=False, cancel_futures=True)
+            executor = self._new_executor()
+            try:
+                self._warm_up(executor)
+            except Exception:
+                # Keep the broken pool in place; the next request tries again
+                executor.shutdown(wait=False, cancel_futures=True)
+                return
+            self._executor = executor
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            in_flight = self.in_flight
+        self.metrics.set("in_flight", in_flight)
+        self._slots.release()
+
+    def _execute(self, prompt: str, deadline_s: float) -> Tuple[int, Dict[str, Any]]:
+        deadline = time.time() + deadline_s
+        executor = self._executor
+        if executor is None:
+            self._release()
+            return 503, {"success": False, "error": "Service is not running"}
+        try:
+            future = executor.submit(_run_prompt, prompt, deadline)
+        except BrokenProcessPool as e:
+            self._release()
+            self._replace_executor(executor)
+            return 503, {"success": False, "error": f"Worker pool failed and was restarted: {e}"}
+        # The slot stays taken until the worker is done, even past the deadline
+        future.add_done_callback(self._release)
+
+        try:
+            outcome = future.result(timeout=max(0.0, deadline - time.time()))
+        except FutureTimeoutError:
+            started = not future.cancel()
+            state = "still running; it will complete" if started else "never started"
+            return 504, {"success": False, "error": f"Deadline of {deadline_s:g}s exceeded; the prompt {state}"}
+        except BrokenProcessPool as e:
+            self._replace_executor(executor)
+            return 503, {"success": False, "error": f"Worker pool failed and was restarted: {e}"}
+        except Exception as e:
+            return 500, {"success": False, "error": str(e), "error_type": type(e).__name__}
+
+        if outcome is None:
+            return 504, {"success": False, "error": f"Deadline of {deadline_s:g}s passed while queued; the prompt never started"}
+        self.metrics.observe("run_duration_seconds", outcome["run_ms"] / 1000)
+        event = outcome["event"]
+        if event["type"] != "final_result":
+            return 500, {"success": False, "error": event["error"], "error_type": event["error_type"], "worker_pid": outcome["worker_pid"]}
+        return 200, {
+            "success": True,
+            "result": event["result"],
+            "path": event["path"],
+            "worker_pid": outcome["worker_pid"],
+            "run_ms": outcome["run_ms"],
+        }
+
+    def run(self, prompt: str, timeout_s: Optional[float] = None) -> Tuple[int, Dict[str, Any]]:
+        """
+        Runs one prompt on a worker, or refuses it when the service is full
+
+        Args:
+            prompt: Natural language request for product configuration update
+            timeout_s: Deadline for this request; capped at deadline_s
+
+        Returns:
+            HTTP status and JSON body: 200 with result, path, worker_pid,
+            run_ms and latency_ms; 429 when full; 504 past the deadline; 500
+            when the run failed; 503 when the worker pool is unavailable
+        """
+
+        started = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            status, body = 429, {
+                "success": False,
+                "error": f"Service is full ({self.capacity} requests in flight); retry later",
+                "retry_after_s": RETRY_AFTER_S,
+            }
+        else:
+            with self._lock:
+                self.in_flight += 1
+                in_flight = self.in_flight
+            self.metrics.set("in_flight", in_flight)
+            deadline_s = self.deadline_s if timeout_s is None else min(timeout_s, self.deadline_s)
+            status, body = self._execute(prompt, deadline_s)
+            self.metrics.observe("request_duration_seconds", time.perf_counter() - started)
+
+        body["latency_ms"] = (time.perf_counter() - started) * 1000
+        self.record("/run", status)
+        return status, body
+
+    def record(self, endpoint: str, status: int) -> None:
+        """Counts a response"""
+
+        with self._lock:
+            self.responses[status] = self.responses.get(status, 0) + 1
+        self.metrics.inc("requests_total", endpoint=endpoint, status=str(status))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the service state
+
+        Returns:
+            Dict with worker and queue settings, workers ready, requests in
+            flight, pool restarts and /run responses by status
+        """
+
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "workers_ready": self.workers_ready,
+                "queue_size": self.queue_size,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "deadline_s": self.deadline_s,
+                "restarts": self.restarts,
+                "responses": {str(status): count for status, count in sorted(self.responses.items())},
+            }
+
+    def health(self) -> Tuple[int, Dict[str, Any]]:
+        """200 with the stats when every worker is ready, 503 otherwise"""
+
+        stats = self.stats()
+        ready = self._executor is not None and stats["workers_ready"] == stats["workers"]
+        return (200 if ready else 503), {"status": "ok" if ready else "unavailable", **stats}
+
+
+def _make_handler(service: CrewService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately; avoid the delayed-ACK stall on keep-alive connections
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: Any, content_type: str = "application/json") -> None:
+            data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", str(RETRY_AFTER_S))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/health":
+                status, body = service.health()
+                self._send(status, body)
+            elif path == "/metrics":
+                status = 200
+                self._send(status, service.metrics.render(), "text/plain; version=0.0.4; charset=utf-8")
+            else:
+                status = 404
+                self._send(status, {"success": False, "error": f"Unknown endpoint {path}"})
+            service.record(path if status != 404 else "other", status)
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0]
+            endpoint = path if path == "/run" else "other"
+            # Checked before reading: rfile.read(-1) would block until the client hangs up
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                self._send(400, {"success": False, "error": "Invalid Content-Length"})
+                service.record(endpoint, 400)
+                return
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+                self._send(413, {"success": False, "error": f"Request body over {MAX_BODY_BYTES} bytes"})
+                service.record(endpoint, 413)
+                return
+            if path != "/run":
+                self.rfile.read(length)
+                self._send(404, {"success": False, "error": f"Unknown endpoint {path}"})
+                service.record(endpoint, 404)
+                return
+
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = request.get("prompt") if isinstance(request, dict) else None
+                timeout_s = request.get("timeout_s") if isinstance(request, dict) else None
+                if not isinstance(prompt, str) or not prompt.strip():
+                    raise ValueError("'prompt' must be a non-empty string")
+                if timeout_s is not None and (isinstance(timeout_s, bool) or not isinstance(timeout_s, (int, float)) or timeout_s <= 0):
+                    raise ValueError("'timeout_s' must be a positive number")
+            except ValueError as e:
+                self._send(400, {"success": False, "error": f"Invalid request: {e}"})
+                service.record("/run", 400)
+                return
+
+            self._send(*service.run(prompt, timeout_s))
+
+    return Handler
+
+
+class _ServiceHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connects from concurrent clients
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def create_server(service: CrewService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """
+    Builds the HTTP server for a started CrewService
+
+    Endpoints:
+        POST /run     {"prompt": ..., "timeout_s": optional} -> see CrewService.run
+        GET  /health  CrewService.health as JSON
+        GET  /metrics Prometheus text metrics
+
+    Args:
+        service: Service to expose
+        host: Interface to bind
+        port: TCP port (0 picks a free one; see server.server_address)
+
+    Returns:
+        The server; call serve_forever() to handle requests
+    """
+
+    return _ServiceHTTPServer((host, port), _make_handler(service))
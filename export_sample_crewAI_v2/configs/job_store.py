@@ -0,0 +1,439 @@
+"""
+Job Store - Durable, resumable SQLite queue of update prompts with per-job idempotency keys
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from instrumentation import run_events
+from instrumentation.run_events import ConfigFetched, RunEvent, UpdatePosted, UpdatesParsed
+from tools.config_updater_tool import update_product_config
+from tools.idempotency import UpdateRecord, idempotency_scope
+from tools.update_diff import run_scope
+
+# Stages a job moves through; parsed, fetched and updated only ever advance
+# (a crew run fetches the config before its analysis is parsed)
+JOB_STAGES = ("pending", "parsed", "fetched", "updated", "done", "failed")
+_PROGRESS = {"pending": 0, "parsed": 1, "fetched": 2, "updated": 3}
+
+# Attempts before a job is marked failed
+DEFAULT_MAX_ATTEMPTS = 3
+
+# A claimed job whose worker vanished is handed out again after its lease,
+# twice the crew's 300s max_execution_time
+DEFAULT_LEASE_S = 600.0
+
+# Delay before a failed attempt is retried, multiplied by the attempt number
+DEFAULT_RETRY_DELAY_S = 30.0
+
+
+class Job(NamedTuple):
+    """A claimed job; checkpoint holds the parsed update when the analysis finished in an earlier attempt"""
+
+    id: int
+    key: str
+    prompt: str
+    stage: str
+    attempts: int
+    checkpoint: Optional[Dict[str, Any]]
+
+
+def worker_id() -> str:
+    """Identifies this process as host:pid, so jobs of dead local workers can be recovered"""
+
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def job_keys(prompts: List[str]) -> List[str]:
+    """
+    Default idempotency keys: a hash of the prompt and how often it occurred before in the list
+
+    Submitting the same prompt list again yields the same keys, so a re-run
+    of a batch resumes its jobs instead of adding new ones.
+    """
+
+    seen: Counter = Counter()
+    keys = []
+    for prompt in prompts:
+        keys.append(hashlib.sha256(f"{prompt}\0{seen[prompt]}".encode("utf-8")).hexdigest())
+        seen[prompt] += 1
+    return keys
+
+
+class JobStore:
+    """
+    SQLite-backed queue of update prompts that survives crashes
+
+    Each job has an idempotency key. Workers claim jobs under a lease, record
+    how far each one got (parsed, fetched, updated), checkpoint the parsed
+    update as soon as the analysis produces it, and mark the job done or
+    failed. A retried job whose checkpoint exists skips the LLM and applies
+    the checkpointed update directly. The store is also the update ledger
+    for tools/idempotency.py: within a job, an update that was applied once
+    is never sent again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        lease_s: float = DEFAULT_LEASE_S,
+        retry_delay_s: float = DEFAULT_RETRY_DELAY_S,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_attempts: Attempts before a job is marked failed
+            lease_s: How long a claimed job is reserved for its worker
+            retry_delay_s: Wait before retrying a failed attempt, times the attempt number
+        """
+
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_s = lease_s
+        self.retry_delay_s = retry_delay_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                prompt TEXT NOT NULL,
+                stage TEXT NOT NULL DEFAULT 'pending',
+                checkpoint TEXT,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                lease_until REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_stage ON jobs (stage, id)")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS updates (
+                key TEXT PRIMARY KEY,
+                product_name TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                sent_at REAL NOT NULL,
+                done_at REAL
+            )
+            """
+        )
+
+    def add(self, prompts: Iterable[str], keys: Optional[Iterable[str]] = None) -> int:
+        """
+        Enqueues prompts; prompts whose key is already stored are skipped
+
+        Args:
+            prompts: Update prompts
+            keys: Idempotency keys, one per prompt (default: job_keys(prompts))
+
+        Returns:
+            Number of jobs added
+        """
+
+        prompts = list(prompts)
+        keys = list(keys) if keys is not None else job_keys(prompts)
+        if len(keys) != len(prompts):
+            raise ValueError(f"Got {len(keys)} keys for {len(prompts)} prompts")
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO jobs (key, prompt, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                [(key, prompt, now, now) for key, prompt in zip(keys, prompts)],
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """
+        Leases the oldest unfinished job that no live worker holds
+
+        Args:
+            worker: Claiming worker (see worker_id)
+
+        Returns:
+            The job, or None when every unfinished job is leased or waiting to be retried
+        """
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, key, prompt, stage, attempts, checkpoint FROM jobs "
+                    "WHERE stage NOT IN ('done', 'failed') AND (lease_until IS NULL OR lease_until < ?) "
+                    "ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (worker, now + self.lease_s, now, row[0]),
+                    )
+            finally:
+                self._conn.execute("COMMIT")
+        if row is None:
+            return None
+        job_id, key, prompt, stage, attempts, checkpoint = row
+        return Job(job_id, key, prompt, stage, attempts + 1, json.loads(checkpoint) if checkpoint else None)
+
+    def advance(self, job: Job, stage: str) -> None:
+        """Records that a job reached parsed, fetched or updated (never moves it back)"""
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, updated_at = ? WHERE id = ? AND stage IN ({})".format(
+                    ", ".join(f"'{name}'" for name, rank in _PROGRESS.items() if rank < _PROGRESS[stage])
+                ),
+                (stage, time.time(), job.id),
+            )
+
+    def checkpoint(self, job: Job, product_name: str, updates: Dict[str, Any], source: str) -> None:
+        """Stores the parsed update of a job, so a retry can apply it without the LLM"""
+
+        checkpoint = json.dumps({"product_name": product_name, "updates": updates, "source": source})
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET checkpoint = ?, updated_at = ? WHERE id = ?", (checkpoint, time.time(), job.id))
+        self.advance(job, "parsed")
+
+    def complete(self, job: Job, result: str) -> None:
+        """Marks a job done"""
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET stage = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (result, time.time(), job.id),
+            )
+
+    def fail(self, job: Job, error: str) -> None:
+        """Records a failed attempt; the job is retried after a delay until max_attempts is reached"""
+
+        now = time.time()
+        with self._lock:
+            if job.attempts >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET stage = 'failed', error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (error, now, job.id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET error = ?, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (error, now + self.retry_delay_s * job.attempts, now, job.id),
+                )
+
+    def recover(self) -> int:
+        """
+        Releases the jobs held by workers of this host that are no longer running
+
+        Call at startup after a crash to resume at once instead of waiting
+        for the dead workers' leases to expire.
+
+        Returns:
+            Number of jobs released
+        """
+
+        host = socket.gethostname()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, worker FROM jobs WHERE stage NOT IN ('done', 'failed') AND lease_until IS NOT NULL AND worker LIKE ?",
+                (f"{host}:%",),
+            ).fetchall()
+            stale = [(job_id,) for job_id, worker in rows if not _process_alive(int(worker.rsplit(":", 1)[1]))]
+            self._conn.executemany("UPDATE jobs SET lease_until = NULL WHERE id = ?", stale)
+        return len(stale)
+
+    # Update ledger (tools/idempotency.py)
+
+    def lookup_update(self, key: str) -> Optional[UpdateRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT status, result FROM updates WHERE key = ?", (key,)).fetchone()
+        return UpdateRecord(*row) if row is not None else None
+
+    def record_update_sent(self, key: str, product_name: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO updates (key, product_name, payload, status, sent_at) VALUES (?, ?, ?, 'sent', ?)",
+                (key, product_name, json.dumps(payload, sort_keys=True), time.time()),
+            )
+
+    def record_update_done(self, key: str, result: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE updates SET status = 'done', result = ?, done_at = ? WHERE key = ?", (result, time.time(), key))
+
+    def jobs(self, stage: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns the stored jobs (optionally of one stage) in queue order"""
+
+        query = "SELECT id, key, prompt, stage, checkpoint, result, error, attempts FROM jobs"
+        params: tuple = ()
+        if stage is not None:
+            query, params = query + " WHERE stage = ?", (stage,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id", params).fetchall()
+        columns = ("id", "key", "prompt", "stage", "checkpoint", "result", "error", "attempts")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns queue progress
+
+        Returns:
+            Dict with jobs per stage, jobs with a checkpoint, total attempts,
+            and updates sent and confirmed in the ledger
+        """
+
+        with self._lock:
+            stages = dict(self._conn.execute("SELECT stage, COUNT(*) FROM jobs GROUP BY stage").fetchall())
+            checkpoints, attempts = self._conn.execute(
+                "SELECT COUNT(checkpoint), COALESCE(SUM(attempts), 0) FROM jobs"
+            ).fetchone()
+            updates = dict(self._conn.execute("SELECT status, COUNT(*) FROM updates GROUP BY status").fetchall())
+        return {
+            "path": self.path,
+            "jobs": sum(stages.values()),
+            "stages": {stage: stages.get(stage, 0) for stage in JOB_STAGES},
+            "checkpoints": checkpoints,
+            "attempts": attempts,
+            "updates_sent": updates.get("sent", 0) + updates.get("done", 0),
+            "updates_confirmed": updates.get("done", 0),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class UpdateNotApplied(RuntimeError):
+    """A job's run finished without a confirmed update, so the job must be retried"""
+
+
+def run_job(crew: Any, store: JobStore, job: Job) -> str:
+    """
+    Runs one claimed job, recording its progress in the store
+
+    The updater reports API errors and local rejections as its result text,
+    not as exceptions, so the job only counts as done when every product it
+    updated ended with a successful (or unchanged) UpdatePosted.
+
+    Args:
+        crew: ProductConfigurationCrew
+        store: Store the job was claimed from
+        job: The claimed job
+
+    Returns:
+        The run result as text
+
+    Raises:
+        UpdateNotApplied: No update was confirmed, or the last one to a product failed
+    """
+
+    # Last outcome per product: an agent may retry a failed update and succeed
+    outcomes: Dict[str, bool] = {}
+
+    def on_event(event: RunEvent) -> None:
+        if isinstance(event, UpdatesParsed):
+            store.checkpoint(job, event.product_name, event.updates, event.source)
+        elif isinstance(event, ConfigFetched):
+            store.advance(job, "fetched")
+        elif isinstance(event, UpdatePosted):
+            outcomes[event.product_name] = event.success
+            if event.success:
+                store.advance(job, "updated")
+
+    # The run scope lets an in-doubt update's re-read drop fields the server already has
+    with idempotency_scope(store, job.key), run_events.capture(on_event), run_scope():
+        if job.checkpoint is not None:
+            # The analysis finished in an earlier attempt; apply it without the LLM
+            checkpoint = job.checkpoint
+            result = update_product_config._run(product_name=checkpoint["product_name"], **checkpoint["updates"])
+        else:
+            result = str(crew.run(job.prompt))
+
+    if not outcomes or not all(outcomes.values()):
+        raise UpdateNotApplied(result)
+    return result
+
+
+def run_jobs(
+    crew: Any,
+    store: JobStore,
+    concurrency: int = 4,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Works through the store's unfinished jobs until none can be claimed
+
+    Jobs waiting for a retry delay or leased by another live worker are
+    left for a later call.
+
+    Args:
+        crew: ProductConfigurationCrew
+        store: Job store
+        concurrency: Jobs run at the same time
+        on_result: Called with a record (id, key, prompt, attempt, resumed,
+            result, error, latency_s) after each attempt
+
+    Returns:
+        store.stats() after the run
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    worker = worker_id()
+
+    def work() -> None:
+        while (job := store.claim(worker)) is not None:
+            started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = run_job(crew, store, job)
+                store.complete(job, result)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                store.fail(job, error)
+            if on_result is not None:
+                on_result({
+                    "id": job.id,
+                    "key": job.key,
+                    "prompt": job.prompt,
+                    "attempt": job.attempts,
+                    "resumed": job.checkpoint is not None,
+                    "result": result,
+                    "error": error,
+                    "latency_s": time.perf_counter() - started,
+                })
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(work) for _ in range(concurrency)]:
+            future.result()
+    return store.stats()
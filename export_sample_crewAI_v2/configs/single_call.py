@@ -0,0 +1,121 @@
+"""
+Single-Call Updater - Analysis and update fused into one structured LLM round trip plus direct tool calls
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from crewai import BaseLLM
+
+from instrumentation import run_events
+from instrumentation.run_events import UpdatesParsed
+from llm.cassette_llm import CassetteLLM
+from tasks.prompt_parser import candidate_products
+from tasks.single_call_task import UPDATE_FUNCTION, UPDATE_FUNCTION_NAME, build_messages, parse_update_call
+from tools.config_updater_tool import update_product_config
+from tools.get_product_config_tool import get_product_configuration
+
+
+def _submitted_arguments(**arguments: Any) -> Dict[str, Any]:
+    # "Executing" the function just hands its arguments back as the call result
+    return arguments
+
+
+def _emit_updates_parsed(arguments: Optional[Dict[str, Any]]) -> None:
+    if arguments is not None:
+        updates = {field: value for field, value in arguments.items() if field != "product_name"}
+        run_events.emit(UpdatesParsed, product_name=arguments["product_name"], updates=updates, source="single_call")
+
+
+def supports_update_function(llm: BaseLLM) -> bool:
+    """
+    Whether the single-call request can use native function calling with this LLM
+
+    Cassettes only record text completions, so cassette-backed LLMs use the
+    JSON reply form in both record and replay mode.
+    """
+
+    return llm.supports_function_calling() and not isinstance(llm, CassetteLLM)
+
+
+class SingleCallUpdater:
+    """
+    Runs an update prompt with one LLM call instead of the two-agent crew.
+
+    The model sees the prompt and the candidate products and answers with
+    the update payload: a submit_product_update function call when the LLM
+    supports function calling, a JSON reply otherwise. The configuration
+    fetch (which also primes the config cache, so the update is diffed) and
+    the update itself are then made in code with the same tools the crew
+    agents use, so the end result matches a crew run.
+
+    Function-calling requests bypass the completion cache (see CachedLLM).
+    """
+
+    def __init__(self, llm: BaseLLM, function_calling: Optional[bool] = None):
+        """
+        Args:
+            llm: LLM for the structured request; deterministic settings recommended
+            function_calling: Force (True) or disable (False) native function
+                calling; by default it is used when the LLM supports it
+        """
+
+        self.llm = llm
+        self.function_calling = supports_update_function(llm) if function_calling is None else function_calling
+
+    def request_update(self, user_prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        Makes the single LLM call and parses its answer
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            ProductConfigUpdaterTool arguments, or None when the answer is unusable
+        """
+
+        messages = build_messages(user_prompt, candidate_products(user_prompt), self.function_calling)
+        if self.function_calling:
+            result = self.llm.call(
+                messages,
+                tools=[UPDATE_FUNCTION],
+                available_functions={UPDATE_FUNCTION_NAME: _submitted_arguments},
+            )
+        else:
+            result = self.llm.call(messages)
+        return parse_update_call(result)
+
+    def apply(self, arguments: Dict[str, Any]) -> str:
+        """Fetches the product's configuration, then applies the update; returns the updater tool result"""
+
+        get_product_configuration._run(arguments["product_name"])
+        return update_product_config._run(**arguments)
+
+    async def aapply(self, arguments: Dict[str, Any]) -> str:
+        """Async version of apply using the non-blocking HTTP client"""
+
+        await get_product_configuration._arun(arguments["product_name"])
+        return await update_product_config._arun(**arguments)
+
+    def run(self, user_prompt: str) -> Optional[str]:
+        """
+        Handles a prompt with one LLM call and direct tool calls
+
+        Args:
+            user_prompt: Natural language request for product configuration update
+
+        Returns:
+            Updater tool result, or None when the model gave no usable payload
+            (the caller should fall back to the crew)
+        """
+
+        arguments = self.request_update(user_prompt)
+        _emit_updates_parsed(arguments)
+        return self.apply(arguments) if arguments is not None else None
+
+    async def arun(self, user_prompt: str) -> Optional[str]:
+        """Async version of run; the LLM call runs in a worker thread"""
+
+        arguments = await asyncio.to_thread(self.request_update, user_prompt)
+        _emit_updates_parsed(arguments)
+        return await self.aapply(arguments) if arguments is not None else None
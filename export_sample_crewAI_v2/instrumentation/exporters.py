@@ -0,0 +1,169 @@
+"""
+Instrumentation Exporters - JSONL record sink and Prometheus text-format metrics
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Span durations in seconds, from a fast tool call up to the 300s crew budget
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Fraction of max_execution_time a kickoff used
+BUDGET_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+
+class JsonlSink:
+    """
+    Appends one JSON object per line to a file, flushing after every record
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class PrometheusMetrics:
+    """
+    Minimal thread-safe registry of labelled counters, gauges and histograms,
+    rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self, namespace: str = "crew"):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        """Declares a counter"""
+        with self._lock:
+            self._help[name] = ("counter", help_text)
+            self._counters.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str) -> None:
+        """Declares a gauge"""
+        with self._lock:
+            self._help[name] = ("gauge", help_text)
+            self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DURATION_BUCKETS) -> None:
+        """Declares a histogram"""
+        with self._lock:
+            self._help[name] = ("histogram", help_text)
+            self._histograms.setdefault(name, {})
+            self._buckets[name] = buckets
+
+    def inc(self, metric: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters[metric]
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, metric: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[metric][key] = value
+
+    def observe(self, metric: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[metric]
+            if key not in series:
+                series[key] = _Histogram(self._buckets[metric])
+            series[key].observe(value)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text format"""
+
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, help_text) in sorted(self._help.items()):
+                full = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                if kind in ("counter", "gauge"):
+                    for labels, value in sorted(self._counters[name].items()):
+                        lines.append(f"{full}{_labels(labels)} {value:g}")
+                    continue
+                for labels, histogram in sorted(self._histograms[name].items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{full}_bucket{_labels(labels, ('le', f'{bound:g}'))} {count}")
+                    lines.append(f"{full}_bucket{_labels(labels, ('le', '+Inf'))} {histogram.total}")
+                    lines.append(f"{full}_sum{_labels(labels)} {histogram.sum:g}")
+                    lines.append(f"{full}_count{_labels(labels)} {histogram.total}")
+        return "\n".join(lines) + "\n"
+
+
+def serve_metrics(metrics: PrometheusMetrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves GET /metrics on a background thread
+
+    Args:
+        metrics: Registry to expose
+        port: TCP port (0 picks a free one; see server.server_address)
+        host: Interface to bind
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
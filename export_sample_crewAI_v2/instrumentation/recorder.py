@@ -0,0 +1,390 @@
+"""
+Crew Instrumentation - Structured timings, token counts and tool-call metrics from the CrewAI event bus
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from crewai.events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskFailedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+    crewai_event_bus,
+)
+
+from instrumentation.exporters import BUDGET_BUCKETS, JsonlSink, PrometheusMetrics, serve_metrics
+from llm.tokens import count_message_tokens, count_tokens, message_text, token_source
+
+STAGE_BY_ROLE = {
+    "Product Analyzer": "analysis_task",
+    "Product Configuration Updater": "update_task",
+}
+
+ITERATION_BUCKETS = (1, 2, 3, 5, 10)
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(value.encode("utf-8"))
+
+
+def _task_stage(task: Any) -> str:
+    role = getattr(getattr(task, "agent", None), "role", "") or ""
+    return STAGE_BY_ROLE.get(role, f"task:{role or 'unknown'}")
+
+
+class _Span:
+    """Open span with the LLM/tool time and counters accumulated inside it"""
+
+    def __init__(self, **fields: Any):
+        self.started = time.perf_counter()
+        self.fields = fields
+        self.llm_s = 0.0
+        self.tool_s = 0.0
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.retries = 0
+        self.errors = 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def totals(self) -> Dict[str, Any]:
+        return {
+            "llm_ms": self.llm_s * 1000,
+            "tool_ms": self.tool_s * 1000,
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+            "tokens_in": self.tokens_in,
+            "tokens_out": self.tokens_out,
+            "retries": self.retries,
+            "errors": self.errors,
+        }
+
+
+class _ThreadState(threading.local):
+    # A kickoff runs its tasks, agent loop, LLM and tool calls on one thread
+    # and the event bus calls handlers on the emitting thread, so open spans
+    # live in thread-local state
+    def __init__(self):
+        self.kickoff: Optional[_Span] = None
+        self.task: Optional[_Span] = None
+        self.iteration: Optional[_Span] = None
+        self.llm: Optional[_Span] = None
+        self.llm_failures = 0
+        self.tools: Dict[str, _Span] = {}
+
+
+class Instrumentation:
+    """
+    Event-bus listener that turns a crew run into structured records.
+
+    One record is emitted per span, each with type, kickoff_id, ts (wall clock
+    at the end of the span), duration_ms and status:
+      kickoff          - whole crew kickoff, with the share of the
+                         max_execution_time budget it used and how much of it
+                         was LLM, tool and other (framework) time
+      task             - one task (stage analysis_task / update_task) with its
+                         agent iteration count
+      agent_iteration  - one pass of the agent loop: from an LLM call to the
+                         next one (or the end of the task), including any tool
+                         call it made
+      llm_call         - one completion: tokens and bytes in/out, retries
+      tool_call        - one tool invocation: argument/output bytes, retries,
+                         whether CrewAI served it from its tool cache
+    Records go to every sink (e.g. JsonlSink.write) and are aggregated into
+    Prometheus metrics.
+    """
+
+    def __init__(self, budget_s: float = 300.0, metrics: Optional[PrometheusMetrics] = None):
+        """
+        Args:
+            budget_s: Crew max_execution_time the kickoff durations are compared to
+            metrics: Registry to update (a new one by default)
+        """
+
+        self.budget_s = budget_s
+        self.metrics = metrics or PrometheusMetrics()
+        self.sinks: List[Callable[[Dict[str, Any]], None]] = []
+        self.server = None
+        self._state = _ThreadState()
+        self._registered = False
+
+        self.metrics.histogram("stage_duration_seconds", "Duration of crew stages (kickoff, task, agent_iteration, llm_call, tool_call)")
+        self.metrics.histogram("kickoff_budget_used_ratio", "Fraction of max_execution_time used by a kickoff", BUDGET_BUCKETS)
+        self.metrics.histogram("task_iterations", "Agent iterations per task", ITERATION_BUCKETS)
+        self.metrics.counter("llm_tokens_total", "LLM tokens by direction")
+        self.metrics.counter("payload_bytes_total", "LLM and tool payload bytes by direction")
+        self.metrics.counter("retries_total", "LLM and tool retries")
+        self.metrics.counter("errors_total", "Failed stages")
+
+    def add_sink(self, sink: Callable[[Dict[str, Any]], None]) -> None:
+        self.sinks.append(sink)
+
+    def _emit(self, record_type: str, span: _Span, status: str = "ok", **fields: Any) -> Dict[str, Any]:
+        duration = span.elapsed()
+        kickoff = self._state.kickoff
+        record = {
+            "type": record_type,
+            "kickoff_id": kickoff.fields["kickoff_id"] if kickoff else None,
+            "ts": time.time(),
+            "duration_ms": duration * 1000,
+            "status": status,
+            **span.fields,
+            **fields,
+        }
+        name = record.get("stage") or record.get("tool") or record.get("model") or record_type
+        self.metrics.observe("stage_duration_seconds", duration, stage=record_type, name=name)
+        if status != "ok":
+            self.metrics.inc("errors_total", stage=record_type, name=name)
+        for sink in self.sinks:
+            sink(record)
+        return record
+
+    def _open_spans(self) -> List[_Span]:
+        state = self._state
+        return [span for span in (state.kickoff, state.task, state.iteration) if span is not None]
+
+    # Kickoff
+
+    def _kickoff_started(self, source, event) -> None:
+        self._state.kickoff = _Span(kickoff_id=uuid.uuid4().hex[:12])
+        self._state.task = self._state.iteration = self._state.llm = None
+        self._state.tools = {}
+
+    def _kickoff_finished(self, source, event, status: str = "ok") -> None:
+        span = self._state.kickoff
+        if span is None:
+            return
+        duration = span.elapsed()
+        self.metrics.observe("kickoff_budget_used_ratio", duration / self.budget_s)
+        self._emit(
+            "kickoff",
+            span,
+            status,
+            budget_s=self.budget_s,
+            budget_used_pct=100 * duration / self.budget_s,
+            other_ms=(duration - span.llm_s - span.tool_s) * 1000,
+            **span.totals(),
+        )
+        self._state.kickoff = None
+
+    # Tasks and agent iterations
+
+    def _task_started(self, source, event) -> None:
+        agent = getattr(source, "agent", None)
+        self._state.task = _Span(stage=_task_stage(source), max_iter=getattr(agent, "max_iter", None), iterations=0)
+        self._state.iteration = None
+
+    def _close_iteration(self, status: str = "ok") -> None:
+        span = self._state.iteration
+        if span is None:
+            return
+        self._emit("agent_iteration", span, status, **span.totals())
+        self._state.iteration = None
+
+    def _task_finished(self, source, event, status: str = "ok") -> None:
+        self._close_iteration(status)
+        span = self._state.task
+        if span is None:
+            return
+        iterations = span.fields["iterations"]
+        self.metrics.observe("task_iterations", iterations, stage=span.fields["stage"])
+        self._emit("task", span, status, **span.totals())
+        self._state.task = None
+
+    # LLM calls
+
+    def _llm_started(self, source, event) -> None:
+        task = self._state.task
+        if task is not None:
+            self._close_iteration()
+            task.fields["iterations"] += 1
+            self._state.iteration = _Span(stage=task.fields["stage"], iteration=task.fields["iterations"])
+        model = event.model or getattr(source, "model", "") or ""
+        prompt = message_text(event.messages)
+        self._state.llm = _Span(
+            model=model,
+            tokens_in=count_message_tokens(event.messages, model),
+            bytes_in=len(prompt.encode("utf-8")),
+        )
+
+    def _llm_finished(self, source, event, status: str = "ok") -> None:
+        span = self._state.llm
+        if span is None:
+            return
+        self._state.llm = None
+
+        model = span.fields["model"]
+        response = getattr(event, "response", None)
+        tokens_out = count_tokens(response if isinstance(response, str) else json.dumps(response, default=str), model) if response else 0
+        retries = self._state.llm_failures
+        if status == "ok":
+            self._state.llm_failures = 0
+        else:
+            self._state.llm_failures += 1
+
+        duration = span.elapsed()
+        for parent in self._open_spans():
+            parent.llm_s += duration
+            parent.llm_calls += 1
+            parent.tokens_in += span.fields["tokens_in"]
+            parent.tokens_out += tokens_out
+            parent.retries += retries
+            parent.errors += status != "ok"
+
+        self.metrics.inc("llm_tokens_total", span.fields["tokens_in"], model=model, direction="in")
+        self.metrics.inc("llm_tokens_total", tokens_out, model=model, direction="out")
+        self.metrics.inc("payload_bytes_total", span.fields["bytes_in"], stage="llm_call", name=model, direction="in")
+        self.metrics.inc("payload_bytes_total", _size(response), stage="llm_call", name=model, direction="out")
+        if retries:
+            self.metrics.inc("retries_total", retries, stage="llm_call", name=model)
+
+        self._emit(
+            "llm_call",
+            span,
+            status,
+            stage=self._state.task.fields["stage"] if self._state.task else None,
+            tokens_out=tokens_out,
+            token_source=token_source(model),
+            bytes_out=_size(response),
+            retries=retries,
+            error=str(getattr(event, "error", "")) or None,
+        )
+
+    # Tool calls
+
+    def _tool_started(self, source, event) -> None:
+        self._state.tools[event.tool_name] = _Span(tool=event.tool_name, bytes_in=_size(event.tool_args))
+
+    def _tool_finished(self, source, event, status: str = "ok") -> None:
+        span = self._state.tools.pop(event.tool_name, None)
+        if span is None:
+            return
+
+        output = getattr(event, "output", None)
+        retries = max((event.run_attempts or 1) - 1, 0)
+        duration = span.elapsed()
+        for parent in self._open_spans():
+            parent.tool_s += duration
+            parent.tool_calls += 1
+            parent.retries += retries
+            parent.errors += status != "ok"
+
+        tool = event.tool_name
+        self.metrics.inc("payload_bytes_total", span.fields["bytes_in"], stage="tool_call", name=tool, direction="in")
+        self.metrics.inc("payload_bytes_total", _size(output), stage="tool_call", name=tool, direction="out")
+        if retries:
+            self.metrics.inc("retries_total", retries, stage="tool_call", name=tool)
+
+        self._emit(
+            "tool_call",
+            span,
+            status,
+            stage=self._state.task.fields["stage"] if self._state.task else None,
+            bytes_out=_size(output),
+            retries=retries,
+            from_cache=bool(getattr(event, "from_cache", False)),
+            error=str(getattr(event, "error", "")) or None,
+        )
+
+    def register(self) -> None:
+        """Subscribes to the CrewAI event bus (once per process)"""
+
+        if self._registered:
+            return
+        self._registered = True
+
+        handlers = [
+            (CrewKickoffStartedEvent, self._kickoff_started),
+            (CrewKickoffCompletedEvent, self._kickoff_finished),
+            (CrewKickoffFailedEvent, lambda source, event: self._kickoff_finished(source, event, "error")),
+            (TaskStartedEvent, self._task_started),
+            (TaskCompletedEvent, self._task_finished),
+            (TaskFailedEvent, lambda source, event: self._task_finished(source, event, "error")),
+            (LLMCallStartedEvent, self._llm_started),
+            (LLMCallCompletedEvent, self._llm_finished),
+            (LLMCallFailedEvent, lambda source, event: self._llm_finished(source, event, "error")),
+            (ToolUsageStartedEvent, self._tool_started),
+            (ToolUsageFinishedEvent, self._tool_finished),
+            (ToolUsageErrorEvent, lambda source, event: self._tool_finished(source, event, "error")),
+        ]
+        for event_type, handler in handlers:
+            crewai_event_bus.on(event_type)(handler)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Exposes the metrics on http://host:port/metrics"""
+
+        if self.server is None:
+            self.server = serve_metrics(self.metrics, port, host)
+
+
+_instrumentation: Optional[Instrumentation] = None
+_jsonl_sinks: Dict[str, JsonlSink] = {}
+_instrumentation_lock = threading.Lock()
+
+
+def configure_instrumentation(
+    jsonl_path: Optional[str] = None,
+    metrics_port: Optional[int] = None,
+    budget_s: float = 300.0,
+) -> Instrumentation:
+    """
+    Returns the process-wide Instrumentation, registering it on first use
+
+    Args:
+        jsonl_path: Append one JSON record per span to this file
+        metrics_port: Serve Prometheus metrics on this port
+        budget_s: Crew max_execution_time to report kickoff durations against
+
+    Returns:
+        The shared Instrumentation instance
+    """
+
+    global _instrumentation
+    with _instrumentation_lock:
+        if _instrumentation is None:
+            _instrumentation = Instrumentation(budget_s)
+            _instrumentation.register()
+        _instrumentation.budget_s = budget_s
+        if jsonl_path:
+            path = os.path.abspath(jsonl_path)
+            if path not in _jsonl_sinks:
+                _jsonl_sinks[path] = JsonlSink(path)
+                _instrumentation.add_sink(_jsonl_sinks[path].write)
+        if metrics_port is not None:
+            _instrumentation.serve(metrics_port)
+        return _instrumentation
+
+
+def instrumentation_from_env(budget_s: float = 300.0) -> Optional[Instrumentation]:
+    """
+    Enables instrumentation from CREW_METRICS_JSONL and CREW_METRICS_PORT
+
+    Returns:
+        The shared Instrumentation, or None when neither variable is set
+    """
+
+    jsonl_path = os.environ.get("CREW_METRICS_JSONL") or None
+    port = os.environ.get("CREW_METRICS_PORT") or None
+    if jsonl_path is None and port is None:
+        return None
+    return configure_instrumentation(jsonl_path, int(port) if port is not None else None, budget_s)
@@ -0,0 +1,130 @@
+"""
+Run Events - Typed progress events of one prompt run, delivered to the caller as they happen
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ClassVar, Dict, Iterator, List, Optional
+
+
+@dataclass(frozen=True)
+class RunEvent:
+    """
+    Base class of run events
+
+    elapsed_ms is the time since the run started (since capture() was entered).
+    """
+
+    type: ClassVar[str] = "event"
+    elapsed_ms: float = field(default=0.0, kw_only=True)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, with the event type under "type" """
+
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass(frozen=True)
+class ProductResolved(RunEvent):
+    """The product the prompt refers to is known"""
+
+    type: ClassVar[str] = "product_resolved"
+    product_name: str
+    requested_name: str
+    source: str  # "fast_path" or "search"
+
+
+@dataclass(frozen=True)
+class ConfigFetched(RunEvent):
+    """The product's current configuration was read (from the API or the config cache)"""
+
+    type: ClassVar[str] = "config_fetched"
+    product_name: str
+    products: List[Dict[str, Any]]
+    from_cache: bool
+
+
+@dataclass(frozen=True)
+class UpdatesParsed(RunEvent):
+    """The requested field changes were extracted from the prompt"""
+
+    type: ClassVar[str] = "updates_parsed"
+    product_name: str
+    updates: Dict[str, Any]
+    source: str  # "fast_path", "single_call" or "analysis_task"
+
+
+@dataclass(frozen=True)
+class UpdatePosted(RunEvent):
+    """An update was applied, skipped or rejected; sent tells whether a request went out"""
+
+    type: ClassVar[str] = "update_posted"
+    product_name: str
+    payload: Dict[str, Any]
+    sent: bool
+    success: bool
+    message: str
+
+
+@dataclass(frozen=True)
+class FinalResult(RunEvent):
+    """The run finished; result is what run()/arun() return, as text"""
+
+    type: ClassVar[str] = "final_result"
+    result: str
+    path: str  # "fast_path", "single_call" or "crew"
+
+
+@dataclass(frozen=True)
+class RunFailed(RunEvent):
+    """The run raised; no FinalResult follows"""
+
+    type: ClassVar[str] = "run_failed"
+    error: str
+    error_type: str
+
+
+class _Capture:
+    __slots__ = ("sink", "started")
+
+    def __init__(self, sink: Callable[[RunEvent], None]):
+        self.sink = sink
+        self.started = time.perf_counter()
+
+
+# Context variables follow a run into asyncio.to_thread workers and tasks;
+# CrewAI runs a kickoff's tasks, tools and callbacks on the kickoff's thread
+_capture: ContextVar[Optional[_Capture]] = ContextVar("run_event_capture", default=None)
+
+
+@contextmanager
+def capture(sink: Callable[[RunEvent], None]) -> Iterator[None]:
+    """
+    Delivers the run events emitted in this context to sink
+
+    Args:
+        sink: Called with each event on the emitting thread; must be thread-safe
+    """
+
+    token = _capture.set(_Capture(sink))
+    try:
+        yield
+    finally:
+        _capture.reset(token)
+
+
+def capturing() -> bool:
+    """Whether events emitted here are delivered anywhere (to skip building unused ones)"""
+
+    return _capture.get() is not None
+
+
+def emit(event_type: type, **fields: Any) -> None:
+    """Builds an event of event_type and hands it to the current sink; a no-op outside capture()"""
+
+    current = _capture.get()
+    if current is None:
+        return
+    current.sink(event_type(elapsed_ms=(time.perf_counter() - current.started) * 1000, **fields))
@@ -0,0 +1,89 @@
+"""
+Cached LLM - crewai LLM that serves repeated completions from the persistent completion cache
+"""
+
+from typing import Any, Dict, List, Optional
+
+from crewai import LLM
+
+from llm.completion_cache import CompletionCache
+from llm.rate_limited_llm import RateLimitedLLM
+
+
+# LLM attributes that change the completion and therefore belong in the cache key
+KEY_PARAMS = (
+    "temperature",
+    "top_p",
+    "n",
+    "stop",
+    "max_tokens",
+    "max_completion_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "logit_bias",
+    "seed",
+    "reasoning_effort",
+    "additional_params",
+)
+
+# Client settings passed through additional_params that do not change the completion
+TRANSPORT_PARAMS = ("max_retries",)
+
+
+def request_params(llm: LLM) -> Dict[str, Any]:
+    """Returns the LLM settings that shape a completion, for use in request keys"""
+
+    params = {name: getattr(llm, name, None) for name in KEY_PARAMS}
+    if params["additional_params"]:
+        params["additional_params"] = {
+            name: value for name, value in params["additional_params"].items() if name not in TRANSPORT_PARAMS
+        }
+    if llm.response_format is not None:
+        params["response_format"] = getattr(llm.response_format, "__name__", str(llm.response_format))
+    return params
+
+
+class CachedLLM(RateLimitedLLM):
+    """
+    LLM that looks up each text completion in a CompletionCache before calling the provider.
+
+    Only plain text calls are cached. Calls with tool schemas or available
+    functions pass straight through, because litellm may execute a function
+    as part of such a call and replaying its result would skip the side effect.
+    """
+
+    def __init__(self, model: str, cache: CompletionCache, **kwargs):
+        """
+        Args:
+            model: Model identifier, e.g. "gpt-4o-mini"
+            cache: Completion cache shared by all LLMs of this process
+            **kwargs: Any other crewai.LLM argument
+        """
+
+        super().__init__(model=model, **kwargs)
+        self.cache = cache
+
+    def call(
+        self,
+        messages: str | List[Dict[str, str]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> str | Any:
+        if tools or available_functions:
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        key = CompletionCache.make_key(self.model, request_params(self), messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+        if isinstance(result, str) and result:
+            self.cache.put(key, self.model, result)
+        return result
@@ -0,0 +1,204 @@
+"""
+LLM Cassette - Record/replay store for LLM request/response traffic
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request has no recorded response"""
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def request_key(model: str, params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+    """Exact match key: model, sampling parameters and the full message history"""
+    return _digest({"model": model, "params": params, "messages": messages})
+
+
+def turn_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """
+    Fallback key: the agent/task opening (system and first user message) plus
+    the turn number. Tool observations that embed timestamps or ids change the
+    exact key between runs but not this one.
+    """
+    return _digest({"model": model, "opening": messages[:2], "turn": len(messages)})
+
+
+class Cassette:
+    """
+    SQLite file of recorded LLM interactions, indexed by request and by turn.
+
+    Record mode appends every completion with its compressed request and the
+    observed latency. Replay mode serves responses with no network access and
+    no delay: an exact request match first, then the same turn of the same
+    agent/task conversation; anything else raises CassetteMissError. When a
+    request was recorded several times, replays return the recordings in
+    order and then keep returning the last one.
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY):
+        """
+        Args:
+            path: Cassette file
+            mode: "record" or "replay"
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of: {', '.join(MODES)}")
+        if mode == REPLAY and not os.path.exists(path):
+            raise FileNotFoundError(f"Cassette not found: {path}")
+
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        # Default rollback journal keeps the cassette a single shareable file
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS interactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                request_key TEXT NOT NULL,
+                turn_key TEXT NOT NULL,
+                model TEXT NOT NULL,
+                request BLOB NOT NULL,
+                response TEXT NOT NULL,
+                latency_ms REAL NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS interactions_request ON interactions (request_key, id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS interactions_turn ON interactions (turn_key, id)")
+        self._played: Dict[str, int] = {}
+        self.recorded = 0
+        self.exact_hits = 0
+        self.turn_hits = 0
+        self.misses = 0
+
+    def record(
+        self,
+        model: str,
+        params: Dict[str, Any],
+        messages: List[Dict[str, Any]],
+        response: str,
+        latency_s: float,
+    ) -> None:
+        """Appends one interaction"""
+
+        request = zlib.compress(json.dumps({"params": params, "messages": messages}, default=str).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO interactions (request_key, turn_key, model, request, response, latency_ms, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    request_key(model, params, messages),
+                    turn_key(model, messages),
+                    model,
+                    request,
+                    response,
+                    latency_s * 1000,
+                    time.time(),
+                ),
+            )
+            self.recorded += 1
+
+    def _next(self, column: str, key: str) -> Optional[str]:
+        played = self._played.get(key, 0)
+        row = self._conn.execute(
+            f"SELECT response FROM interactions WHERE {column} = ? ORDER BY id LIMIT 1 OFFSET ?",
+            (key, played),
+        ).fetchone()
+        if row is None and played:
+            row = self._conn.execute(
+                f"SELECT response FROM interactions WHERE {column} = ? ORDER BY id DESC LIMIT 1",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        self._played[key] = played + 1
+        return row[0]
+
+    def play(self, model: str, params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """
+        Returns the recorded response for a request
+
+        Raises:
+            CassetteMissError: Nothing was recorded for this request or turn
+        """
+
+        with self._lock:
+            response = self._next("request_key", request_key(model, params, messages))
+            if response is not None:
+                self.exact_hits += 1
+                return response
+
+            response = self._next("turn_key", turn_key(model, messages))
+            if response is not None:
+                self.turn_hits += 1
+                return response
+
+            self.misses += 1
+        raise CassetteMissError(
+            f"No recorded response in {self.path} for this {model} request "
+            f"({len(messages)} messages); record it again with LLM_CASSETTE_MODE=record"
+        )
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns cassette usage
+
+        Returns:
+            Dict with mode, stored interactions and their size, recorded count,
+            exact/turn replay hits, misses and recorded LLM time
+        """
+
+        with self._lock:
+            interactions, size, latency = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(request) + LENGTH(response)), 0), "
+                "COALESCE(SUM(latency_ms), 0) FROM interactions"
+            ).fetchone()
+            return {
+                "path": self.path,
+                "mode": self.mode,
+                "interactions": interactions,
+                "bytes": size,
+                "recorded_llm_time_ms": latency,
+                "recorded": self.recorded,
+                "exact_hits": self.exact_hits,
+                "turn_hits": self.turn_hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_cassette(path: str, mode: str) -> Cassette:
+    """Returns the process-wide cassette for a file path"""
+
+    path = os.path.abspath(path)
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None or cassette.mode != mode:
+            cassette = Cassette(path, mode)
+            _cassettes[path] = cassette
+        return cassette
@@ -0,0 +1,79 @@
+"""
+Cassette LLM - crewai LLM that records its traffic to a cassette or replays it offline
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai.events import LLMCallCompletedEvent, LLMCallStartedEvent, crewai_event_bus
+from crewai.events.types.llm_events import LLMCallType
+
+from llm.cached_llm import request_params
+from llm.cassette import RECORD, Cassette, CassetteMissError
+from llm.rate_limited_llm import RateLimitedLLM
+
+
+class CassetteLLM(RateLimitedLLM):
+    """
+    LLM that records every text completion to a Cassette, or serves them from it.
+
+    In record mode calls go to the provider as usual and each response is
+    appended to the cassette with its latency. In replay mode the provider is
+    never contacted and nothing sleeps; the LLM call events are still emitted
+    so event-bus listeners see the same call sequence as a live run.
+    Calls with tool schemas or available functions are not recorded (see
+    CachedLLM) and cannot be replayed.
+    """
+
+    def __init__(self, model: str, cassette: Cassette, **kwargs):
+        """
+        Args:
+            model: Model identifier, e.g. "gpt-4o-mini"
+            cassette: Cassette shared by all LLMs of this process
+            **kwargs: Any other crewai.LLM argument
+        """
+
+        super().__init__(model=model, **kwargs)
+        self.cassette = cassette
+
+    def call(
+        self,
+        messages: str | List[Dict[str, str]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> str | Any:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        if tools or available_functions:
+            if self.cassette.mode != RECORD:
+                raise CassetteMissError("Function-calling requests are not recorded and cannot be replayed")
+            return super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+
+        if self.cassette.mode == RECORD:
+            started = time.perf_counter()
+            result = super().call(messages, tools, callbacks, available_functions, from_task, from_agent)
+            if isinstance(result, str) and result:
+                self.cassette.record(self.model, request_params(self), messages, result, time.perf_counter() - started)
+            return result
+
+        crewai_event_bus.emit(
+            self,
+            LLMCallStartedEvent(messages=messages, model=self.model, from_task=from_task, from_agent=from_agent),
+        )
+        response = self.cassette.play(self.model, request_params(self), messages)
+        crewai_event_bus.emit(
+            self,
+            LLMCallCompletedEvent(
+                messages=messages,
+                response=response,
+                call_type=LLMCallType.LLM_CALL,
+                model=self.model,
+                from_task=from_task,
+                from_agent=from_agent,
+            ),
+        )
+        return response
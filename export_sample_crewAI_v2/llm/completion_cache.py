@@ -0,0 +1,167 @@
+"""
+LLM Completion Cache - Persistent SQLite cache for deterministic LLM completions
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class CompletionCache:
+    """
+    On-disk completion store keyed by model, sampling parameters and message history.
+
+    Entries are evicted least-recently-used first once the cache holds more
+    than max_entries rows or max_bytes of response text. Hit/miss counters
+    cover the lifetime of this object; the row count and size are read from
+    the database so they include earlier runs.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 100 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite database file
+            max_entries: Maximum number of cached completions
+            max_bytes: Maximum total size of cached response text
+        """
+
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used_at)")
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, params: Dict[str, Any], messages: List[Dict[str, Any]]) -> str:
+        """Builds a stable cache key from the request that would be sent to the model"""
+
+        payload = json.dumps({"model": model, "params": params, "messages": messages}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached completion for a key, or None on a miss"""
+
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE completions SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """Stores a completion and evicts least-recently-used entries over the limits"""
+
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, response, size, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self.stores += 1
+            self._evict()
+
+    def _evict(self) -> None:
+        entries, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        # Walk from the least recently used end and stop as soon as both limits hold
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used_at ASC"):
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            stale.append((key,))
+            entries -= 1
+            total_bytes -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self) -> None:
+        """Deletes all cached completions"""
+
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns cache usage for this process and the database as a whole
+
+        Returns:
+            Dict with hits, misses, hit_rate, stores, evictions, entries and bytes
+        """
+
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_caches: Dict[str, CompletionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_completion_cache(path: str) -> CompletionCache:
+    """
+    Returns the process-wide cache for a database path
+
+    Size limits come from LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_BYTES.
+    """
+
+    path = os.path.abspath(path)
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = CompletionCache(
+                path,
+                max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "10000")),
+                max_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(100 * 1024 * 1024))),
+            )
+            _caches[path] = cache
+        return cache
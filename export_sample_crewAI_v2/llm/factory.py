@@ -0,0 +1,86 @@
+"""
+LLM Factory - Builds the LLM clients used by the crew and its agents
+"""
+
+import os
+from typing import Optional
+
+from crewai import LLM
+
+from llm.cached_llm import CachedLLM
+from llm.cassette import Cassette, get_cassette
+from llm.cassette_llm import CassetteLLM
+from llm.completion_cache import CompletionCache, get_completion_cache
+from llm.rate_limited_llm import RateLimitedLLM
+
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Deterministic settings shared by the analyzer and updater agents
+DETERMINISTIC_SETTINGS = {
+    "temperature": 0.0,
+    "seed": 42,
+    "top_p": 0.1,
+    "max_tokens": 1500,
+}
+
+
+def resolve_cache(cache_path: Optional[str] = None) -> Optional[CompletionCache]:
+    """
+    Returns the completion cache to use, or None when caching is off
+
+    Caching is opt-in: pass cache_path or set LLM_CACHE_PATH.
+    """
+
+    cache_path = cache_path or os.environ.get("LLM_CACHE_PATH")
+    return get_completion_cache(cache_path) if cache_path else None
+
+
+def resolve_cassette(cassette_path: Optional[str] = None, cassette_mode: Optional[str] = None) -> Optional[Cassette]:
+    """
+    Returns the record/replay cassette to use, or None when it is off
+
+    Enabled by passing cassette_path or setting LLM_CASSETTE_PATH; the mode
+    comes from cassette_mode or LLM_CASSETTE_MODE ("record" or "replay",
+    default "replay").
+    """
+
+    cassette_path = cassette_path or os.environ.get("LLM_CASSETTE_PATH")
+    if not cassette_path:
+        return None
+    return get_cassette(cassette_path, cassette_mode or os.environ.get("LLM_CASSETTE_MODE", "replay"))
+
+
+def create_llm(
+    model: str = DEFAULT_MODEL,
+    cache_path: Optional[str] = None,
+    cassette_path: Optional[str] = None,
+    cassette_mode: Optional[str] = None,
+    **params,
+) -> LLM:
+    """
+    Creates an LLM client, backed by a cassette or the completion cache when enabled
+
+    A cassette takes precedence over the completion cache, so recordings
+    always capture real provider responses. Requests that reach the provider
+    go through the model's process-wide rate limiter (llm/rate_limiter.py).
+
+    Args:
+        model: Model identifier
+        cache_path: Completion cache database (defaults to LLM_CACHE_PATH)
+        cassette_path: Record/replay cassette file (defaults to LLM_CASSETTE_PATH)
+        cassette_mode: "record" or "replay" (defaults to LLM_CASSETTE_MODE)
+        **params: crewai.LLM parameters such as temperature or seed
+
+    Returns:
+        crewai LLM instance
+    """
+
+    cassette = resolve_cassette(cassette_path, cassette_mode)
+    if cassette is not None:
+        return CassetteLLM(model=model, cassette=cassette, **params)
+
+    cache = resolve_cache(cache_path)
+    if cache is not None:
+        return CachedLLM(model=model, cache=cache, **params)
+    return RateLimitedLLM(model=model, **params)
@@ -0,0 +1,73 @@
+"""
+Rate-Limited LLM - crewai LLM whose provider calls go through the process-wide rate limiter
+"""
+
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from crewai import LLM
+
+from llm.rate_limiter import DEFAULT_COMPLETION_TOKENS, RateLimiter, get_rate_limiter
+from llm.tokens import count_message_tokens, count_tokens
+
+
+# Set while a request holds a permit; crewai's streaming handler can fall back to a
+# non-streaming request, which must not wait for a second permit
+_admitted: ContextVar[bool] = ContextVar("llm_rate_limit_admitted", default=False)
+
+
+class RateLimitedLLM(LLM):
+    """
+    LLM that admits each provider request through a shared RateLimiter.
+
+    Only the request to the provider is limited (crewai's streaming and
+    non-streaming response handlers), so completions served by CachedLLM or
+    replayed by CassetteLLM, which build on this class, never wait. A 429 is
+    retried by the limiter instead of failing the agent's iteration, and the
+    provider client's own retries are turned off so every 429 reaches it.
+    """
+
+    def __init__(self, model: str, rate_limiter: Optional[RateLimiter] = None, **kwargs):
+        """
+        Args:
+            model: Model identifier, e.g. "gpt-4o-mini"
+            rate_limiter: Limiter to use (defaults to the process-wide one of the
+                model; None when LLM_RATE_LIMITING is off)
+            **kwargs: Any other crewai.LLM argument
+        """
+
+        rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(model)
+        if rate_limiter is not None:
+            # The OpenAI SDK retries 429s on its own, hiding them from the limiter
+            kwargs.setdefault("max_retries", 0)
+        super().__init__(model=model, **kwargs)
+        self.rate_limiter = rate_limiter
+
+    def _limited(self, send, params: dict, *args: Any, **kwargs: Any) -> Any:
+        if self.rate_limiter is None or _admitted.get():
+            return send(params, *args, **kwargs)
+
+        # Providers charge the prompt plus max_tokens at admission; without max_tokens,
+        # a default is reserved and corrected by the answer's actual length
+        prompt_tokens = count_message_tokens(params.get("messages"), self.model)
+        max_tokens = params.get("max_tokens") or params.get("max_completion_tokens")
+
+        def tokens_used(result: Any) -> Optional[int]:
+            return prompt_tokens + count_tokens(result, self.model) if isinstance(result, str) and not max_tokens else None
+
+        reserved = prompt_tokens + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+        def admitted() -> Any:
+            token = _admitted.set(True)
+            try:
+                return send(params, *args, **kwargs)
+            finally:
+                _admitted.reset(token)
+
+        return self.rate_limiter.call(admitted, reserved, tokens_used)
+
+    def _handle_non_streaming_response(self, params: dict, *args: Any, **kwargs: Any) -> Any:
+        return self._limited(super()._handle_non_streaming_response, params, *args, **kwargs)
+
+    def _handle_streaming_response(self, params: dict, *args: Any, **kwargs: Any) -> Any:
+        return self._limited(super()._handle_streaming_response, params, *args, **kwargs)
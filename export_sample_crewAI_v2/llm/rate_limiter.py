@@ -0,0 +1,347 @@
+"""
+LLM Rate Limiter - Process-wide request/token budgets and AIMD concurrency for provider calls
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+
+# Limit and retry provider calls (set LLM_RATE_LIMITING=false to call the provider directly)
+RATE_LIMITING = os.environ.get("LLM_RATE_LIMITING", "true").lower() not in ("0", "false", "no")
+
+# Provider budgets per model; 0 leaves them unlimited and relies on backing off from 429s
+DEFAULT_RPM = float(os.environ.get("LLM_RATE_LIMIT_RPM") or 0)
+DEFAULT_TPM = float(os.environ.get("LLM_RATE_LIMIT_TPM") or 0)
+
+# Seconds of budget a bucket holds; providers enforce per-minute limits over shorter periods
+DEFAULT_BURST_S = float(os.environ.get("LLM_RATE_LIMIT_BURST_S") or 1.0)
+
+# Ceiling of the adaptive concurrency limit
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY") or 16)
+
+# 429 answers retried inside one LLM call, so they do not cost agent iterations
+DEFAULT_MAX_RETRIES = int(os.environ.get("LLM_RATE_LIMIT_RETRIES") or 6)
+
+# Backoff after a 429 without Retry-After: BASE * 2**attempt, capped, with jitter
+BACKOFF_BASE_S = 0.25
+BACKOFF_MAX_S = 20.0
+
+# Completion tokens reserved when the request sets no max_tokens; corrected once the answer is known
+DEFAULT_COMPLETION_TOKENS = 512
+
+T = TypeVar("T")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """True for a provider 429 (litellm/openai RateLimitError or any error with status_code 429)"""
+
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def retry_after_s(error: BaseException) -> Optional[float]:
+    """The provider's Retry-After (or retry-after-ms) hint of a 429, in seconds"""
+
+    headers = getattr(error, "litellm_response_headers", None)
+    if headers is None:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+class TokenBucket:
+    """
+    Budget that refills continuously at `per_minute` and holds `burst_s` seconds of it
+
+    Not thread-safe on its own; RateLimiter guards it. A request larger than
+    the bucket is admitted once the bucket is full and leaves it in debt.
+    """
+
+    def __init__(self, per_minute: float, burst_s: float, now: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_s, 1.0)
+        self.level = self.capacity
+        self._updated = now
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken; 0 when it can be taken now"""
+
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+    def give_back(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+
+class Permit:
+    """One admitted provider call: when it started and what it reserved"""
+
+    __slots__ = ("tokens", "started", "queued_s")
+
+    def __init__(self, tokens: int, started: float, queued_s: float):
+        self.tokens = tokens
+        self.started = started
+        self.queued_s = queued_s
+
+
+class RateLimiter:
+    """
+    Admission control for the provider calls of one model, shared by every LLM of the process
+
+    A call waits until it fits three limits: the requests-per-minute and
+    tokens-per-minute buckets (when configured) and an adaptive concurrency
+    limit. The concurrency limit follows AIMD: each success raises it by
+    1/limit (about +1 per round of calls), each 429 halves it (once per
+    round: calls started before the last decrease do not decrease it again)
+    and pauses admissions for the provider's Retry-After or an exponential
+    backoff. A call that got a 429 is retried up to max_retries times.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_retries: Optional[int] = None,
+        burst_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            rpm: Requests per minute (default LLM_RATE_LIMIT_RPM; 0 for no limit)
+            tpm: Prompt + completion tokens per minute (default LLM_RATE_LIMIT_TPM; 0 for no limit)
+            max_concurrency: Ceiling and starting value of the concurrency limit (default LLM_MAX_CONCURRENCY)
+            min_concurrency: Floor of the concurrency limit
+            max_retries: Retries after a 429 (default LLM_RATE_LIMIT_RETRIES)
+            burst_s: Seconds of budget each bucket holds (default LLM_RATE_LIMIT_BURST_S)
+            clock: Monotonic time source
+        """
+
+        self.rpm = DEFAULT_RPM if rpm is None else rpm
+        self.tpm = DEFAULT_TPM if tpm is None else tpm
+        self.max_concurrency = max(DEFAULT_MAX_CONCURRENCY if max_concurrency is None else max_concurrency, min_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_retries = DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        self.burst_s = DEFAULT_BURST_S if burst_s is None else burst_s
+        self._clock = clock
+        self._cond = threading.Condition()
+        now = clock()
+        self._requests = TokenBucket(self.rpm, self.burst_s, now) if self.rpm > 0 else None
+        self._tokens = TokenBucket(self.tpm, self.burst_s, now) if self.tpm > 0 else None
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = float("-inf")
+        self._waiting: deque = deque()
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._cond:
+            self.calls = 0
+            self.succeeded = 0
+            self.failed = 0
+            self.rate_limited = 0
+            self.retries = 0
+            self.decreases = 0
+            self.queued_s_total = 0.0
+            self._queued = deque(maxlen=10000)
+            self.lowest_limit = self.limit
+
+    def _admission_wait(self, tokens: int, now: float) -> Optional[float]:
+        # Seconds until the call may start; None when it has to wait for a running call to finish
+        if self.in_flight >= int(self.limit):
+            return None
+        wait = max(self._paused_until - now, 0.0)
+        if self._requests is not None:
+            wait = max(wait, self._requests.wait_time(1, now))
+        if self._tokens is not None:
+            wait = max(wait, self._tokens.wait_time(tokens, now))
+        return wait
+
+    def acquire(self, tokens: int = 0, retry: bool = False) -> Permit:
+        """
+        Blocks until a call reserving `tokens` may start
+
+        Calls are admitted in arrival order; a retry goes ahead of first
+        attempts, so a call is not starved by the 429s of a busy period.
+
+        Args:
+            tokens: Estimated prompt + completion tokens of the call
+            retry: The call is being retried after a 429
+
+        Returns:
+            Permit to pass to release()
+        """
+
+        ticket = object()
+        with self._cond:
+            arrived = self._clock()
+            if retry:
+                self._waiting.appendleft(ticket)
+            else:
+                self._waiting.append(ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    wait = self._admission_wait(tokens, now) if self._waiting[0] is ticket else None
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                self._cond.notify_all()
+            if self._requests is not None:
+                self._requests.take(1)
+            if self._tokens is not None:
+                self._tokens.take(tokens)
+            self.in_flight += 1
+            queued = now - arrived
+            self.queued_s_total += queued
+            self._queued.append(queued)
+            return Permit(tokens, now, queued)
+
+    def release(
+        self,
+        permit: Permit,
+        succeeded: bool,
+        rate_limited: bool = False,
+        tokens_used: Optional[int] = None,
+        retry_after: Optional[float] = None,
+        attempt: int = 0,
+    ) -> None:
+        """
+        Ends a call, adjusting the concurrency limit and the token budget
+
+        Args:
+            permit: Returned by acquire()
+            succeeded: The provider answered
+            rate_limited: The provider answered 429
+            tokens_used: Actual tokens of the call; the budget is corrected by the difference
+            retry_after: Provider's Retry-After hint of a 429, in seconds
+            attempt: Retries of this call so far (for the backoff of a 429 without a hint)
+        """
+
+        with self._cond:
+            self.in_flight -= 1
+            if self._tokens is not None and tokens_used is not None:
+                if tokens_used < permit.tokens:
+                    self._tokens.give_back(permit.tokens - tokens_used)
+                else:
+                    self._tokens.take(tokens_used - permit.tokens)
+            if rate_limited:
+                self.rate_limited += 1
+                if permit.started >= self._last_decrease:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.lowest_limit = min(self.lowest_limit, self.limit)
+                    self._last_decrease = self._clock()
+                    self.decreases += 1
+                if retry_after is None:
+                    retry_after = min(BACKOFF_BASE_S * 2 ** attempt, BACKOFF_MAX_S) * random.uniform(0.5, 1.0)
+                self._paused_until = max(self._paused_until, self._clock() + retry_after)
+            elif succeeded:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[], T], tokens: int = 0, tokens_used: Optional[Callable[[T], Optional[int]]] = None) -> T:
+        """
+        Runs one provider call under the limits, retrying it after 429s
+
+        Args:
+            fn: Makes the provider call
+            tokens: Estimated prompt + completion tokens
+            tokens_used: Computes the actual tokens from the result, or None to keep the reservation
+
+        Returns:
+            The result of fn; the last 429 (or any other error) is raised
+        """
+
+        with self._cond:
+            self.calls += 1
+        attempt = 0
+        while True:
+            permit = self.acquire(tokens, retry=attempt > 0)
+            try:
+                result = fn()
+            except Exception as e:
+                limited = is_rate_limit_error(e)
+                self.release(permit, False, rate_limited=limited, retry_after=retry_after_s(e) if limited else None, attempt=attempt)
+                if limited and attempt < self.max_retries:
+                    attempt += 1
+                    with self._cond:
+                        self.retries += 1
+                    continue
+                with self._cond:
+                    self.failed += 1
+                raise
+            self.release(permit, True, tokens_used=tokens_used(result) if tokens_used else None)
+            with self._cond:
+                self.succeeded += 1
+            return result
+
+    def report(self) -> Dict[str, Any]:
+        """Returns call counts, 429s, queueing delay and the current concurrency limit"""
+
+        with self._cond:
+            queued = sorted(self._queued)
+            return {
+                "calls": self.calls,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "queued_ms_avg": self.queued_s_total * 1000 / len(queued) if queued else 0.0,
+                "queued_ms_p50": queued[len(queued) // 2] * 1000 if queued else 0.0,
+                "queued_ms_p95": queued[min(len(queued) - 1, int(len(queued) * 0.95))] * 1000 if queued else 0.0,
+                "queued_ms_max": queued[-1] * 1000 if queued else 0.0,
+                "concurrency_limit": round(self.limit, 2),
+                "lowest_concurrency_limit": round(self.lowest_limit, 2),
+                "limit_decreases": self.decreases,
+                "in_flight": self.in_flight,
+                "waiting": len(self._waiting),
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+            }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """Returns the process-wide limiter of a model, or None when LLM_RATE_LIMITING is off"""
+
+    if not RATE_LIMITING:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limiter = _limiters[model] = RateLimiter()
+        return limiter
+
+
+def rate_limiter_reports() -> Dict[str, Dict[str, Any]]:
+    """Reports of every limiter created in this process, by model"""
+
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {model: limiter.report() for model, limiter in limiters.items()}
@@ -0,0 +1,60 @@
+"""
+Token Counting - Model token counts for prompts and completions, with an offline fallback
+"""
+
+import functools
+import json
+from typing import Any, Dict, List, Optional, Union
+
+# Average characters per token for English/JSON text on OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=8)
+def _encoding(model: str):
+    # tiktoken downloads its BPE files on first use; without network (or
+    # without tiktoken) fall back to the character estimate
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def message_text(messages: Union[str, List[Dict[str, Any]], None]) -> str:
+    """Flattens a prompt (string or chat messages) into the text the model reads"""
+
+    if messages is None:
+        return ""
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages:
+        content = message.get("content", "")
+        parts.append(content if isinstance(content, str) else json.dumps(content, default=str))
+    return "\n".join(parts)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """Counts tokens with the model's tokenizer, or estimates them when it is unavailable"""
+
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def token_source(model: str = "gpt-4o-mini") -> str:
+    """Returns "tiktoken" when exact counts are available, otherwise "estimate" """
+    return "tiktoken" if _encoding(model) is not None else "estimate"
+
+
+def count_message_tokens(messages: Union[str, List[Dict[str, Any]], None], model: Optional[str] = None) -> int:
+    """Counts the tokens of a prompt, string or chat messages"""
+    return count_tokens(message_text(messages), model or "gpt-4o-mini")
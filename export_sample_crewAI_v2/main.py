@@ -3,9 +3,38 @@
 Main Entry Point v2 - Enhanced with direct tool testing and extension support
 """
 
+import os
 import sys
-from configs.crew_configuration import ProductConfigurationCrew
-from tools.config_updater_tool import update_product_config
+import json
+
+# CrewAI-backed modules are imported inside the commands that need them,
+# so lightweight commands (test_updater, --help) start without loading CrewAI.
+
+
+def load_crew(api_key):
+    """
+    Build the ProductConfigurationCrew, importing CrewAI on first use.
+    """
+    from configs.crew_configuration import ProductConfigurationCrew
+
+    return ProductConfigurationCrew(api_key)
+
+
+def print_llm_cache_report(crew):
+    """
+    Print completion cache usage when the LLM cache is enabled (LLM_CACHE_PATH),
+    cassette usage when recording or replaying (LLM_CASSETTE_PATH), and rate
+    limiter usage for every model that called the provider.
+    """
+    from llm.rate_limiter import rate_limiter_reports
+
+    if crew.llm_cache is not None:
+        print(f"LLM cache: {json.dumps(crew.llm_cache.report())}")
+    if crew.cassette is not None:
+        print(f"LLM cassette: {json.dumps(crew.cassette.report())}")
+    for model, report in rate_limiter_reports().items():
+        if report["calls"]:
+            print(f"LLM rate limiter ({model}): {json.dumps(report)}")
 
 
 def run():
@@ -14,13 +43,12 @@ def run():
     """
     # Replace with your actual OpenAI API key
     api_key = "your-openai-api-key-here"
-    crew = ProductConfigurationCrew(api_key)
+    crew = load_crew(api_key)
     
-    inputs = {
-        "prompt": "Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2",
-    }
+    inputs = crew.kickoff_inputs("Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2")
     result = crew.create_crew().kickoff(inputs=inputs)
     print(result)
+    print_llm_cache_report(crew)
 
 
 def train():
@@ -33,11 +61,9 @@ def train():
         
     # Replace with your actual OpenAI API key
     api_key = "your-openai-api-key-here"
-    crew = ProductConfigurationCrew(api_key)
+    crew = load_crew(api_key)
     
-    inputs = {
-        "prompt": "Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2",
-    }
+    inputs = crew.kickoff_inputs("Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2")
     try:
         crew.create_crew().train(
             n_iterations=int(sys.argv[2]), 
@@ -46,6 +72,7 @@ def train():
         )
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
+    print_llm_cache_report(crew)
 
 
 def replay():
@@ -58,12 +85,13 @@ def replay():
         
     # Replace with your actual OpenAI API key
     api_key = "your-openai-api-key-here"
-    crew = ProductConfigurationCrew(api_key)
+    crew = load_crew(api_key)
     
     try:
         crew.create_crew().replay(task_id=sys.argv[2])
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
+    print_llm_cache_report(crew)
 
 
 def test():
@@ -76,11 +104,9 @@ def test():
         
     # Replace with your actual OpenAI API key
     api_key = "your-openai-api-key-here"
-    crew = ProductConfigurationCrew(api_key)
+    crew = load_crew(api_key)
     
-    inputs = {
-        "prompt": "Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2",
-    }
+    inputs = crew.kickoff_inputs("Update the product EDU EduTech Solutions code1 to E999 and code2 to NEW2")
     try:
         crew.create_crew().test(
             n_iterations=int(sys.argv[2]), 
@@ -89,6 +115,7 @@ def test():
         )
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+    print_llm_cache_report(crew)
 
 
 def test_updater():
@@ -96,11 +123,15 @@ def test_updater():
     Test the updater tool directly with sample inputs.
     NEW in v2: Direct tool testing functionality
     """
+    # Same code path as ProductConfigUpdaterTool._run, without importing CrewAI
+    from tools.product_api import update_product
+    from tools.update_diff import update_diff_stats
+
     print("Testing ProductConfigUpdaterTool v2...")
 
     # Test case 1: Product with spaces - section/subsection update
     print("\nTest 1: TRE TreMoon Shop - Section/Subsection Update")
-    result1 = update_product_config._run(
+    result1 = update_product(
         product_name="TRE TreMoon Shop", 
         section="XYZ", 
         subsection="MOO",
@@ -110,7 +141,7 @@ def test_updater():
 
     # Test case 2: Extension code update
     print("\nTest 2: EDU EduTech Solutions - Extension Code Update")
-    result2 = update_product_config._run(
+    result2 = update_product(
         product_name="EDU EduTech Solutions", 
         section="CURRENT_SEC",
         subsection="CURRENT_SUB", 
@@ -121,7 +152,7 @@ def test_updater():
     
     # Test case 3: Single extension code update
     print("\nTest 3: Simple Product - Single Extension Code")
-    result3 = update_product_config._run(
+    result3 = update_product(
         product_name="GAM GameZone Pro",
         section="GAMING",
         subsection="PRO",
@@ -132,7 +163,7 @@ def test_updater():
 
     # Test case 4: Multiple extension codes
     print("\nTest 4: Multiple Extension Codes")
-    result4 = update_product_config._run(
+    result4 = update_product(
         product_name="MED MediCare Plus",
         section="MEDICAL",
         subsection="CARE",
@@ -141,6 +172,108 @@ def test_updater():
     )
     print(f"Result: {result4}")
 
+    print(f"\nUpdate diff: {json.dumps(update_diff_stats.snapshot())}")
+
+
+def batch():
+    """
+    Run a file of update prompts concurrently and stream results to a file.
+    """
+    if len(sys.argv) < 4:
+        print("Usage: python main.py batch <input.jsonl> <output.jsonl> [concurrency]")
+        sys.exit(1)
+
+    from configs.batch_runner import read_prompts
+
+    input_path, output_path = sys.argv[2], sys.argv[3]
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+
+    # Replace with your actual OpenAI API key
+    api_key = "your-openai-api-key-here"
+    crew = load_crew(api_key)
+
+    with open(output_path, "w", encoding="utf-8") as output:
+        def write_result(record):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+
+        summary = crew.run_batch(read_prompts(input_path), concurrency=concurrency, on_result=write_result)
+
+    print(json.dumps(summary, indent=2))
+    print_llm_cache_report(crew)
+
+
+def jobs():
+    """
+    Queue prompts in a durable job store and work through its unfinished jobs.
+    """
+    if len(sys.argv) < 3:
+        print("Usage: python main.py jobs <jobs.db> [input.jsonl] [concurrency]")
+        sys.exit(1)
+
+    from configs.batch_runner import read_prompts
+    from configs.job_store import JobStore
+
+    store = JobStore(sys.argv[2])
+    if len(sys.argv) > 3:
+        print(f"Queued {store.add(read_prompts(sys.argv[3]))} new jobs")
+    concurrency = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+    # Jobs of workers that died on this host are resumed right away
+    print(f"Recovered {store.recover()} jobs from stopped workers")
+
+    # Replace with your actual OpenAI API key
+    api_key = "your-openai-api-key-here"
+    crew = load_crew(api_key)
+
+    stats = crew.run_jobs(store, concurrency=concurrency, on_result=lambda record: print(json.dumps(record), flush=True))
+    print(json.dumps(stats, indent=2))
+    print_llm_cache_report(crew)
+
+
+def stream():
+    """
+    Run one prompt and print its progress events as JSON lines as they happen.
+    """
+    if len(sys.argv) < 3:
+        print("Usage: python main.py stream <prompt>")
+        sys.exit(1)
+
+    # Replace with your actual OpenAI API key
+    api_key = "your-openai-api-key-here"
+    crew = load_crew(api_key)
+
+    for event in crew.run_stream(" ".join(sys.argv[2:])):
+        print(json.dumps(event.to_dict()), flush=True)
+    print_llm_cache_report(crew)
+
+
+def serve():
+    """
+    Serve update prompts over HTTP/JSON from a pool of warm worker processes.
+    """
+    import functools
+    from configs.crew_service import DEFAULT_QUEUE_SIZE, DEFAULT_WORKERS, CrewService, build_crew, create_server
+
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS
+    queue_size = int(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_QUEUE_SIZE
+    host = os.environ.get("CREW_SERVICE_HOST", "127.0.0.1")
+
+    # Replace with your actual OpenAI API key
+    api_key = "your-openai-api-key-here"
+    service = CrewService(functools.partial(build_crew, api_key), workers=workers, queue_size=queue_size)
+
+    print(f"Starting {workers} workers...")
+    with service:
+        server = create_server(service, host, port)
+        print(f"Serving on http://{host}:{port} (POST /run, GET /health, GET /metrics)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
 
 def demo():
     """
@@ -152,7 +285,7 @@ def demo():
     
     # Replace with your actual OpenAI API key
     api_key = "your-openai-api-key-here"
-    crew = ProductConfigurationCrew(api_key)
+    crew = load_crew(api_key)
     
     print("\n1. Testing Section/Subsection Update:")
     result1 = crew.run("Update the product TRE TreMoon Shop with section XYZ and subsection to MOO")
@@ -165,22 +298,36 @@ def demo():
     print("\n3. Testing Mixed Update:")
     result3 = crew.run("Update the product GAM GameZone Pro section to GAMES and code1 to G999")
     print(f"Result: {result3}")
+    print_llm_cache_report(crew)
+
+
+def print_usage():
+    """
+    Print the available commands.
+    """
+    print("Usage: python main.py <command> [<args>]")
+    print("Commands:")
+    print("  run           - Run the crew with sample input")
+    print("  train         - Train the crew")
+    print("  test          - Test the crew")
+    print("  replay        - Replay from task ID")
+    print("  test_updater  - Test the updater tool directly")
+    print("  demo          - Run full demonstration")
+    print("  batch         - Run prompts from a JSONL file concurrently")
+    print("  jobs          - Run prompts from a resumable SQLite job store")
+    print("  stream        - Run one prompt, printing progress events as JSON lines")
+    print("  serve         - Serve prompts over HTTP from warm worker processes")
 
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python main.py <command> [<args>]")
-        print("Commands:")
-        print("  run           - Run the crew with sample input")
-        print("  train         - Train the crew")
-        print("  test          - Test the crew")
-        print("  replay        - Replay from task ID")
-        print("  test_updater  - Test the updater tool directly")
-        print("  demo          - Run full demonstration")
+        print_usage()
         sys.exit(1)
 
     command = sys.argv[1]
-    if command == "run":
+    if command in ("-h", "--help", "help"):
+        print_usage()
+    elif command == "run":
         run()
     elif command == "train":
         train()
@@ -192,7 +339,15 @@ if __name__ == "__main__":
         test_updater()
     elif command == "demo":
         demo()
+    elif command == "batch":
+        batch()
+    elif command == "jobs":
+        jobs()
+    elif command == "stream":
+        stream()
+    elif command == "serve":
+        serve()
     else:
         print(f"Unknown command: {command}")
-        print("Available commands: run, train, test, replay, test_updater, demo")
+        print("Available commands: run, train, test, replay, test_updater, demo, batch, jobs, stream, serve")
         sys.exit(1)
\ No newline at end of file
@@ -4,7 +4,35 @@ Product Analysis Task v2 - Extracts product info and retrieves configuration wit
 
 from crewai import Task
 
-def create_analysis_task(product_analyzer_agent):
+from tasks.schemas import AnalysisResult, RepairingConverter, schema_guardrail
+
+# Structured output settings shared by both descriptions: the answer is
+# validated against AnalysisResult, repaired in-process before CrewAI's LLM
+# conversion, and normalized to canonical JSON for the update task
+STRUCTURED_OUTPUT = {
+    "output_pydantic": AnalysisResult,
+    "converter_cls": RepairingConverter,
+    "guardrail": schema_guardrail(AnalysisResult),
+    "guardrail_max_retries": 1,
+}
+
+# Same output contract in a fraction of the tokens: the prompt appears once,
+# candidate products are injected ({candidates}) instead of read from file
+COMPACT_DESCRIPTION = """
+User prompt: "{prompt}"
+Candidate products: {candidates}
+
+1. Pick the product the prompt names from the candidates.
+2. Call "Get Product Configuration" with that product_name.
+3. Reply with only this JSON:
+{{"product_name": "...", "current_config": {{"section": "...", "subsection": "...", "coverage": "...", "extension": {{...}} or null}}, "requested_updates": {{"section": ... or null, "subsection": ... or null, "coverage": ... or null, "extension": {{"code1": ...}} or null}}, "confidence": 0.0-1.0}}
+
+requested_updates holds only fields the prompt names; everything else is null.
+"section XYZ" -> section "XYZ"; "code1 to E002 and code2 to EDU5" -> extension {{"code1": "E002", "code2": "EDU5"}}.
+"""
+
+
+def create_analysis_task(product_analyzer_agent, compact: bool = False):
     """
     Creates the Product Analysis Task v2
     
@@ -16,7 +44,23 @@ def create_analysis_task(product_analyzer_agent):
     5. Return structured JSON with current config and requested updates
     
     v2 Enhancement: Added support for extension code parsing and updates
+
+    The output is validated against tasks.schemas.AnalysisResult (see
+    STRUCTURED_OUTPUT); answers that drift from it are repaired in-process.
+
+    Args:
+        product_analyzer_agent: Agent that runs the task
+        compact: Use the token-budgeted description; kickoff inputs must then
+            include "candidates" (see ProductConfigurationCrew.kickoff_inputs)
     """
+
+    if compact:
+        return Task(
+            description=COMPACT_DESCRIPTION,
+            agent=product_analyzer_agent,
+            expected_output="JSON with product name, current config, and specific requested updates including extension codes",
+            **STRUCTURED_OUTPUT,
+        )
     
     return Task(
         description="""
@@ -60,4 +104,5 @@ def create_analysis_task(product_analyzer_agent):
             """,
         agent=product_analyzer_agent,
         expected_output="JSON with product name, current config, and specific requested updates including extension codes",
+        **STRUCTURED_OUTPUT,
     )
\ No newline at end of file
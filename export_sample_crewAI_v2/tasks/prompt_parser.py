@@ -0,0 +1,173 @@
+"""
+Prompt Parser - Deterministic, LLM-free parser for prompts that follow the analysis task grammar
+"""
+
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tools.product_catalog import load_product_names
+from tools.product_index import get_product_index
+
+
+# Field mentions from the PARSING RULES in create_analysis_task:
+# "section XYZ", "subsection to MOO", "coverage: ABC", "code1 to E002"
+FIELD_PATTERN = re.compile(
+    r"\b(section|subsection|coverage|code[123])\b\s*(?:(?:to\b|=|:)\s*)?([A-Za-z0-9_\-]+)?",
+    re.IGNORECASE,
+)
+
+# Words allowed around the product name and between field mentions
+FILLER_WORDS = frozenset({
+    "update", "updates", "set", "change", "modify", "please",
+    "the", "product", "products", "for", "of", "on", "in",
+    "with", "and", "to", "its",
+})
+
+# Words that can never be a field value
+RESERVED_VALUES = FILLER_WORDS | {"section", "subsection", "coverage", "code1", "code2", "code3", "from", "null", "none"}
+
+
+class FastPathStats:
+    """
+    Thread-safe counters for how often prompts are handled without the LLM crew
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.hits = 0
+
+    def record(self, hit: bool) -> None:
+        with self._lock:
+            self.attempts += 1
+            if hit:
+                self.hits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "hits": self.hits,
+                "fallbacks": self.attempts - self.hits,
+                "hit_rate": self.hits / self.attempts if self.attempts else 0.0,
+            }
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+@lru_cache(maxsize=8)
+def _name_lookup(product_names: Tuple[str, ...]) -> Dict[str, str]:
+    return {_normalize(name): name for name in product_names}
+
+
+def _strip_fillers(words: list) -> list:
+    start, end = 0, len(words)
+    while start < end and words[start].lower() in FILLER_WORDS:
+        start += 1
+    while end > start and words[end - 1].lower() in FILLER_WORDS:
+        end -= 1
+    return words[start:end]
+
+
+def parse_update_prompt(prompt: str, product_names: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parses an update prompt locally when it follows the documented grammar exactly
+
+    The parse only succeeds with full confidence: the prompt must name a
+    known product verbatim (case-insensitive), every field mention must have
+    a clean value, no field may be given two different values, and the only
+    other words allowed are connectives like "update the product ... with ... and".
+    Anything else returns None so the caller can fall back to the crew.
+
+    Args:
+        prompt: Natural language update request
+        product_names: Known product names (defaults to the product catalog)
+
+    Returns:
+        Dict with product_name, requested_updates and confidence (same shape
+        as the analysis task output, without current_config), or None
+    """
+
+    names = tuple(product_names) if product_names is not None else load_product_names()
+
+    requested: Dict[str, Any] = {"section": None, "subsection": None, "coverage": None, "extension": None}
+    extension: Dict[str, str] = {}
+
+    for match in FIELD_PATTERN.finditer(prompt):
+        field, value = match.group(1).lower(), match.group(2)
+        if value is None or value.lower() in RESERVED_VALUES:
+            return None
+
+        if field.startswith("code"):
+            if extension.get(field, value) != value:
+                return None
+            extension[field] = value
+        else:
+            if requested[field] not in (None, value):
+                return None
+            requested[field] = value
+
+    if extension:
+        requested["extension"] = extension
+    if all(value is None for value in requested.values()):
+        return None
+
+    # Whatever is left after removing field mentions must be the product name plus connectives
+    remainder = re.sub(r"[,.;!]", " ", FIELD_PATTERN.sub(" ", prompt))
+    candidate = " ".join(_strip_fillers(remainder.split()))
+    product_name = _name_lookup(names).get(_normalize(candidate))
+    if product_name is None:
+        return None
+
+    return {
+        "product_name": product_name,
+        "requested_updates": requested,
+        "confidence": 1.0,
+    }
+
+
+def updater_arguments(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts a parse result into ProductConfigUpdaterTool keyword arguments
+
+    Only fields the user asked to change are included.
+    """
+
+    arguments = {"product_name": parsed["product_name"]}
+    for field, value in parsed["requested_updates"].items():
+        if value is not None:
+            arguments[field] = value
+    return arguments
+
+
+def candidate_products(prompt: str, k: int = 3, min_relative_score: float = 0.5) -> List[str]:
+    """
+    Picks the catalog products a prompt most likely refers to
+
+    Used to inject a short candidate list into compact prompts instead of the
+    whole product file. A prompt that names a product verbatim yields just
+    that product; otherwise the closest index matches are kept while they
+    score at least min_relative_score of the best one.
+
+    Args:
+        prompt: Natural language update request
+        k: Maximum number of candidates
+        min_relative_score: Drop matches scoring below this fraction of the best
+
+    Returns:
+        Canonical product names, best first (empty when nothing matches)
+    """
+
+    parsed = parse_update_prompt(prompt)
+    if parsed is not None:
+        return [parsed["product_name"]]
+
+    matches = get_product_index().lookup(prompt, k=k)
+    if not matches:
+        return []
+    best = matches[0][1]
+    return [name for name, score in matches if score >= best * min_relative_score]
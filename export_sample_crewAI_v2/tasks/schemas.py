@@ -0,0 +1,358 @@
+"""
+Task Schemas - Pydantic contracts for the analysis output and updater arguments, with in-process repair
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, Optional, Tuple, Type
+
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.converter import Converter
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+
+
+EXTENSION_CODES = ("code1", "code2", "code3")
+
+# Placeholder strings models write for "no value"
+NULL_STRINGS = frozenset({"", "null", "none", "n/a", "unchanged", "from_config_or_null", "new_value_or_null"})
+
+CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+def _clean_value(value: Any) -> Any:
+    if isinstance(value, str):
+        value = value.strip()
+        return None if value.lower() in NULL_STRINGS else value
+    return value
+
+
+def _clean_extension(value: Any) -> Any:
+    value = _clean_value(value)
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return value
+    if isinstance(value, dict):
+        codes = {str(code).strip().lower(): _clean_value(v) for code, v in value.items()}
+        codes = {code: v if isinstance(v, str) else str(v) for code, v in codes.items() if v is not None}
+        return codes or None
+    return value
+
+
+def normalize_fields(data: Any) -> Any:
+    """
+    Repairs the usual model drift in a dict of product fields
+
+    "null"-like strings become None, values are stripped, an extension given
+    as a JSON string is decoded, extension keys are lower-cased and empty
+    codes dropped. Anything that is not a dict is returned unchanged.
+    """
+
+    if not isinstance(data, dict):
+        return data
+    normalized = dict(data)
+    for field in ("product_name", "section", "subsection", "coverage"):
+        if field in normalized:
+            normalized[field] = _clean_value(normalized[field])
+    if "extension" in normalized:
+        normalized["extension"] = _clean_extension(normalized["extension"])
+    return normalized
+
+
+def _check_codes(extension: Optional[Dict[str, str]]) -> None:
+    unknown = set(extension or {}) - set(EXTENSION_CODES)
+    if unknown:
+        raise ValueError(f"unknown extension codes {sorted(unknown)}; expected {', '.join(EXTENSION_CODES)}")
+
+
+class ProductFields(BaseModel):
+    """Section, subsection, coverage and extension codes of a product"""
+
+    model_config = ConfigDict(extra="ignore")
+
+    section: Optional[str] = None
+    subsection: Optional[str] = None
+    coverage: Optional[str] = None
+    extension: Optional[Dict[str, str]] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def _normalize(cls, data: Any) -> Any:
+        return normalize_fields(data)
+
+    @model_validator(mode="after")
+    def _known_codes(self) -> "ProductFields":
+        _check_codes(self.extension)
+        return self
+
+
+class CurrentConfig(ProductFields):
+    """Configuration the product has now, as returned by Get Product Configuration"""
+
+
+class RequestedUpdates(ProductFields):
+    """Fields the user asked to change; everything not mentioned is None"""
+
+
+class AnalysisResult(BaseModel):
+    """Output contract of the analysis task"""
+
+    model_config = ConfigDict(extra="ignore")
+
+    product_name: str = Field(min_length=1)
+    current_config: CurrentConfig = Field(default_factory=CurrentConfig)
+    requested_updates: RequestedUpdates = Field(default_factory=RequestedUpdates)
+    # Missing confidence means the model did not say how sure it is
+    confidence: float = Field(default=0.5, ge=0.0, le=1.0)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _normalize(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if isinstance(data.get("product_name"), str):
+            data["product_name"] = data["product_name"].strip()
+        for field in ("current_config", "requested_updates"):
+            value = _clean_value(data.get(field))
+            data[field] = json.loads(value) if isinstance(value, str) and value.startswith("{") else value or {}
+        # "0.9", "90%" and 90 all mean 0.9; anything else is left for validation to reject
+        confidence = _clean_value(data.get("confidence"))
+        if isinstance(confidence, str):
+            try:
+                confidence = float(confidence.rstrip("%")) / (100 if confidence.endswith("%") else 1)
+            except ValueError:
+                pass
+        if isinstance(confidence, (int, float)) and 1 < confidence <= 100:
+            confidence = confidence / 100
+        if confidence is None:
+            data.pop("confidence", None)
+        else:
+            data["confidence"] = confidence
+        return data
+
+
+class UpdaterArguments(BaseModel):
+    """ProductConfigUpdaterTool arguments; repairs are counted in structured_output_stats"""
+
+    model_config = ConfigDict(extra="ignore")
+
+    product_name: str = Field(min_length=1, description="The name of the product to update")
+    section: Optional[str] = Field(default=None, description="New section value (optional)")
+    subsection: Optional[str] = Field(default=None, description="New subsection value (optional)")
+    coverage: Optional[str] = Field(default=None, description="New coverage value (optional)")
+    extension: Optional[Dict[str, str]] = Field(
+        default=None, description='Extension codes dict like {"code1": "E999", "code2": "NEW2"} (optional)'
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def _normalize(cls, data: Any) -> Any:
+        normalized = normalize_fields(data)
+        if isinstance(data, dict):
+            structured_output_stats.record_tool_arguments(repaired=normalized != data)
+        return normalized
+
+    @model_validator(mode="after")
+    def _known_codes(self) -> "UpdaterArguments":
+        _check_codes(self.extension)
+        return self
+
+
+def first_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Returns the first decodable JSON object embedded in a text, or None"""
+
+    decoder = json.JSONDecoder()
+    index = text.find("{")
+    while index != -1:
+        try:
+            value, _ = decoder.raw_decode(text, index)
+        except ValueError:
+            index = text.find("{", index + 1)
+            continue
+        if isinstance(value, dict):
+            return value
+        index = text.find("{", index + 1)
+    return None
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Finds the JSON object in a model answer
+
+    Tries, in order: the whole text, the first fenced code block, the first
+    decodable object in the text, then json_repair (trailing commas, single
+    quotes, unterminated braces).
+
+    Returns:
+        The object, or None when the text holds none
+    """
+
+    if not isinstance(text, str) or "{" not in text:
+        return None
+
+    fenced = CODE_FENCE.search(text)
+    candidates = [text.strip()] + ([fenced.group(1).strip()] if fenced else [])
+    for candidate in candidates:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(value, dict):
+            return value
+
+    value = first_json_object(text)
+    if value is not None:
+        return value
+
+    from json_repair import repair_json
+
+    value = repair_json(text[text.find("{"):], return_objects=True)
+    return value if isinstance(value, dict) and value else None
+
+
+def repair_output(text: str, model: Type[BaseModel]) -> Tuple[Optional[BaseModel], Optional[str]]:
+    """
+    Validates a model answer against a schema, repairing it in-process first
+
+    Args:
+        text: Raw task output
+        model: Pydantic model of the output contract
+
+    Returns:
+        (validated model, None), or (None, error description) when the text
+        cannot be repaired without the LLM
+    """
+
+    data = extract_json_object(text)
+    if data is None:
+        return None, "the answer contains no JSON object"
+    try:
+        return model.model_validate(data), None
+    except ValidationError as e:
+        return None, "; ".join(f"{'.'.join(map(str, err['loc'])) or 'output'}: {err['msg']}" for err in e.errors())
+
+
+def _is_exact(text: str, model: Type[BaseModel]) -> bool:
+    # The answer is bare JSON that validates without any normalization
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    try:
+        return model.model_validate(data).model_dump(exclude_unset=True) == data
+    except ValidationError:
+        return False
+
+
+class StructuredOutputStats:
+    """
+    Thread-safe counters for schema validation of task outputs and tool arguments
+
+    Each locally repaired output avoids CrewAI's LLM conversion call, and each
+    repaired tool call avoids a failed tool round and the agent iteration
+    (one LLM call) spent correcting it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.outputs = 0
+            self.outputs_exact = 0
+            self.outputs_repaired = 0
+            self.outputs_llm_converted = 0
+            self.outputs_rejected = 0
+            self.tool_calls = 0
+            self.tool_arguments_repaired = 0
+
+    def record_output(self, outcome: str) -> None:
+        with self._lock:
+            self.outputs += 1
+            setattr(self, f"outputs_{outcome}", getattr(self, f"outputs_{outcome}") + 1)
+
+    def record_tool_arguments(self, repaired: bool) -> None:
+        with self._lock:
+            self.tool_calls += 1
+            self.tool_arguments_repaired += repaired
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            llm_calls_saved = self.outputs_repaired + self.tool_arguments_repaired
+            return {
+                "outputs": self.outputs,
+                "outputs_exact": self.outputs_exact,
+                "outputs_repaired": self.outputs_repaired,
+                "outputs_llm_converted": self.outputs_llm_converted,
+                "outputs_rejected": self.outputs_rejected,
+                "tool_calls": self.tool_calls,
+                "tool_arguments_repaired": self.tool_arguments_repaired,
+                "iterations_saved": self.tool_arguments_repaired,
+                "llm_calls_saved": llm_calls_saved,
+                "llm_calls_saved_per_output": llm_calls_saved / self.outputs if self.outputs else 0.0,
+            }
+
+
+structured_output_stats = StructuredOutputStats()
+
+
+class RepairingConverter(Converter):
+    """
+    CrewAI output converter that repairs the answer in-process before asking the LLM
+
+    CrewAI only reaches the converter when the raw answer does not validate
+    as-is; the LLM conversion (the base class) runs only if local repair fails.
+    """
+
+    def to_pydantic(self, current_attempt: int = 1) -> BaseModel:
+        result, _ = repair_output(self.text, self.model)
+        if result is not None:
+            return result
+        return super().to_pydantic(current_attempt)
+
+    def to_json(self, current_attempt: int = 1) -> Any:
+        result, _ = repair_output(self.text, self.model)
+        if result is not None:
+            return result.model_dump_json()
+        return super().to_json(current_attempt)
+
+
+def schema_guardrail(model: Type[BaseModel]):
+    """
+    Builds a task guardrail that enforces a schema on the task's raw output
+
+    Exact answers pass unchanged. Repairable ones are replaced by the
+    canonical JSON, so the next task gets clean context. Answers neither the
+    repair step nor CrewAI's LLM conversion could validate are rejected with
+    the validation errors, which makes the agent retry once with that feedback.
+
+    Args:
+        model: Pydantic model of the output contract
+
+    Returns:
+        Guardrail callable for crewai.Task(guardrail=...)
+    """
+
+    def guardrail(output: TaskOutput) -> Tuple[bool, Any]:
+        if _is_exact(output.raw, model):
+            structured_output_stats.record_output("exact")
+            return True, output
+
+        repaired, error = repair_output(output.raw, model)
+        if repaired is not None:
+            structured_output_stats.record_output("repaired")
+            return True, repaired.model_dump_json()
+        if isinstance(output.pydantic, model):
+            structured_output_stats.record_output("llm_converted")
+            return True, output.pydantic.model_dump_json()
+
+        structured_output_stats.record_output("rejected")
+        return False, f"Answer does not match the required JSON format: {error}"
+
+    return guardrail
@@ -0,0 +1,114 @@
+"""
+Single-Call Update Task - One structured LLM request that yields the full update payload
+"""
+
+from typing import Any, Dict, List, Optional
+
+from tasks.schemas import first_json_object
+
+# Function the model calls with the parsed update (OpenAI tools format)
+UPDATE_FUNCTION_NAME = "submit_product_update"
+
+UPDATE_FUNCTION = {
+    "type": "function",
+    "function": {
+        "name": UPDATE_FUNCTION_NAME,
+        "description": "Submit the product configuration update the user asked for.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "product_name": {
+                    "type": "string",
+                    "description": "Exact product name, chosen from the candidate products",
+                },
+                "section": {"type": ["string", "null"], "description": "New section, or null if not mentioned"},
+                "subsection": {"type": ["string", "null"], "description": "New subsection, or null if not mentioned"},
+                "coverage": {"type": ["string", "null"], "description": "New coverage, or null if not mentioned"},
+                "extension": {
+                    "type": ["object", "null"],
+                    "description": "Changed extension codes, or null if none are mentioned",
+                    "properties": {
+                        "code1": {"type": "string"},
+                        "code2": {"type": "string"},
+                        "code3": {"type": "string"},
+                    },
+                    "additionalProperties": False,
+                },
+            },
+            "required": ["product_name"],
+        },
+    },
+}
+
+# Same parsing rules as the analysis task, phrased for one structured answer
+INSTRUCTIONS = """You turn product configuration requests into one update.
+Pick the product the request names from the candidate products and submit only the fields the request changes; every other field is null.
+"section XYZ" -> section "XYZ"; "subsection to MOO" -> subsection "MOO"; "coverage ABC" -> coverage "ABC";
+"code1 to E002 and code2 to EDU5" -> extension {"code1": "E002", "code2": "EDU5"}."""
+
+FUNCTION_CALL_INSTRUCTION = f"Call {UPDATE_FUNCTION_NAME} exactly once."
+
+JSON_INSTRUCTION = (
+    "Reply with only this JSON object: "
+    '{"product_name": "...", "section": ... or null, "subsection": ... or null, '
+    '"coverage": ... or null, "extension": {"code1": ...} or null}'
+)
+
+
+def build_messages(prompt: str, candidates: List[str], function_calling: bool) -> List[Dict[str, str]]:
+    """
+    Builds the chat messages for the single-call request
+
+    Args:
+        prompt: Natural language update request
+        candidates: Likely product names (see candidate_products)
+        function_calling: Ask for a submit_product_update call instead of a JSON reply
+
+    Returns:
+        System and user messages
+    """
+
+    instruction = FUNCTION_CALL_INSTRUCTION if function_calling else JSON_INSTRUCTION
+    candidate_text = "; ".join(candidates) or "none found, use the name in the request"
+    return [
+        {"role": "system", "content": f"{INSTRUCTIONS}\n{instruction}"},
+        {"role": "user", "content": f'User prompt: "{prompt}"\nCandidate products: {candidate_text}'},
+    ]
+
+
+def parse_update_call(result: Any) -> Optional[Dict[str, Any]]:
+    """
+    Converts the model's answer into ProductConfigUpdaterTool keyword arguments
+
+    Accepts the submit_product_update arguments (a dict) or a text reply
+    containing the same JSON object.
+
+    Args:
+        result: LLM call result
+
+    Returns:
+        product_name plus the non-null fields to change, or None when the
+        answer names no product or changes nothing
+    """
+
+    arguments = result if isinstance(result, dict) else first_json_object(result) if isinstance(result, str) else None
+    if not arguments or not isinstance(arguments.get("product_name"), str) or not arguments["product_name"].strip():
+        return None
+
+    update: Dict[str, Any] = {"product_name": arguments["product_name"].strip()}
+    for field in ("section", "subsection", "coverage"):
+        value = arguments.get(field)
+        if isinstance(value, str) and value.strip() and value.lower() not in ("null", "none"):
+            update[field] = value.strip()
+
+    extension = arguments.get("extension")
+    if isinstance(extension, dict):
+        codes = {
+            code: str(value).strip()
+            for code, value in extension.items()
+            if code in ("code1", "code2", "code3") and value not in (None, "")
+        }
+        if codes:
+            update["extension"] = codes
+
+    return update if len(update) > 1 else None
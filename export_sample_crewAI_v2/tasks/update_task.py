@@ -4,7 +4,18 @@ Product Update Task v2 - Executes configuration updates with extension support
 
 from crewai import Task
 
-def create_update_task(product_updater_agent, analysis_task):
+# Token-budgeted variant: the prompt appears once and only changed fields are
+# sent (the updater diffs against the current config either way)
+COMPACT_DESCRIPTION = """
+User prompt: "{prompt}"
+
+Using the analysis JSON from the previous task, call ProductConfigUpdaterTool once with product_name and
+the fields the prompt changes: section, subsection, coverage, and/or extension as {{"code1": "E002"}}.
+Omit unchanged fields. Then report the tool result.
+"""
+
+
+def create_update_task(product_updater_agent, analysis_task, compact: bool = False):
     """
     Creates the Product Update Task v2
     
@@ -14,7 +25,20 @@ def create_update_task(product_updater_agent, analysis_task):
     
     v2 Enhancement: Added support for extension code updates while
     preserving other configuration values.
+
+    Args:
+        product_updater_agent: Agent that runs the task
+        analysis_task: Task whose output is passed as context
+        compact: Use the token-budgeted description
     """
+
+    if compact:
+        return Task(
+            description=COMPACT_DESCRIPTION,
+            agent=product_updater_agent,
+            expected_output="Update execution result with confirmation of all applied changes",
+            context=[analysis_task],
+        )
     
     return Task(
         description="""
@@ -0,0 +1,264 @@
+"""
+Allowed Values - Per-product allowed-values schemas, fetched once and checked locally before updates
+"""
+
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+
+from tools import http_client
+from tools.coalescing import read_flight
+
+
+# Validate update payloads locally (set PRODUCT_API_LOCAL_VALIDATION=false to leave it to the server)
+LOCAL_VALIDATION = os.environ.get("PRODUCT_API_LOCAL_VALIDATION", "true").lower() not in ("0", "false", "no")
+
+# Fields the server validates, with the wording of its 400 errors: (field, value label, options label)
+CHECKED_FIELDS = (
+    ("section", "section", "Valid sections"),
+    ("subsection", "subsection", "Valid subsection"),
+    ("coverage", "coverage", "Valid coverages"),
+    ("code1", "extension code1", "Valid code1"),
+    ("code2", "extension code2", "Valid code2"),
+    ("code3", "extension code3", "Valid code3"),
+)
+
+
+class AllowedValues:
+    """
+    Allowed section, subsection, coverage and extension code values of one product
+
+    Membership checks use frozensets; the server's order is kept only to list
+    the valid options in error messages.
+    """
+
+    __slots__ = ("product_name", "options", "_sets")
+
+    def __init__(self, product_name: str, options: Dict[str, Tuple[str, ...]]):
+        """
+        Args:
+            product_name: Canonical product name
+            options: Allowed values per field, keyed section, subsection,
+                coverage, code1, code2 and code3; missing fields are unrestricted
+        """
+
+        self.product_name = product_name
+        self.options = options
+        self._sets = {field: frozenset(values) for field, values in options.items()}
+
+    @classmethod
+    def from_response(cls, product_name: str, allowed: Dict[str, Any]) -> "AllowedValues":
+        """Builds the validator from the "allowed" object of the schema endpoint"""
+
+        values = {**allowed, **(allowed.get("extension") or {})}
+        options = {field: tuple(values[field]) for field, _, _ in CHECKED_FIELDS if isinstance(values.get(field), list)}
+        return cls(product_name, options)
+
+    def errors(self, payload: Dict[str, Any]) -> List[str]:
+        """
+        Checks an update payload against the allowed values
+
+        Args:
+            payload: Update payload (section, subsection, coverage, extension)
+
+        Returns:
+            One server-style message per invalid field; empty when the payload is valid
+        """
+
+        extension = payload.get("extension")
+        values = {**payload, **extension} if isinstance(extension, dict) else payload
+        errors = []
+        for field, label, options_label in CHECKED_FIELDS:
+            value, allowed = values.get(field), self._sets.get(field)
+            # Like the server, empty values and unrestricted fields are not checked
+            if allowed is None or not value or value in allowed:
+                continue
+            errors.append(
+                f"Invalid {label} '{value}' for product '{self.product_name}'. "
+                f"{options_label}: {', '.join(self.options[field])}"
+            )
+        return errors
+
+
+class AllowedValuesCache:
+    """
+    Thread-safe per-product store of allowed-values schemas
+
+    Each product's schema is fetched once from
+    GET /api/products/name/{name}/schema; products without restrictions are
+    remembered as None. Servers without the endpoint (404/405) are remembered
+    per base URL and their updates are left to server-side validation, as are
+    updates whose schema could not be fetched.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._schemas: Dict[Tuple[str, str], Optional[AllowedValues]] = {}
+        self._endpoint_support: Dict[str, bool] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.fetches = 0
+            self.fetch_errors = 0
+            self.hits = 0
+            self.validations = 0
+            self.rejected = 0
+
+    def clear(self) -> None:
+        """Drops every cached schema and endpoint detection result"""
+
+        with self._lock:
+            self._schemas.clear()
+            self._endpoint_support.clear()
+
+    def _lookup(self, product_name: str) -> Tuple[bool, Optional[AllowedValues]]:
+        # (known, schema); known is True when no fetch is needed
+        base_url = http_client.get_settings()["base_url"]
+        with self._lock:
+            if not self._endpoint_support.get(base_url, True):
+                return True, None
+            key = (base_url, product_name)
+            if key in self._schemas:
+                self.hits += 1
+                return True, self._schemas[key]
+        return False, None
+
+    def _store(self, product_name: str, status: Optional[int], body: Any) -> Optional[AllowedValues]:
+        base_url = http_client.get_settings()["base_url"]
+        with self._lock:
+            self.fetches += 1
+            if status in (404, 405):
+                self._endpoint_support[base_url] = False
+                return None
+            if status != 200 or not isinstance(body, dict) or not body.get("success"):
+                # Transient failure or unexpected answer: try again on the next update
+                self.fetch_errors += 1
+                return None
+            allowed = body.get("allowed")
+            schema = AllowedValues.from_response(product_name, allowed) if isinstance(allowed, dict) else None
+            self._schemas[(base_url, product_name)] = schema
+            return schema
+
+    def schema(self, product_name: str) -> Optional[AllowedValues]:
+        """
+        Returns a product's allowed values, fetching them on first use
+
+        Args:
+            product_name: Canonical product name
+
+        Returns:
+            The validator, or None when the product is unrestricted or its
+            schema is unavailable
+        """
+
+        if not LOCAL_VALIDATION:
+            return None
+        known, schema = self._lookup(product_name)
+        if known:
+            return schema
+
+        # Concurrent first updates of a product share one fetch
+        path = f"/api/products/name/{quote(product_name)}/schema"
+        return read_flight.do(path, lambda: self._fetch(product_name, path))
+
+    def _fetch(self, product_name: str, path: str) -> Optional[AllowedValues]:
+        try:
+            response = http_client.get(path)
+        except requests.exceptions.RequestException:
+            return self._store(product_name, None, None)
+        return self._store(product_name, response.status_code, _json_body(response))
+
+    async def aschema(self, product_name: str) -> Optional[AllowedValues]:
+        """Async version of schema using the non-blocking HTTP client"""
+
+        if not LOCAL_VALIDATION:
+            return None
+        known, schema = self._lookup(product_name)
+        if known:
+            return schema
+
+        path = f"/api/products/name/{quote(product_name)}/schema"
+        return await read_flight.ado(path, lambda: self._afetch(product_name, path))
+
+    async def _afetch(self, product_name: str, path: str) -> Optional[AllowedValues]:
+        import httpx
+
+        try:
+            response = await http_client.aget(path)
+        except httpx.HTTPError:
+            return self._store(product_name, None, None)
+        return self._store(product_name, response.status_code, _json_body(response))
+
+    def check(self, schema: Optional[AllowedValues], product_name: str, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Validates an update payload against a product's schema
+
+        Args:
+            schema: Result of schema()/aschema() for the product
+            product_name: Canonical product name
+            payload: Update payload
+
+        Returns:
+            Message listing every invalid field and its valid options, or
+            None when the payload may be sent
+        """
+
+        if schema is None:
+            return None
+        errors = schema.errors(payload)
+        with self._lock:
+            self.validations += 1
+            self.rejected += bool(errors)
+        if not errors:
+            return None
+        return (
+            f"Update for product {product_name} rejected locally, no request was sent: {'; '.join(errors)}. "
+            "Retry with one of the valid values."
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "schemas": len(self._schemas),
+                "fetches": self.fetches,
+                "fetch_errors": self.fetch_errors,
+                "hits": self.hits,
+                "validations": self.validations,
+                "rejected": self.rejected,
+            }
+
+
+def _json_body(response: Any) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+allowed_values_cache = AllowedValuesCache()
+
+
+def validate_update(product_name: str, payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Checks an update payload against the product's allowed values before it is sent
+
+    Args:
+        product_name: Canonical product name
+        payload: Non-empty requested update payload
+
+    Returns:
+        Rejection message with the valid options, or None when the payload
+        is valid or cannot be checked locally
+    """
+
+    return allowed_values_cache.check(allowed_values_cache.schema(product_name), product_name, payload)
+
+
+async def avalidate_update(product_name: str, payload: Dict[str, Any]) -> Optional[str]:
+    """Async version of validate_update using the non-blocking HTTP client"""
+
+    return allowed_values_cache.check(await allowed_values_cache.aschema(product_name), product_name, payload)
@@ -0,0 +1,378 @@
+"""
+Request Coalescing - Single-flight configuration reads and merged same-product updates
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+
+# Share in-flight reads and merge queued updates (set PRODUCT_API_COALESCE=false to send every request)
+COALESCE = os.environ.get("PRODUCT_API_COALESCE", "true").lower() not in ("0", "false", "no")
+
+# How long the first update to a product waits for others to join its POST; 0 only merges
+# updates that queue up behind a POST already in flight for the same product
+DEFAULT_COALESCE_WINDOW_MS = float(os.environ.get("PRODUCT_API_COALESCE_WINDOW_MS") or 0)
+
+T = TypeVar("T")
+
+
+def merge_updates(payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merges update payloads as if they were applied one after another
+
+    Later payloads win for each field; extension codes are merged code by code.
+
+    Args:
+        payloads: Update payloads in arrival order
+
+    Returns:
+        One payload with the same end state as applying them in order
+    """
+
+    merged: Dict[str, Any] = {}
+    for payload in payloads:
+        for field, value in payload.items():
+            if field == "extension" and isinstance(value, dict):
+                merged["extension"] = {**(merged.get("extension") or {}), **value}
+            else:
+                merged[field] = value
+    return merged
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers share its result
+
+    Threads wait for the in-flight call of the same key; coroutines share
+    one call per event loop. The result (or exception) goes to every caller
+    of that flight and is not kept afterwards, so this is not a cache.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled: Override COALESCE
+        """
+
+        self.enabled = COALESCE if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._async_flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.shared = 0
+
+    def _count(self, shared: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            if shared:
+                self.shared += 1
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Returns fn() for this key, joining the call already in flight if there is one
+
+        Args:
+            key: What makes two calls identical (e.g. the request path and query)
+            fn: The call; runs in the first caller's thread
+
+        Returns:
+            The shared result; an exception raised by fn is raised to every caller
+        """
+
+        if not self.enabled:
+            self._count(False)
+            return fn()
+
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Async version of do; fn() is awaited once per key and event loop
+
+        Args:
+            key: What makes two calls identical (e.g. the request path and query)
+            fn: Coroutine function making the call
+
+        Returns:
+            The shared result; an exception raised by fn is raised to every caller
+        """
+
+        if not self.enabled:
+            self._count(False)
+            return await fn()
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flights = self._async_flights.setdefault(loop, {})
+        future = flights.get(key)
+        if future is not None:
+            self._count(True)
+            # shield: a cancelled follower must not cancel the shared call
+            return await asyncio.shield(future)
+
+        self._count(False)
+        future = flights[key] = loop.create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so a flight without followers logs nothing
+            raise
+        finally:
+            del flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"calls": self.calls, "requests_sent": self.calls - self.shared, "requests_saved": self.shared}
+
+
+class _Batch:
+    __slots__ = ("payloads", "done", "result", "error")
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payloads = [payload]
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _AsyncBatch:
+    __slots__ = ("payloads", "future")
+
+    def __init__(self, payload: Dict[str, Any], future: asyncio.Future):
+        self.payloads = [payload]
+        self.future = future
+
+
+class _BatchAbandoned(Exception):
+    """The leader of an async batch was cancelled before sending it"""
+
+
+class UpdateCoalescer:
+    """
+    Merges updates to the same product into one request, in arrival order
+
+    The first update to a product opens a batch and waits `window_ms` (and
+    for any request in flight for that product) before sending; updates
+    arriving meanwhile join the batch. The batch is sent as one merged
+    payload (merge_updates) and its outcome goes to every caller, which
+    builds its own result from it. Requests for one product never overlap,
+    so batches are applied in order. Threads and each event loop coalesce
+    separately.
+    """
+
+    def __init__(self, window_ms: Optional[float] = None, enabled: Optional[bool] = None):
+        """
+        Args:
+            window_ms: Batching window (default PRODUCT_API_COALESCE_WINDOW_MS)
+            enabled: Override COALESCE
+        """
+
+        self.window_ms = DEFAULT_COALESCE_WINDOW_MS if window_ms is None else window_ms
+        self.enabled = COALESCE if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _Batch] = {}
+        self._order: Dict[Hashable, threading.Lock] = {}
+        self._async_state: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.updates = 0
+            self.batches = 0
+            self.largest_batch = 0
+
+    def _sent(self, size: int) -> None:
+        with self._lock:
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, size)
+
+    def submit(self, key: Hashable, payload: Dict[str, Any], send: Callable[[Dict[str, Any]], T]) -> T:
+        """
+        Sends an update, merged with the other updates queued for the same key
+
+        Args:
+            key: Canonical product name
+            payload: This caller's update payload
+            send: Sends a (merged) payload and returns the outcome; runs in
+                the thread of the batch's first caller
+
+        Returns:
+            The outcome of the request that carried this payload
+        """
+
+        if not self.enabled:
+            with self._lock:
+                self.updates += 1
+            self._sent(1)
+            return send(payload)
+
+        with self._lock:
+            self.updates += 1
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch(payload)
+                order = self._order.setdefault(key, threading.Lock())
+            else:
+                batch.payloads.append(payload)
+
+        if not leader:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            return batch.result
+
+        if self.window_ms > 0:
+            time.sleep(self.window_ms / 1000)
+        with order:
+            with self._lock:
+                # Updates arriving from here on start the next batch
+                del self._open[key]
+            self._sent(len(batch.payloads))
+            try:
+                batch.result = send(merge_updates(batch.payloads))
+                return batch.result
+            except BaseException as e:
+                batch.error = e
+                raise
+            finally:
+                batch.done.set()
+
+    async def asubmit(self, key: Hashable, payload: Dict[str, Any], send: Callable[[Dict[str, Any]], Awaitable[T]]) -> T:
+        """
+        Async version of submit; send is awaited by the batch's first caller
+
+        Args:
+            key: Canonical product name
+            payload: This caller's update payload
+            send: Coroutine function sending a (merged) payload and returning the outcome
+
+        Returns:
+            The outcome of the request that carried this payload
+        """
+
+        if not self.enabled:
+            with self._lock:
+                self.updates += 1
+            self._sent(1)
+            return await send(payload)
+
+        with self._lock:
+            self.updates += 1
+        return await self._asubmit(key, payload, send)
+
+    async def _asubmit(self, key: Hashable, payload: Dict[str, Any], send: Callable[[Dict[str, Any]], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            open_batches, order = self._async_state.setdefault(loop, ({}, {}))
+        batch = open_batches.get(key)
+        if batch is not None:
+            batch.payloads.append(payload)
+            try:
+                return await asyncio.shield(batch.future)
+            except _BatchAbandoned:
+                # Nothing was sent; queue this payload again on its own
+                return await self._asubmit(key, payload, send)
+
+        batch = open_batches[key] = _AsyncBatch(payload, loop.create_future())
+        sent = False
+        try:
+            if self.window_ms > 0:
+                await asyncio.sleep(self.window_ms / 1000)
+            async with order.setdefault(key, asyncio.Lock()):
+                del open_batches[key]
+                self._sent(len(batch.payloads))
+                sent = True
+                result = await send(merge_updates(batch.payloads))
+                batch.future.set_result(result)
+                return result
+        except asyncio.CancelledError:
+            if sent:
+                batch.future.cancel()
+            raise
+        except BaseException as e:
+            batch.future.set_exception(e)
+            batch.future.exception()
+            raise
+        finally:
+            # A leader cancelled while waiting must not leave a batch that
+            # later updates would join and wait on forever
+            if open_batches.get(key) is batch:
+                del open_batches[key]
+            if not batch.future.done():
+                batch.future.set_exception(_BatchAbandoned())
+                batch.future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "updates": self.updates,
+                "batches": self.batches,
+                "requests_saved": self.updates - self.batches,
+                "largest_batch": self.largest_batch,
+            }
+
+
+# Shared by the product tools (tools/product_api.py, tools/allowed_values.py)
+read_flight = SingleFlight()
+update_coalescer = UpdateCoalescer()
+
+
+def coalescing_stats() -> Dict[str, Any]:
+    """Reads and updates saved by coalescing since the last reset"""
+
+    return {"reads": read_flight.stats(), "updates": update_coalescer.stats()}
+
+
+def reset_coalescing_stats() -> None:
+    read_flight.reset()
+    update_coalescer.reset()
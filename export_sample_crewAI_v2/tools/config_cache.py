@@ -0,0 +1,147 @@
+"""
+Product Config Cache - Bounded LRU + TTL read-through cache for product configuration lookups
+"""
+
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Fields the search endpoint returns for each product
+PRODUCT_FIELDS = ("name", "section", "subsection", "coverage", "extension")
+
+
+class ProductConfigCache:
+    """
+    Thread-safe LRU cache with a per-entry time-to-live.
+
+    Keys are canonical product names and values are the product lists
+    returned by the search endpoint. The updater tool writes successful
+    updates through (apply_update) and drops entries after failed ones
+    (invalidate_product), so cached reads never lag behind our own writes.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_size: Maximum number of entries; 0 disables caching
+            ttl: Seconds an entry stays valid after it is stored
+            clock: Monotonic time source (injectable for benchmarks)
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.updates = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns the cached product list for a key, or None on a miss"""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, products = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # Deep copies: a caller changing a product's extension must not change the cached one
+            return copy.deepcopy(products)
+
+    def put(self, key: str, products: List[Dict[str, Any]]) -> None:
+        """Stores a product list, evicting the least recently used entries over the size cap"""
+
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, copy.deepcopy(products))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def apply_update(self, product: Dict[str, Any]) -> None:
+        """
+        Writes an updated product into every cached list that contains it
+
+        Args:
+            product: Updated product as returned by the update endpoint
+        """
+
+        updated = {field: copy.deepcopy(product[field]) for field in PRODUCT_FIELDS if field in product}
+        with self._lock:
+            for key, (expires_at, products) in self._entries.items():
+                for i, cached in enumerate(products):
+                    if cached.get("name") == updated.get("name"):
+                        products[i] = {**cached, **updated}
+                        self.updates += 1
+
+    def invalidate_product(self, product_name: str) -> None:
+        """Drops every cached list that contains the named product"""
+
+        with self._lock:
+            stale = [
+                key for key, (_, products) in self._entries.items()
+                if key == product_name or any(p.get("name") == product_name for p in products)
+            ]
+            for key in stale:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self._reset_counters()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns cache counters
+
+        Returns:
+            Dict with hits, misses, hit_rate, evictions, expirations,
+            updates, invalidations, size and max_size
+        """
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "updates": self.updates,
+                "invalidations": self.invalidations,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+# Shared cache used by both product tools
+product_config_cache = ProductConfigCache(
+    max_size=int(os.environ.get("PRODUCT_CONFIG_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("PRODUCT_CONFIG_CACHE_TTL", "30")),
+)
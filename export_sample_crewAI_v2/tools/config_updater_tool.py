@@ -2,10 +2,17 @@
 Product Configuration Updater Tool v2 - Updates product configurations via API with extension support
 """
 
-import requests
-from urllib.parse import quote
-from typing import Optional, Dict, Any
+from typing import Any, Optional, Dict, List, Type
 from crewai.tools.base_tool import BaseTool
+from pydantic import BaseModel
+from tasks.schemas import UpdaterArguments
+from tools.product_api import (
+    abulk_update_products,
+    aupdate_product,
+    bulk_update_products,
+    format_bulk_results,
+    update_product,
+)
 
 
 class ProductConfigUpdaterTool(BaseTool):
@@ -14,16 +21,32 @@ class ProductConfigUpdaterTool(BaseTool):
     
     This tool sends HTTP POST requests to update product section,
     subsection, coverage, or extension codes. It handles URL encoding for
-    product names with spaces and special characters.
+    product names with spaces and special characters, and maps product names
+    that differ only in case or spacing to their canonical catalog form
+    before sending.
+    Successful updates are written through to the shared product config
+    cache; failed ones invalidate it.
+
+    Arguments are validated against UpdaterArguments, which repairs common
+    model drift ("null" strings, extension as a JSON string) in-process
+    instead of failing the tool call and costing the agent an iteration.
+
+    Values outside the product's allowed lists (fetched once per product
+    from the schema endpoint, see tools.allowed_values) are rejected
+    locally: the result lists every invalid field with its valid options
+    and no request is sent.
     
-    v2 Enhancement: Added support for extension code updates
+    v2 Enhancement: Added support for extension code updates and a native
+    async implementation (_arun) for event-loop callers.
     """
     
     name: str = "ProductConfigUpdaterTool"
     description: str = """Updates a product's configuration on the mock server.
     Use this tool to update product section, subsection, coverage, or extension codes.
     Only provide the parameters you want to update - others can be omitted.
-    Extension should be a dict with code1, code2, and/or code3 keys."""
+    Extension should be a dict with code1, code2, and/or code3 keys.
+    Invalid values are rejected with the valid options; retry with one of them."""
+    args_schema: Type[BaseModel] = UpdaterArguments
 
     def _run(
         self,
@@ -47,31 +70,76 @@ class ProductConfigUpdaterTool(BaseTool):
             Success message with API response or error message
         """
 
-        # URL encode the product name to handle spaces and special characters
-        encoded_name = quote(product_name)
-        url = f"http://localhost:3000/api/products/name/{encoded_name}"
-
-        # Build payload with only provided values
-        payload = {}
-        if section is not None:
-            payload["section"] = section
-        if subsection is not None:
-            payload["subsection"] = subsection
-        if coverage is not None:
-            payload["coverage"] = coverage
-        if extension is not None:
-            payload["extension"] = extension
-
-        if not payload:
-            return f"No updates specified for product {product_name}"
-
-        try:
-            response = requests.post(url, json=payload)
-            response.raise_for_status()
-            return f"Successfully updated product {product_name} with {payload}. Response: {response.text}"
-        except requests.exceptions.RequestException as e:
-            return f"An error occurred while updating product {product_name}: {e}"
-
-
-# Create tool instance for use in agents
-update_product_config = ProductConfigUpdaterTool()
\ No newline at end of file
+        return update_product(product_name, section, subsection, coverage, extension)
+
+    async def _arun(
+        self,
+        product_name: str,
+        section: Optional[str] = None,
+        subsection: Optional[str] = None,
+        coverage: Optional[str] = None,
+        extension: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Async version of _run using the non-blocking HTTP client.
+
+        Args:
+            product_name: The name of the product to update
+            section: New section value (optional)
+            subsection: New subsection value (optional)
+            coverage: New coverage value (optional)
+            extension: Extension codes dict like {"code1": "E999", "code2": "NEW2"} (optional)
+
+        Returns:
+            Success message with API response or error message
+        """
+
+        return await aupdate_product(product_name, section, subsection, coverage, extension)
+
+
+class BulkProductConfigUpdaterTool(BaseTool):
+    """
+    Tool for updating many products in one call.
+
+    Sends all updates through the server's bulk endpoint when it has one,
+    otherwise as concurrent per-product POSTs (bounded by
+    PRODUCT_API_BULK_WINDOW, in order for the same product). Returns a
+    per-item result table so partial failures are visible.
+    """
+
+    name: str = "BulkProductConfigUpdaterTool"
+    description: str = """Updates several products' configurations in one call.
+    Use this tool instead of ProductConfigUpdaterTool when the request changes more than one product.
+    updates is a list of objects with product_name and any of section, subsection, coverage and
+    extension (a dict with code1, code2, and/or code3 keys). Returns one result row per update."""
+
+    def _run(self, updates: List[Dict[str, Any]]) -> str:
+        """
+        Updates many products' configurations
+
+        Args:
+            updates: One dict per product with product_name and the fields to change
+
+        Returns:
+            Result table with one row per update
+        """
+
+        return format_bulk_results(bulk_update_products(updates))
+
+    async def _arun(self, updates: List[Dict[str, Any]]) -> str:
+        """
+        Async version of _run using the non-blocking HTTP client.
+
+        Args:
+            updates: One dict per product with product_name and the fields to change
+
+        Returns:
+            Result table with one row per update
+        """
+
+        return format_bulk_results(await abulk_update_products(updates))
+
+
+# Create tool instances for use in agents
+update_product_config = ProductConfigUpdaterTool()
+bulk_update_product_config = BulkProductConfigUpdaterTool()
\ No newline at end of file
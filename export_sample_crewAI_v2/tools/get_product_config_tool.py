@@ -2,70 +2,68 @@
 Get Product Configuration Tool v2 - Retrieves product configuration data with enhanced search
 """
 
-import requests
-import json
-from urllib.parse import quote
-from crewai.tools import tool
+from typing import List, Optional
 
+from crewai.tools.base_tool import BaseTool
+from tools.product_api import asearch_product_config, search_product_config
 
-@tool("Get Product Configuration")
-def get_product_configuration(product_name: str) -> str:
+
+class GetProductConfigurationTool(BaseTool):
     """
-    Retrieves the current configuration for a specific product.
-    
-    This tool queries the mock server API to get the current
+    Tool for retrieving the current configuration of a product.
+
+    This tool queries the mock server search API to get the current
     section, subsection, coverage, and extension values for a product.
-    
-    v2 Enhancement: Improved search logic using first 3 characters
-    and better error handling with JSON formatting.
-    
-    Args:
-        product_name: The name of the product to get configuration for
-        
-    Returns:
-        JSON string with product configuration data or error message
+
+    v2 Enhancement: Product names are resolved to their canonical form
+    through the in-memory product index and searched in full; names the
+    index cannot resolve fall back to searching on the first 3 characters.
+    Provides a native async implementation (_arun) for event-loop callers.
+
+    Results for resolved names are served from the shared LRU+TTL
+    product_config_cache, which the updater tool keeps current.
+
+    With compact=True results are minified JSON, for token-budgeted prompts.
+    A product named exactly as requested is returned alone, other searches
+    return at most max_results products, and fields limits each product to
+    the given fields (plus its name).
     """
-    
-    try:
-        # Extract the first 3 characters for the API query (v2 enhancement)
-        search_term = product_name[:3].upper() if len(product_name) >= 3 else product_name.upper()
-        url = f"http://localhost:3000/api/search?q={search_term}"
-        
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        
-        # Parse and format the response (v2 enhancement)
-        data = response.json()
-        
-        if data.get("success", False) and "products" in data:
-            products = data["products"]
-            formatted_result = {
-                "success": True,
-                "total_products": len(products),
-                "products": products,
-            }
-            return json.dumps(formatted_result, indent=2)
-        else:
-            return json.dumps({
-                "success": False,
-                "error": "No products found or invalid response format",
-                "raw_response": data,
-            })
-        
-    except requests.exceptions.RequestException as e:
-        return json.dumps({
-            "success": False,
-            "error": f"API request failed: {str(e)}",
-            "endpoint": url if "url" in locals() else "unknown",
-        })
-    except json.JSONDecodeError as e:
-        return json.dumps({
-            "success": False,
-            "error": f"Invalid JSON response: {str(e)}",
-            "raw_response": response.text if "response" in locals() else "unknown",
-        })
-    except Exception as e:
-        return json.dumps({
-            "success": False, 
-            "error": f"Unexpected error: {str(e)}"
-        })
\ No newline at end of file
+
+    name: str = "Get Product Configuration"
+    description: str = """Retrieves the current configuration for a specific product.
+    Returns the section, subsection, coverage, and extension values as JSON.
+    Provide the product_name to get configuration for."""
+    compact: bool = False
+    max_results: Optional[int] = None
+    fields: Optional[List[str]] = None
+
+    def _run(self, product_name: str) -> str:
+        """
+        Retrieves the current configuration for a specific product.
+
+        Args:
+            product_name: The name of the product to get configuration for
+
+        Returns:
+            JSON string with product configuration data or error message
+        """
+
+        return search_product_config(product_name, self.compact, self.max_results, self.fields)
+
+    async def _arun(self, product_name: str) -> str:
+        """
+        Async version of _run using the non-blocking HTTP client.
+
+        Args:
+            product_name: The name of the product to get configuration for
+
+        Returns:
+            JSON string with product configuration data or error message
+        """
+
+        return await asearch_product_config(product_name, self.compact, self.max_results, self.fields)
+
+
+# Create tool instances for use in agents
+get_product_configuration = GetProductConfigurationTool()
+get_product_configuration_compact = GetProductConfigurationTool(compact=True)
@@ -0,0 +1,332 @@
+"""
+Product API HTTP Client - Shared pooled, keep-alive HTTP session for the product tools
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# httpx is only imported once an async client is needed
+if TYPE_CHECKING:
+    import httpx
+
+
+DEFAULT_BASE_URL = "http://localhost:3000"
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# Client settings, overridable through environment variables or configure()
+_settings: Dict[str, Any] = {
+    "base_url": os.environ.get("PRODUCT_API_BASE_URL", DEFAULT_BASE_URL),
+    "pool_connections": _env_int("PRODUCT_API_POOL_CONNECTIONS", 4),
+    "pool_maxsize": _env_int("PRODUCT_API_POOL_MAXSIZE", 32),
+    "pool_block": os.environ.get("PRODUCT_API_POOL_BLOCK", "false").lower() in ("1", "true", "yes"),
+    "connect_timeout": _env_float("PRODUCT_API_CONNECT_TIMEOUT", 3.05),
+    "read_timeout": _env_float("PRODUCT_API_READ_TIMEOUT", 10.0),
+    "max_retries": _env_int("PRODUCT_API_MAX_RETRIES", 0),
+}
+
+
+class PoolStats:
+    """
+    Thread-safe counters describing how well the connection pool is reused.
+
+    A request that does not open a new connection was served from a
+    kept-alive connection. Wait time is the time spent acquiring a
+    connection from the pool, which only grows when pool_block is enabled
+    and every connection is busy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_created = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_created += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.wait_time_total += seconds
+            if seconds > self.wait_time_max:
+                self.wait_time_max = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.connections_created, 0)
+            return {
+                "requests": self.requests,
+                "connections_created": self.connections_created,
+                "connections_reused": reused,
+                "reuse_rate": reused / self.requests if self.requests else 0.0,
+                "wait_time_total_ms": self.wait_time_total * 1000,
+                "wait_time_avg_ms": self.wait_time_total * 1000 / self.requests if self.requests else 0.0,
+                "wait_time_max_ms": self.wait_time_max * 1000,
+                "pool_maxsize": _settings["pool_maxsize"],
+            }
+
+
+_stats = PoolStats()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool that reports new connections and acquisition wait time"""
+
+    def _new_conn(self):
+        _stats.record_connection()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        started = time.perf_counter()
+        try:
+            return super()._get_conn(timeout=timeout)
+        finally:
+            _stats.record_wait(time.perf_counter() - started)
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS variant of _CountingHTTPConnectionPool"""
+
+    def _new_conn(self):
+        _stats.record_connection()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        started = time.perf_counter()
+        try:
+            return super()._get_conn(timeout=timeout)
+        finally:
+            _stats.record_wait(time.perf_counter() - started)
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pool manager uses the counting connection pools"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _stats.record_request()
+        return super().send(request, **kwargs)
+
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    adapter = _PooledAdapter(
+        pool_connections=_settings["pool_connections"],
+        pool_maxsize=_settings["pool_maxsize"],
+        pool_block=_settings["pool_block"],
+        max_retries=_settings["max_retries"],
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide pooled session, creating it on first use
+
+    The session is rebuilt after a fork so worker processes never share
+    sockets with their parent.
+
+    Returns:
+        Shared requests.Session with keep-alive connection pooling
+    """
+
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            if _session_pid != pid:
+                _stats.reset()
+            _session = _build_session()
+            _session_pid = pid
+        return _session
+
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+async def _trace_connections(event_name: str, info: Dict[str, Any]) -> None:
+    # httpcore emits this once per newly opened TCP connection
+    if event_name == "connection.connect_tcp.complete":
+        _stats.record_connection()
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """
+    Returns the pooled non-blocking client bound to the running event loop
+
+    httpx clients cannot be shared across event loops, so one client is kept
+    per loop. It uses the same pool size and timeouts as the sync session.
+
+    Returns:
+        Shared httpx.AsyncClient with keep-alive connection pooling
+    """
+
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        # Limits must be set on the transport; the client ignores them when a transport is given
+        transport = httpx.AsyncHTTPTransport(
+            retries=_settings["max_retries"],
+            limits=httpx.Limits(
+                max_connections=_settings["pool_maxsize"],
+                max_keepalive_connections=_settings["pool_maxsize"],
+            ),
+        )
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(_settings["read_timeout"], connect=_settings["connect_timeout"]),
+            transport=transport,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aget(path: str, **kwargs) -> "httpx.Response":
+    """Sends a non-blocking GET request to the product API"""
+    _stats.record_request()
+    kwargs.setdefault("extensions", {"trace": _trace_connections})
+    return await get_async_client().get(api_url(path), **kwargs)
+
+
+async def apost(path: str, **kwargs) -> "httpx.Response":
+    """Sends a non-blocking POST request to the product API"""
+    _stats.record_request()
+    kwargs.setdefault("extensions", {"trace": _trace_connections})
+    return await get_async_client().post(api_url(path), **kwargs)
+
+
+async def aclose() -> None:
+    """Closes the async client bound to the running event loop"""
+
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def configure(**settings) -> None:
+    """
+    Updates client settings and drops the current session so the next call rebuilds it
+
+    Args:
+        base_url: Product API base URL (default from PRODUCT_API_BASE_URL)
+        pool_connections: Number of per-host pools to cache
+        pool_maxsize: Maximum kept-alive connections per host
+        pool_block: Wait for a free connection instead of opening extra ones
+        connect_timeout: Connection timeout in seconds
+        read_timeout: Read timeout in seconds
+        max_retries: Retries for failed connection attempts
+    """
+
+    unknown = set(settings) - set(_settings)
+    if unknown:
+        raise ValueError(f"Unknown HTTP client settings: {', '.join(sorted(unknown))}")
+
+    _settings.update(settings)
+    close()
+
+
+def close() -> None:
+    """
+    Closes the shared session and its pooled connections
+
+    Async clients are dropped as well; call aclose() from inside a running
+    loop to close its client's sockets eagerly.
+    """
+
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
+        _async_clients.clear()
+
+
+def get_settings() -> Dict[str, Any]:
+    """Returns a copy of the current client settings"""
+    return dict(_settings)
+
+
+def api_url(path: str) -> str:
+    """Builds an absolute product API URL from a path like /api/search"""
+    return f"{_settings['base_url'].rstrip('/')}/{path.lstrip('/')}"
+
+
+def get_timeout() -> Tuple[float, float]:
+    """Returns the (connect, read) timeout tuple applied to every request"""
+    return (_settings["connect_timeout"], _settings["read_timeout"])
+
+
+def get(path: str, **kwargs) -> requests.Response:
+    """Sends a GET request to the product API through the shared session"""
+    kwargs.setdefault("timeout", get_timeout())
+    return get_session().get(api_url(path), **kwargs)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    """Sends a POST request to the product API through the shared session"""
+    kwargs.setdefault("timeout", get_timeout())
+    return get_session().post(api_url(path), **kwargs)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Returns connection pool statistics for this process
+
+    Returns:
+        Dict with request count, connections created/reused, reuse rate
+        and pool wait times in milliseconds
+    """
+    return _stats.snapshot()
+
+
+def reset_pool_stats() -> None:
+    """Resets the connection pool statistics"""
+    _stats.reset()
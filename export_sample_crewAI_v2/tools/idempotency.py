@@ -0,0 +1,86 @@
+"""
+Idempotency - Per-job idempotency keys that keep the updater from sending the same update twice
+"""
+
+import hashlib
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Protocol, Tuple
+
+
+class UpdateRecord(NamedTuple):
+    """Ledger entry of one update; result is None while the request was sent but not answered"""
+
+    status: str  # "sent" or "done"
+    result: Optional[str]
+
+
+class UpdateLedger(Protocol):
+    """Durable record of updates by idempotency key (see configs/job_store.py)"""
+
+    def lookup_update(self, key: str) -> Optional[UpdateRecord]: ...
+
+    def record_update_sent(self, key: str, product_name: str, payload: Dict[str, Any]) -> None: ...
+
+    def record_update_done(self, key: str, result: str) -> None: ...
+
+
+# Context variables follow a job into the crew's kickoff thread and asyncio.to_thread workers
+_scope: ContextVar[Optional[Tuple[UpdateLedger, str]]] = ContextVar("idempotency_scope", default=None)
+
+
+@contextmanager
+def idempotency_scope(ledger: UpdateLedger, job_key: str) -> Iterator[None]:
+    """
+    Records the updates applied in this context under a job's idempotency key
+
+    Within the scope, an update with the same product and fields as one the
+    ledger has completed for this job is not sent again; the recorded result
+    is returned instead.
+
+    Args:
+        ledger: Where updates are recorded
+        job_key: Idempotency key of the job (stable across retries)
+    """
+
+    token = _scope.set((ledger, job_key))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def update_key(job_key: str, product_name: str, payload: Dict[str, Any]) -> str:
+    """Idempotency key of one update within a job"""
+
+    fields = json.dumps({"product": product_name, "payload": payload}, sort_keys=True)
+    return hashlib.sha256(f"{job_key}\0{fields}".encode("utf-8")).hexdigest()
+
+
+def lookup(product_name: str, payload: Dict[str, Any]) -> Optional[UpdateRecord]:
+    """The ledger entry of this update in the current job, or None (also outside a scope)"""
+
+    scope = _scope.get()
+    if scope is None:
+        return None
+    ledger, job_key = scope
+    return ledger.lookup_update(update_key(job_key, product_name, payload))
+
+
+def record_sent(product_name: str, payload: Dict[str, Any]) -> None:
+    """Records that the update is about to be sent; a no-op outside a scope"""
+
+    scope = _scope.get()
+    if scope is not None:
+        ledger, job_key = scope
+        ledger.record_update_sent(update_key(job_key, product_name, payload), product_name, payload)
+
+
+def record_done(product_name: str, payload: Dict[str, Any], result: str) -> None:
+    """Records the server's answer to the update; a no-op outside a scope"""
+
+    scope = _scope.get()
+    if scope is not None:
+        ledger, job_key = scope
+        ledger.record_update_done(update_key(job_key, product_name, payload), result)
@@ -0,0 +1,880 @@
+"""
+Product API Operations - Search and update calls shared by the product tools, without CrewAI
+"""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+from urllib.parse import quote
+
+import requests
+
+from instrumentation import run_events
+from instrumentation.run_events import ConfigFetched, ProductResolved, UpdatePosted
+from tools import http_client, idempotency
+from tools.allowed_values import allowed_values_cache, avalidate_update, validate_update
+from tools.coalescing import read_flight, update_coalescer
+from tools.config_cache import PRODUCT_FIELDS, product_config_cache
+from tools.product_index import canonical_product_name, resolve_product_name
+from tools.update_diff import forget_product, minimize_update, observe_products
+
+
+# Optional server endpoint that applies many updates in one request
+BULK_UPDATE_PATH = "/api/products/bulk"
+
+# Maximum update requests in flight when the server has no bulk endpoint
+DEFAULT_BULK_WINDOW = int(os.environ.get("PRODUCT_API_BULK_WINDOW") or 8)
+
+# Cap on the products a search returns (passed to /api/search as max_results); 0 for no cap
+DEFAULT_SEARCH_MAX_RESULTS = int(os.environ.get("PRODUCT_API_SEARCH_MAX_RESULTS") or 5)
+
+# Order of the fields in a positional bulk update tuple
+UPDATE_FIELDS = ("product_name", "section", "subsection", "coverage", "extension")
+
+ProductUpdate = Union[Sequence[Any], Mapping[str, Any]]
+
+
+class SentUpdate(NamedTuple):
+    """Outcome of one (possibly coalesced) update request, shared by every caller it carried"""
+
+    payload: Dict[str, Any]  # fields sent after minimal diffing; empty when no request was needed
+    response_text: Optional[str]
+    error: Optional[str]
+
+
+def _search_term(product_name: str, canonical: Optional[str]) -> str:
+    # Search on the canonical name when the product index can resolve it
+    if canonical is not None:
+        return canonical
+
+    # Unknown name: extract the first 3 characters for the API query (v2 enhancement)
+    return product_name[:3].upper() if len(product_name) >= 3 else product_name.upper()
+
+
+def _search_params(term: str, max_results: int) -> Dict[str, Any]:
+    params = {"q": term}
+    if max_results:
+        params["max_results"] = max_results
+    return params
+
+
+def _full_name(product_name: str, canonical: Optional[str]) -> str:
+    # A resolved name is that product, as for updates; otherwise the name as given
+    return canonical if canonical is not None else product_name.strip()
+
+
+def _exact_matches(product_name: str, canonical: Optional[str], products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    name = _full_name(product_name, canonical).casefold()
+    return [product for product in products if str(product.get("name", "")).casefold() == name]
+
+
+def _exact_match_cut_off(product_name: str, canonical: Optional[str], data: Dict[str, Any], max_results: int) -> bool:
+    # Capped results that are all partial matches may have lost the exact one,
+    # unless the search term was already the whole name
+    if not max_results or not data.get("success", False) or "products" not in data:
+        return False
+    if canonical is None and len(product_name.strip()) <= 3:
+        return False
+    products = data["products"]
+    return len(products) >= max_results and not _exact_matches(product_name, canonical, products)
+
+
+def _exact_lookup(product_name: str, canonical: Optional[str], data: Dict[str, Any], lookup: Dict[str, Any]) -> Dict[str, Any]:
+    # Results of the uncapped full-name search when it found the exact match
+    if lookup.get("success", False) and _exact_matches(product_name, canonical, lookup.get("products") or []):
+        return lookup
+    return data
+
+
+def _select_products(product_name: str, canonical: Optional[str], data: Dict[str, Any], max_results: int) -> Dict[str, Any]:
+    # Exact match first: a product named exactly as requested is returned alone,
+    # otherwise the partial matches, capped
+    if not data.get("success", False) or "products" not in data:
+        return data
+    products = data["products"]
+    exact = _exact_matches(product_name, canonical, products)
+    if exact:
+        return {"success": True, "products": exact}
+    capped = products[:max_results] if max_results else products
+    return {"success": True, "products": capped, "truncated": bool(max_results) and len(products) >= max_results}
+
+
+def _cache_search_response(canonical: Optional[str], data: Dict[str, Any]) -> None:
+    # Only canonical-name searches are cached, keyed by that name
+    if canonical is not None and data.get("success", False) and "products" in data:
+        product_config_cache.put(canonical, data["products"])
+
+
+def _project(product: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    if not fields:
+        return product
+    # The name is always kept, so every entry still says which product it is
+    return {field: product[field] for field in PRODUCT_FIELDS if field in product and (field == "name" or field in fields)}
+
+
+def _format_search_response(data: Dict[str, Any], compact: bool = False, fields: Optional[Sequence[str]] = None) -> str:
+    # Parse and format the response (v2 enhancement)
+    if data.get("success", False) and "products" in data:
+        products = [_project(product, fields) for product in data["products"]]
+        formatted_result = {
+            "success": True,
+            "total_products": len(products),
+            "products": products,
+        }
+        if data.get("truncated"):
+            # The search hit max_results, so more products may have matched
+            formatted_result["truncated"] = True
+        if compact:
+            return json.dumps(formatted_result, separators=(",", ":"))
+        return json.dumps(formatted_result, indent=2)
+    else:
+        return json.dumps({
+            "success": False,
+            "error": "No products found or invalid response format",
+            "raw_response": data,
+        })
+
+
+def _emit_search_events(product_name: str, canonical: Optional[str], data: Dict[str, Any], from_cache: bool) -> None:
+    # Progress events for ProductConfigurationCrew.run_stream()/astream()
+    if not run_events.capturing() or not data.get("success", False) or "products" not in data:
+        return
+    resolved = canonical or product_name
+    run_events.emit(ProductResolved, product_name=resolved, requested_name=product_name, source="search")
+    run_events.emit(ConfigFetched, product_name=resolved, products=data["products"], from_cache=from_cache)
+
+
+def _cached_search(
+    product_name: str,
+    canonical: Optional[str],
+    compact: bool = False,
+    max_results: int = 0,
+    fields: Optional[Sequence[str]] = None,
+) -> Optional[str]:
+    if canonical is None:
+        return None
+    cached = product_config_cache.get(canonical)
+    if cached is None:
+        return None
+    data = _select_products(product_name, canonical, {"success": True, "products": cached}, max_results)
+    _emit_search_events(product_name, canonical, data, from_cache=True)
+    return _format_search_response(data, compact, fields)
+
+
+def _get_search(term: str, max_results: int) -> Any:
+    # Concurrent identical searches share one request
+    params = _search_params(term, max_results)
+    return read_flight.do(("/api/search", term, max_results), lambda: http_client.get("/api/search", params=params))
+
+
+async def _aget_search(term: str, max_results: int) -> Any:
+    params = _search_params(term, max_results)
+    return await read_flight.ado(("/api/search", term, max_results), lambda: http_client.aget("/api/search", params=params))
+
+
+def _build_payload(
+    section: Optional[str],
+    subsection: Optional[str],
+    coverage: Optional[str],
+    extension: Optional[Dict[str, str]],
+) -> Dict[str, Any]:
+    # Build payload with only provided values
+    payload = {}
+    if section is not None:
+        payload["section"] = section
+    if subsection is not None:
+        payload["subsection"] = subsection
+    if coverage is not None:
+        payload["coverage"] = coverage
+    if extension is not None:
+        payload["extension"] = extension
+    return payload
+
+
+def _write_through(product_name: str, response: Any) -> None:
+    # Keep cached reads consistent with the update the server just applied
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    _write_through_body(product_name, body)
+
+
+def _write_through_body(product_name: str, body: Any) -> None:
+    product = body.get("product") if isinstance(body, dict) else None
+    if isinstance(product, dict) and product.get("name") == product_name:
+        product_config_cache.apply_update(product)
+        observe_products([product])
+    else:
+        product_config_cache.invalidate_product(product_name)
+        forget_product(product_name)
+
+
+def _unchanged_message(product_name: str, requested: Dict[str, Any]) -> str:
+    return f"Product {product_name} already has {requested}; no update was needed and no request was sent."
+
+
+def _recorded_outcome(product_name: str, payload: Dict[str, Any]) -> Tuple[Optional[str], bool]:
+    # Within a job's idempotency scope: the recorded result of an update that
+    # was already applied, and whether one was sent without a recorded answer
+    record = idempotency.lookup(product_name, payload)
+    if record is None:
+        return None, False
+    if record.status == "done":
+        return _update_outcome(product_name, payload, record.result, False, True), False
+    # The server may have applied it; re-read the product so the diff drops fields already set
+    product_config_cache.invalidate_product(product_name)
+    forget_product(product_name)
+    return None, True
+
+
+def _update_outcome(product_name: str, payload: Dict[str, Any], message: str, sent: bool, success: bool) -> str:
+    # Emits the update's progress event and passes the tool result through
+    run_events.emit(UpdatePosted, product_name=product_name, payload=payload, sent=sent, success=success, message=message)
+    return message
+
+
+def _send_update(product_name: str, path: str, merged: Dict[str, Any]) -> SentUpdate:
+    # Runs once per coalesced batch, in the thread of its first caller
+    payload = minimize_update(product_name, merged)
+    if not payload:
+        return SentUpdate(payload, None, None)
+    try:
+        response = http_client.post(path, json=payload)
+        response.raise_for_status()
+        _write_through(product_name, response)
+        return SentUpdate(payload, response.text, None)
+    except requests.exceptions.RequestException as e:
+        # The server may have partially applied the update, so drop cached reads
+        product_config_cache.invalidate_product(product_name)
+        forget_product(product_name)
+        return SentUpdate(payload, None, str(e))
+
+
+async def _asend_update(product_name: str, path: str, merged: Dict[str, Any]) -> SentUpdate:
+    import httpx
+
+    payload = minimize_update(product_name, merged)
+    if not payload:
+        return SentUpdate(payload, None, None)
+    try:
+        response = await http_client.apost(path, json=payload)
+        response.raise_for_status()
+        _write_through(product_name, response)
+        return SentUpdate(payload, response.text, None)
+    except httpx.HTTPError as e:
+        product_config_cache.invalidate_product(product_name)
+        forget_product(product_name)
+        return SentUpdate(payload, None, str(e))
+
+
+def _carried_fields(requested: Dict[str, Any], sent: Dict[str, Any]) -> Dict[str, Any]:
+    # The fields of one caller's update that the (merged) request carried, with the values sent
+    carried = {field: sent[field] for field in requested if field != "extension" and field in sent}
+    codes = {code: value for code, value in (sent.get("extension") or {}).items() if code in (requested.get("extension") or {})}
+    if codes:
+        carried["extension"] = codes
+    return carried
+
+
+def _sent_outcome(product_name: str, requested: Dict[str, Any], sent: SentUpdate) -> str:
+    # Each caller of a coalesced request gets a result for its own update
+    payload = _carried_fields(requested, sent.payload)
+    if not payload:
+        message = _unchanged_message(product_name, requested)
+        idempotency.record_done(product_name, requested, message)
+        return _update_outcome(product_name, payload, message, False, True)
+    if sent.error is not None:
+        return _update_outcome(product_name, payload, f"An error occurred while updating product {product_name}: {sent.error}", True, False)
+    message = f"Successfully updated product {product_name} with {payload}. Response: {sent.response_text}"
+    idempotency.record_done(product_name, requested, message)
+    return _update_outcome(product_name, payload, message, True, True)
+
+
+def search_product_config(
+    product_name: str,
+    compact: bool = False,
+    max_results: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Retrieves the current configuration for a specific product.
+
+    The product named exactly as requested (or as the canonical name it
+    resolves to) is returned alone; otherwise the partial matches are returned, at most
+    max_results of them, flagged "truncated" when there may be more.
+
+    Args:
+        product_name: The name of the product to get configuration for
+        compact: Return minified JSON instead of the indented form
+        max_results: Cap on the products returned, passed to the search API
+            (defaults to PRODUCT_API_SEARCH_MAX_RESULTS; 0 for no cap)
+        fields: Product fields to return besides the name (all when None)
+
+    Returns:
+        JSON string with product configuration data or error message
+    """
+
+    max_results = DEFAULT_SEARCH_MAX_RESULTS if max_results is None else max_results
+    canonical = resolve_product_name(product_name)
+    cached = _cached_search(product_name, canonical, compact, max_results, fields)
+    if cached is not None:
+        return cached
+
+    url = http_client.api_url("/api/search")
+    try:
+        term = _search_term(product_name, canonical)
+        response = _get_search(term, max_results)
+        response.raise_for_status()
+        data = response.json()
+        if _exact_match_cut_off(product_name, canonical, data, max_results):
+            # Look the exact match up by the full name, which matches far fewer products
+            response = _get_search(_full_name(product_name, canonical), 0)
+            response.raise_for_status()
+            data = _exact_lookup(product_name, canonical, data, response.json())
+        if data.get("success", False):
+            observe_products(data.get("products") or [])
+        data = _select_products(product_name, canonical, data, max_results)
+        _cache_search_response(canonical, data)
+        _emit_search_events(product_name, canonical, data, from_cache=False)
+        return _format_search_response(data, compact, fields)
+
+    except requests.exceptions.RequestException as e:
+        return json.dumps({
+            "success": False,
+            "error": f"API request failed: {str(e)}",
+            "endpoint": url,
+        })
+    except json.JSONDecodeError as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Invalid JSON response: {str(e)}",
+            "raw_response": response.text,
+        })
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Unexpected error: {str(e)}"
+        })
+
+
+async def asearch_product_config(
+    product_name: str,
+    compact: bool = False,
+    max_results: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Async version of search_product_config using the non-blocking HTTP client.
+
+    Args:
+        product_name: The name of the product to get configuration for
+        compact: Return minified JSON instead of the indented form
+        max_results: Cap on the products returned, passed to the search API
+            (defaults to PRODUCT_API_SEARCH_MAX_RESULTS; 0 for no cap)
+        fields: Product fields to return besides the name (all when None)
+
+    Returns:
+        JSON string with product configuration data or error message
+    """
+
+    import httpx
+
+    max_results = DEFAULT_SEARCH_MAX_RESULTS if max_results is None else max_results
+    canonical = resolve_product_name(product_name)
+    cached = _cached_search(product_name, canonical, compact, max_results, fields)
+    if cached is not None:
+        return cached
+
+    url = http_client.api_url("/api/search")
+    try:
+        term = _search_term(product_name, canonical)
+        response = await _aget_search(term, max_results)
+        response.raise_for_status()
+        data = response.json()
+        if _exact_match_cut_off(product_name, canonical, data, max_results):
+            # Look the exact match up by the full name, which matches far fewer products
+            response = await _aget_search(_full_name(product_name, canonical), 0)
+            response.raise_for_status()
+            data = _exact_lookup(product_name, canonical, data, response.json())
+        if data.get("success", False):
+            observe_products(data.get("products") or [])
+        data = _select_products(product_name, canonical, data, max_results)
+        _cache_search_response(canonical, data)
+        _emit_search_events(product_name, canonical, data, from_cache=False)
+        return _format_search_response(data, compact, fields)
+
+    except httpx.HTTPError as e:
+        return json.dumps({
+            "success": False,
+            "error": f"API request failed: {str(e)}",
+            "endpoint": url,
+        })
+    except json.JSONDecodeError as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Invalid JSON response: {str(e)}",
+            "raw_response": response.text,
+        })
+    except Exception as e:
+        return json.dumps({
+            "success": False,
+            "error": f"Unexpected error: {str(e)}"
+        })
+
+
+def update_product(
+    product_name: str,
+    section: Optional[str] = None,
+    subsection: Optional[str] = None,
+    coverage: Optional[str] = None,
+    extension: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Updates a product's configuration
+
+    Args:
+        product_name: The name of the product to update
+        section: New section value (optional)
+        subsection: New subsection value (optional)
+        coverage: New coverage value (optional)
+        extension: Extension codes dict like {"code1": "E999", "code2": "NEW2"} (optional)
+
+    Returns:
+        Success message with API response or error message
+    """
+
+    # Map case or spacing variants to the canonical catalog name; any other name is
+    # sent as given, so a near miss gets a 404 instead of updating another product
+    product_name = canonical_product_name(product_name) or product_name
+
+    # URL encode the product name to handle spaces and special characters
+    encoded_name = quote(product_name)
+    path = f"/api/products/name/{encoded_name}"
+
+    payload = _build_payload(section, subsection, coverage, extension)
+
+    if not payload:
+        return _update_outcome(product_name, payload, f"No updates specified for product {product_name}", False, False)
+
+    # Reject values outside the product's allowed lists without a round trip
+    rejection = validate_update(product_name, payload)
+    if rejection is not None:
+        return _update_outcome(product_name, payload, rejection, False, False)
+
+    # Never send an update twice within one job (idempotency key scope)
+    recorded, in_doubt = _recorded_outcome(product_name, payload)
+    if recorded is not None:
+        return recorded
+    if in_doubt:
+        search_product_config(product_name)
+
+    # Updates to this product queued behind each other go out as one request,
+    # carrying only the fields that differ from the known current configuration
+    idempotency.record_sent(product_name, payload)
+    sent = update_coalescer.submit(product_name, payload, lambda merged: _send_update(product_name, path, merged))
+    return _sent_outcome(product_name, payload, sent)
+
+
+async def aupdate_product(
+    product_name: str,
+    section: Optional[str] = None,
+    subsection: Optional[str] = None,
+    coverage: Optional[str] = None,
+    extension: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Async version of update_product using the non-blocking HTTP client.
+
+    Args:
+        product_name: The name of the product to update
+        section: New section value (optional)
+        subsection: New subsection value (optional)
+        coverage: New coverage value (optional)
+        extension: Extension codes dict like {"code1": "E999", "code2": "NEW2"} (optional)
+
+    Returns:
+        Success message with API response or error message
+    """
+
+    product_name = canonical_product_name(product_name) or product_name
+    path = f"/api/products/name/{quote(product_name)}"
+    payload = _build_payload(section, subsection, coverage, extension)
+
+    if not payload:
+        return _update_outcome(product_name, payload, f"No updates specified for product {product_name}", False, False)
+
+    rejection = await avalidate_update(product_name, payload)
+    if rejection is not None:
+        return _update_outcome(product_name, payload, rejection, False, False)
+
+    recorded, in_doubt = _recorded_outcome(product_name, payload)
+    if recorded is not None:
+        return recorded
+    if in_doubt:
+        await asearch_product_config(product_name)
+
+    idempotency.record_sent(product_name, payload)
+    sent = await update_coalescer.asubmit(product_name, payload, lambda merged: _asend_update(product_name, path, merged))
+    return _sent_outcome(product_name, payload, sent)
+
+
+# Bulk updates
+
+_bulk_endpoint_support: Dict[str, bool] = {}
+
+
+def _normalize_update(update: ProductUpdate) -> Dict[str, Any]:
+    if isinstance(update, Mapping):
+        fields = {field: update.get(field) for field in UPDATE_FIELDS}
+        fields["product_name"] = fields["product_name"] or update.get("name")
+    else:
+        values = list(update)
+        if not 1 <= len(values) <= len(UPDATE_FIELDS):
+            raise ValueError(f"Expected (product_name, section, subsection, coverage, extension), got {update!r}")
+        fields = dict(zip(UPDATE_FIELDS, values + [None] * (len(UPDATE_FIELDS) - len(values))))
+    if not fields["product_name"]:
+        raise ValueError(f"Update has no product_name: {update!r}")
+    return fields
+
+
+def _requested_updates(updates: Iterable[ProductUpdate]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    # Returns the canonical product names and the requested payloads
+    names, requested = [], []
+    for update in updates:
+        fields = _normalize_update(update)
+        product_name = fields.pop("product_name")
+        names.append(canonical_product_name(product_name) or product_name)
+        requested.append(_build_payload(**fields))
+    return names, requested
+
+
+def _rejections(names: List[str], requested: List[Dict[str, Any]], schemas: Dict[str, Any]) -> List[Optional[str]]:
+    # Local validation result per update; None means it may be sent
+    return [
+        allowed_values_cache.check(schemas.get(name), name, payload) if payload else None
+        for name, payload in zip(names, requested)
+    ]
+
+
+def _prepare_updates(
+    names: List[str],
+    requested: List[Dict[str, Any]],
+    rejections: List[Optional[str]],
+) -> List[Tuple[str, Dict[str, Any]]]:
+    # Returns (product_name, payload to send) pairs; rejected updates send nothing
+
+    # A product updated more than once in the batch is sent in full: later
+    # items must not be diffed against the state before the earlier ones
+    repeated = {name for name in names if names.count(name) > 1}
+    prepared = []
+    for name, payload, rejection in zip(names, requested, rejections):
+        if payload and rejection is None:
+            payload = minimize_update(name, payload, enabled=False if name in repeated else None)
+        elif rejection is not None:
+            payload = {}
+        prepared.append((name, payload))
+    return prepared
+
+
+def _validated_names(names: List[str], requested: List[Dict[str, Any]]) -> List[str]:
+    # Products whose allowed values are needed: those with a non-empty update
+    return list(dict.fromkeys(name for name, payload in zip(names, requested) if payload))
+
+
+def _item_result(
+    index: int,
+    product_name: str,
+    payload: Dict[str, Any],
+    status: Optional[int] = None,
+    body: Any = None,
+    error: Optional[str] = None,
+    started: Optional[float] = None,
+    skipped: bool = False,
+) -> Dict[str, Any]:
+    if error is None and status is not None:
+        if 200 <= status < 300 and not (isinstance(body, dict) and body.get("success") is False):
+            _write_through_body(product_name, body)
+        else:
+            error = (body.get("error") if isinstance(body, dict) else None) or f"HTTP {status}"
+    if error is not None and status != 404 and payload:
+        # The server may have partially applied the update, so drop cached reads
+        product_config_cache.invalidate_product(product_name)
+        forget_product(product_name)
+    changes = body.get("changes") if isinstance(body, dict) and error is None else None
+    return {
+        "index": index,
+        "product_name": product_name,
+        "payload": payload,
+        "success": error is None,
+        "skipped": skipped,
+        "status": status,
+        "error": error,
+        "changes": changes,
+        "latency_ms": (time.perf_counter() - started) * 1000 if started is not None else 0.0,
+    }
+
+
+def _response_body(response: Any) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return None
+
+
+def _unsent_results(
+    prepared: List[Tuple[str, Dict[str, Any]]],
+    requested: List[Dict[str, Any]],
+    rejections: List[Optional[str]],
+) -> List[Optional[Dict[str, Any]]]:
+    # Results for updates that need no request: nothing requested, invalid, or nothing changed
+    results: List[Optional[Dict[str, Any]]] = [None] * len(prepared)
+    for index, (product_name, payload) in enumerate(prepared):
+        if not requested[index]:
+            results[index] = _item_result(index, product_name, payload, error="No updates specified")
+        elif rejections[index] is not None:
+            # Empty payload: nothing was sent, so cached reads stay valid
+            results[index] = _item_result(index, product_name, payload, error=rejections[index])
+        elif not payload:
+            results[index] = _item_result(index, product_name, requested[index], skipped=True)
+    return results
+
+
+def _product_groups(prepared: List[Tuple[str, Dict[str, Any]]], indexes: List[int]) -> List[List[int]]:
+    # Updates to the same product stay in request order; different products run concurrently
+    groups: Dict[str, List[int]] = {}
+    for index in indexes:
+        groups.setdefault(prepared[index][0], []).append(index)
+    return list(groups.values())
+
+
+def _bulk_body(prepared: List[Tuple[str, Dict[str, Any]]], indexes: List[int]) -> Dict[str, Any]:
+    return {"updates": [{"name": prepared[i][0], **prepared[i][1]} for i in indexes]}
+
+
+def _bulk_results(
+    prepared: List[Tuple[str, Dict[str, Any]]],
+    indexes: List[int],
+    status: int,
+    body: Any,
+    started: float,
+) -> List[Dict[str, Any]]:
+    items = body.get("results") if isinstance(body, dict) else None
+    if not isinstance(items, list) or len(items) != len(indexes):
+        error = f"Invalid bulk update response (HTTP {status})"
+        return [_item_result(i, *prepared[i], error=error, started=started) for i in indexes]
+    return [
+        _item_result(i, *prepared[i], status=item.get("status"), body=item.get("body"), started=started)
+        for i, item in zip(indexes, items)
+    ]
+
+
+def _emit_bulk_events(results: List[Dict[str, Any]]) -> None:
+    # One UpdatePosted per item, like the single-product updater
+    if not run_events.capturing():
+        return
+    for result in results:
+        if result["success"]:
+            message = "unchanged, no request sent" if result["skipped"] else f"applied: {_describe_changes(result['changes'])}"
+        else:
+            message = result["error"]
+        run_events.emit(
+            UpdatePosted,
+            product_name=result["product_name"],
+            payload=result["payload"],
+            sent=bool(result["payload"]) and not result["skipped"],
+            success=result["success"],
+            message=message,
+        )
+
+
+def _use_bulk_endpoint(bulk_endpoint: Optional[bool]) -> bool:
+    if bulk_endpoint is not None:
+        return bulk_endpoint
+    return _bulk_endpoint_support.get(http_client.get_settings()["base_url"], True)
+
+
+def _record_bulk_support(status: int) -> bool:
+    # 404/405 mean the server has no bulk endpoint; remember it for this base URL
+    supported = status not in (404, 405)
+    _bulk_endpoint_support[http_client.get_settings()["base_url"]] = supported
+    return supported
+
+
+def bulk_update_products(
+    updates: Iterable[ProductUpdate],
+    window: Optional[int] = None,
+    bulk_endpoint: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Applies many product updates, concurrently or through the bulk endpoint
+
+    When the server offers POST /api/products/bulk, all updates are sent in
+    one request. Otherwise (or with bulk_endpoint=False) one POST per update
+    is sent, with at most `window` requests in flight; updates to the same
+    product are applied in the order given. Endpoint support is detected on
+    first use and remembered per base URL. Updates with values outside the
+    product's allowed lists are rejected locally and never sent.
+
+    Args:
+        updates: (product_name, section, subsection, coverage, extension)
+            tuples or dicts with those keys; None leaves a field unchanged
+        window: Maximum concurrent update requests (default PRODUCT_API_BULK_WINDOW)
+        bulk_endpoint: True to require the bulk endpoint, False to never use
+            it, None to detect it
+
+    Returns:
+        One result per update, in input order, with index, product_name,
+        payload (as sent), success, skipped, status, error, changes and latency_ms
+    """
+
+    names, requested = _requested_updates(updates)
+    started = time.perf_counter()
+    schemas = {name: allowed_values_cache.schema(name) for name in _validated_names(names, requested)}
+    rejections = _rejections(names, requested, schemas)
+    prepared = _prepare_updates(names, requested, rejections)
+    results = _unsent_results(prepared, requested, rejections)
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending and _use_bulk_endpoint(bulk_endpoint):
+        try:
+            response = http_client.post(BULK_UPDATE_PATH, json=_bulk_body(prepared, pending))
+            if _record_bulk_support(response.status_code) or bulk_endpoint:
+                for result in _bulk_results(prepared, pending, response.status_code, _response_body(response), started):
+                    results[result["index"]] = result
+                pending = []
+        except requests.exceptions.RequestException as e:
+            for i in pending:
+                results[i] = _item_result(i, *prepared[i], error=f"API request failed: {e}", started=started)
+            pending = []
+
+    def run_group(indexes: List[int]) -> None:
+        for i in indexes:
+            product_name, payload = prepared[i]
+            item_started = time.perf_counter()
+            try:
+                response = http_client.post(f"/api/products/name/{quote(product_name)}", json=payload)
+                results[i] = _item_result(
+                    i, product_name, payload, response.status_code, _response_body(response), started=item_started
+                )
+            except requests.exceptions.RequestException as e:
+                results[i] = _item_result(i, product_name, payload, error=f"API request failed: {e}", started=item_started)
+
+    groups = _product_groups(prepared, pending)
+    if groups:
+        with ThreadPoolExecutor(max_workers=max(1, min(window or DEFAULT_BULK_WINDOW, len(groups)))) as executor:
+            list(executor.map(run_group, groups))
+
+    _emit_bulk_events(results)
+    return results
+
+
+async def abulk_update_products(
+    updates: Iterable[ProductUpdate],
+    window: Optional[int] = None,
+    bulk_endpoint: Optional[bool] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Async version of bulk_update_products using the non-blocking HTTP client.
+
+    Args:
+        updates: (product_name, section, subsection, coverage, extension)
+            tuples or dicts with those keys; None leaves a field unchanged
+        window: Maximum concurrent update requests (default PRODUCT_API_BULK_WINDOW)
+        bulk_endpoint: True to require the bulk endpoint, False to never use
+            it, None to detect it
+
+    Returns:
+        One result per update, in input order
+    """
+
+    import httpx
+
+    names, requested = _requested_updates(updates)
+    started = time.perf_counter()
+    validated = _validated_names(names, requested)
+    schemas = dict(zip(validated, await asyncio.gather(*(allowed_values_cache.aschema(name) for name in validated))))
+    rejections = _rejections(names, requested, schemas)
+    prepared = _prepare_updates(names, requested, rejections)
+    results = _unsent_results(prepared, requested, rejections)
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    if pending and _use_bulk_endpoint(bulk_endpoint):
+        try:
+            response = await http_client.apost(BULK_UPDATE_PATH, json=_bulk_body(prepared, pending))
+            if _record_bulk_support(response.status_code) or bulk_endpoint:
+                for result in _bulk_results(prepared, pending, response.status_code, _response_body(response), started):
+                    results[result["index"]] = result
+                pending = []
+        except httpx.HTTPError as e:
+            for i in pending:
+                results[i] = _item_result(i, *prepared[i], error=f"API request failed: {e}", started=started)
+            pending = []
+
+    semaphore = asyncio.Semaphore(window or DEFAULT_BULK_WINDOW)
+
+    async def run_group(indexes: List[int]) -> None:
+        async with semaphore:
+            for i in indexes:
+                product_name, payload = prepared[i]
+                item_started = time.perf_counter()
+                try:
+                    response = await http_client.apost(f"/api/products/name/{quote(product_name)}", json=payload)
+                    results[i] = _item_result(
+                        i, product_name, payload, response.status_code, _response_body(response), started=item_started
+                    )
+                except httpx.HTTPError as e:
+                    results[i] = _item_result(i, product_name, payload, error=f"API request failed: {e}", started=item_started)
+
+    groups = _product_groups(prepared, pending)
+    await asyncio.gather(*(run_group(group) for group in groups))
+
+    _emit_bulk_events(results)
+    return results
+
+
+def _describe_changes(changes: Any) -> str:
+    if not isinstance(changes, dict):
+        return ""
+    described = []
+    for field in ("section", "subsection", "coverage"):
+        change = changes.get(field)
+        if change:
+            described.append(f"{field} {change['from']}->{change['to']}")
+    for code, change in (changes.get("extension") or {}).items():
+        if change:
+            described.append(f"{code} {change['from']}->{change['to']}")
+    return ", ".join(described) or "no changes"
+
+
+def format_bulk_results(results: List[Dict[str, Any]]) -> str:
+    """
+    Formats bulk update results as a plain-text table with a summary line
+
+    Args:
+        results: Output of bulk_update_products
+
+    Returns:
+        Table with one row per update (index, product, status, outcome)
+    """
+
+    rows = [("#", "product", "status", "result")]
+    for result in results:
+        if result["skipped"]:
+            outcome = "unchanged, no request sent"
+        elif result["success"]:
+            outcome = _describe_changes(result["changes"])
+        else:
+            outcome = f"ERROR: {result['error']}"
+        rows.append((str(result["index"]), result["product_name"], str(result["status"] or "-"), outcome))
+
+    widths = [max(len(row[column]) for row in rows) for column in range(3)]
+    lines = [" | ".join(value.ljust(width) for value, width in zip(row[:3], widths)) + " | " + row[3] for row in rows]
+    lines.insert(1, "-+-".join("-" * width for width in widths) + "-+-" + "-" * 6)
+
+    succeeded = sum(result["success"] for result in results)
+    lines.append(f"{succeeded}/{len(results)} updates applied")
+    return "\n".join(lines)
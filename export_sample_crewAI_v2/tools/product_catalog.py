@@ -0,0 +1,51 @@
+"""
+Product Catalog - Loads the canonical product name list used by the tools and parsers
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# Same file the analyzer agent's FileReadTool reads
+DEFAULT_PRODUCTS_FILE = "./products.txt"
+
+# Bundled sample list used when no products.txt is present in the working directory
+SAMPLE_PRODUCTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "configs", "sample_products.txt")
+
+
+def resolve_products_file(path: Optional[str] = None) -> str:
+    """
+    Returns the product list path to use
+
+    Order: explicit path, PRODUCTS_FILE environment variable, ./products.txt,
+    then the bundled configs/sample_products.txt.
+    """
+
+    if path:
+        return path
+    env_path = os.environ.get("PRODUCTS_FILE")
+    if env_path:
+        return env_path
+    if os.path.exists(DEFAULT_PRODUCTS_FILE):
+        return DEFAULT_PRODUCTS_FILE
+    return SAMPLE_PRODUCTS_FILE
+
+
+@lru_cache(maxsize=8)
+def _load(path: str) -> Tuple[str, ...]:
+    with open(path, "r", encoding="utf-8") as f:
+        return tuple(line.strip() for line in f if line.strip())
+
+
+def load_product_names(path: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Loads canonical product names, one per line, cached per path
+
+    Args:
+        path: Optional product list path (see resolve_products_file)
+
+    Returns:
+        Tuple of product names in file order
+    """
+    return _load(resolve_products_file(path))
@@ -0,0 +1,223 @@
+"""
+Product Name Index - In-memory character trigram index for fuzzy product name resolution
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from tools.product_catalog import load_product_names, resolve_products_file
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _trigram_codes(text: str) -> np.ndarray:
+    # Pad with spaces so word boundaries produce their own trigrams
+    data = np.frombuffer(f" {text} ".encode("utf-8"), dtype=np.uint8).astype(np.int64)
+    if len(data) < 3:
+        return np.empty(0, dtype=np.int64)
+    return np.unique((data[:-2] << 16) | (data[1:-1] << 8) | data[2:])
+
+
+class ProductNameIndex:
+    """
+    Vectorized character trigram matcher over canonical product names.
+
+    Names are lower-cased and whitespace-normalized, split into byte
+    trigrams and stored as a CSR inverted index (sorted trigram codes,
+    offsets, posting lists of product ids) in NumPy arrays. A lookup:
+
+    1. Ranks an exact (normalized) match first with score 1.0.
+    2. Collects candidates from the query's rarest trigrams only, so very
+       common trigrams never blow up the candidate set.
+    3. Keeps the best candidates and completes their trigram overlap with
+       binary searches into the remaining posting lists.
+    4. Ranks by Dice similarity: 2 * shared / (query trigrams + name trigrams).
+    """
+
+    def __init__(self, names: Iterable[str], probe_budget: int = 4096, max_candidates: int = 256):
+        """
+        Build the index
+
+        Args:
+            names: Canonical product names
+            probe_budget: Maximum posting entries read to generate candidates
+            max_candidates: Candidates kept for exact overlap scoring
+        """
+
+        self.names: List[str] = list(names)
+        self.probe_budget = probe_budget
+        self.max_candidates = max_candidates
+        normalized = [_normalize(name) for name in self.names]
+        self._exact: Dict[str, int] = {}
+        for product_id, name in enumerate(normalized):
+            self._exact.setdefault(name, product_id)
+
+        count = len(self.names)
+        encoded = [f" {name} ".encode("utf-8") for name in normalized]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=count)
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.int64)
+
+        if count == 0 or len(data) < 3:
+            self._grams = np.empty(0, dtype=np.int64)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._postings = np.empty(0, dtype=np.int32)
+            self._sizes = np.zeros(count, dtype=np.int32)
+            return
+
+        # Trigram code at every byte position, keeping only positions inside one name
+        codes = (data[:-2] << 16) | (data[1:-1] << 8) | data[2:]
+        ends = np.cumsum(lengths)
+        owners = np.repeat(np.arange(count, dtype=np.int64), lengths)[:-2]
+        inside = np.arange(len(codes), dtype=np.int64) + 2 < ends[owners]
+
+        # Sort by (trigram, product) and drop duplicate trigrams within a name
+        keys = np.sort(codes[inside] * count + owners[inside])
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        grams = keys // count
+        self._postings = (keys % count).astype(np.int32)
+
+        boundaries = np.flatnonzero(np.diff(grams)) + 1
+        starts = np.concatenate(([0], boundaries))
+        self._grams = grams[starts]
+        self._offsets = np.append(starts, len(grams)).astype(np.int64)
+        self._sizes = np.bincount(self._postings, minlength=count).astype(np.int32)
+
+    @classmethod
+    def from_file(cls, path: Optional[str] = None, **kwargs) -> "ProductNameIndex":
+        """Builds an index from a product list file (see tools.product_catalog)"""
+        return cls(load_product_names(path), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def lookup(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Find the canonical names closest to a query
+
+        Args:
+            query: Product name as written by the user or agent
+            k: Number of results to return
+
+        Returns:
+            Up to k (canonical_name, score) pairs, best first, scores in [0, 1]
+        """
+
+        normalized = _normalize(query)
+        exact_id = self._exact.get(normalized)
+        if exact_id is not None and k == 1:
+            return [(self.names[exact_id], 1.0)]
+
+        query_grams = _trigram_codes(normalized)
+        positions = np.searchsorted(self._grams, query_grams)
+        found = positions < len(self._grams)
+        found[found] = self._grams[positions[found]] == query_grams[found]
+        positions = positions[found]
+        if len(positions) == 0:
+            return [(self.names[exact_id], 1.0)] if exact_id is not None else []
+
+        starts, ends = self._offsets[positions], self._offsets[positions + 1]
+        order = np.argsort(ends - starts, kind="stable")
+
+        # Generate candidates from the rarest trigrams within the probe budget
+        budget = np.cumsum((ends - starts)[order])
+        probe_count = max(1, int(np.searchsorted(budget, self.probe_budget, side="right")))
+        probed, rest = order[:probe_count], order[probe_count:]
+        candidates, shared = np.unique(
+            np.concatenate([self._postings[starts[i]:ends[i]] for i in probed]),
+            return_counts=True,
+        )
+        if len(candidates) > self.max_candidates:
+            keep = np.argpartition(-shared, self.max_candidates - 1)[:self.max_candidates]
+            candidates, shared = candidates[keep], shared[keep]
+
+        # Complete the overlap count for the kept candidates
+        for i in rest:
+            posting = self._postings[starts[i]:ends[i]]
+            hit = np.searchsorted(posting, candidates)
+            hit[hit == len(posting)] = 0
+            shared = shared + (posting[hit] == candidates)
+
+        scores = 2.0 * shared / (len(query_grams) + self._sizes[candidates])
+        top = min(k, len(candidates))
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        results = [(self.names[candidates[i]], float(scores[i])) for i in best]
+        if exact_id is not None:
+            results = [(self.names[exact_id], 1.0)] + [r for r in results if r[0] != self.names[exact_id]]
+        return results[:k]
+
+    def resolve(self, query: str, min_score: float = 0.6) -> Optional[str]:
+        """
+        Resolve a query to a single canonical product name
+
+        Args:
+            query: Product name as written by the user or agent
+            min_score: Minimum similarity for a fuzzy match
+
+        Returns:
+            Canonical product name, or None when nothing is close enough
+        """
+
+        matches = self.lookup(query, k=1)
+        if matches and matches[0][1] >= min_score:
+            return matches[0][0]
+        return None
+
+    def canonical(self, query: str) -> Optional[str]:
+        """
+        Canonical name of the product the query names exactly, ignoring case and spacing
+
+        Returns:
+            Canonical product name, or None when no name is an exact match
+        """
+
+        product_id = self._exact.get(_normalize(query))
+        return self.names[product_id] if product_id is not None else None
+
+
+_indexes: Dict[str, ProductNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_product_index(path: Optional[str] = None) -> ProductNameIndex:
+    """
+    Returns the shared index for a product list, building it once per process
+
+    Args:
+        path: Optional product list path (see tools.product_catalog)
+    """
+
+    resolved = resolve_products_file(path)
+    index = _indexes.get(resolved)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(resolved)
+            if index is None:
+                index = ProductNameIndex.from_file(resolved)
+                _indexes[resolved] = index
+    return index
+
+
+def resolve_product_name(product_name: str, min_score: float = 0.6) -> Optional[str]:
+    """
+    Resolve a product name against the shared index
+
+    Returns:
+        Canonical product name, or None if the catalog has no close match
+    """
+    return get_product_index().resolve(product_name, min_score=min_score)
+
+
+def canonical_product_name(product_name: str) -> Optional[str]:
+    """
+    Canonical form of a product name that differs only in case or spacing
+
+    Returns:
+        Canonical product name, or None if no catalog name matches exactly
+    """
+    return get_product_index().canonical(product_name)
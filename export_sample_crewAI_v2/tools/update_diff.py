@@ -0,0 +1,169 @@
+"""
+Update Diff - Minimal update payloads computed against the product configuration fetched in the same run
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+
+# Send only changed fields (set PRODUCT_API_MINIMAL_DIFF=false to always send the full payload)
+MINIMAL_DIFF = os.environ.get("PRODUCT_API_MINIMAL_DIFF", "true").lower() not in ("0", "false", "no")
+
+
+# Product configurations the API returned in the current run, by name. Context
+# variables follow a run into the crew's kickoff thread and asyncio.to_thread
+# workers, which share this dict with the run
+_observed: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar("update_diff_observed", default=None)
+
+
+@contextmanager
+def run_scope() -> Iterator[None]:
+    """
+    Diffs the updates made in this context against the configurations fetched from the API in it
+
+    Outside a scope, and for products not fetched in it, updates are sent in
+    full: a cached configuration may predate another writer's change (another
+    service worker or batch, or a manual edit).
+    """
+
+    token = _observed.set({})
+    try:
+        yield
+    finally:
+        _observed.reset(token)
+
+
+def observe_products(products: Iterable[Dict[str, Any]]) -> None:
+    """Records product configurations just returned by the API (search or update responses)"""
+
+    observed = _observed.get()
+    if observed is None:
+        return
+    for product in products:
+        if isinstance(product, dict) and product.get("name"):
+            observed[product["name"]] = json.loads(json.dumps(product))
+
+
+def forget_product(product_name: str) -> None:
+    """Drops a product whose server state is unknown, e.g. after a failed update"""
+
+    observed = _observed.get()
+    if observed is not None:
+        observed.pop(product_name, None)
+
+
+def _body_bytes(payload: Dict[str, Any]) -> int:
+    # Same encoding requests/httpx use for json= bodies
+    return len(json.dumps(payload).encode("utf-8")) if payload else 0
+
+
+def _field_count(payload: Dict[str, Any]) -> int:
+    count = len([field for field in payload if field != "extension"])
+    return count + len(payload.get("extension") or {})
+
+
+def diff_payload(current: Dict[str, Any], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drops the fields of an update payload that already match the current product
+
+    Args:
+        current: Current product configuration (name, section, subsection, coverage, extension)
+        payload: Requested update payload
+
+    Returns:
+        Payload with only the changed fields; extension keeps only the changed codes.
+        An empty dict means the update changes nothing.
+    """
+
+    diff = {}
+    for field, value in payload.items():
+        if field == "extension":
+            current_codes = current.get("extension") or {}
+            codes = {code: v for code, v in (value or {}).items() if current_codes.get(code) != v}
+            if codes:
+                diff["extension"] = codes
+        elif current.get(field) != value:
+            diff[field] = value
+    return diff
+
+
+class UpdateDiffStats:
+    """
+    Thread-safe counters for what minimal diffing removed from update requests
+
+    Bytes are JSON request body bytes; a skipped request also saves its
+    headers and the response, which are not counted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.updates = 0
+            self.unknown_current = 0
+            self.requests_skipped = 0
+            self.fields_requested = 0
+            self.fields_sent = 0
+            self.bytes_requested = 0
+            self.bytes_sent = 0
+
+    def record(self, requested: Dict[str, Any], sent: Dict[str, Any], known: bool) -> None:
+        with self._lock:
+            self.updates += 1
+            if not known:
+                self.unknown_current += 1
+            if not sent:
+                self.requests_skipped += 1
+            self.fields_requested += _field_count(requested)
+            self.fields_sent += _field_count(sent)
+            self.bytes_requested += _body_bytes(requested)
+            self.bytes_sent += _body_bytes(sent)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "updates": self.updates,
+                "unknown_current": self.unknown_current,
+                "requests_sent": self.updates - self.requests_skipped,
+                "requests_skipped": self.requests_skipped,
+                "fields_requested": self.fields_requested,
+                "fields_sent": self.fields_sent,
+                "bytes_requested": self.bytes_requested,
+                "bytes_sent": self.bytes_sent,
+                "bytes_saved": self.bytes_requested - self.bytes_sent,
+            }
+
+
+update_diff_stats = UpdateDiffStats()
+
+
+def minimize_update(product_name: str, payload: Dict[str, Any], enabled: Optional[bool] = None) -> Dict[str, Any]:
+    """
+    Reduces an update payload to the fields that differ from the current configuration
+
+    The current configuration is the one the API returned in this run (see
+    run_scope): the Get Product Configuration tool's search, or the response
+    to an earlier update. The product config cache is not used, because only
+    this process's writes keep it current. When the product was not fetched
+    in this run (or diffing is disabled) the payload is returned unchanged.
+
+    Args:
+        product_name: Canonical product name
+        payload: Non-empty requested update payload
+        enabled: Override MINIMAL_DIFF
+
+    Returns:
+        Payload to send; empty when the product already has every requested value
+    """
+
+    observed = _observed.get() if (MINIMAL_DIFF if enabled is None else enabled) else None
+    current = observed.get(product_name) if observed is not None else None
+    sent = diff_payload(current, payload) if current is not None else payload
+    update_diff_stats.record(payload, sent, current is not None)
+    return sent
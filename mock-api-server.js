@@ -299,6 +299,24 @@ app.post('/api/products/:id', (req, res) => {
   });
 });
 
+// Allowed values for each field of a product, for client-side validation
+// (allowed is null for products without a CONFIG entry: nothing is validated)
+app.get('/api/products/name/:name/schema', (req, res) => {
+  const productName = decodeURIComponent(req.params.name);
+  const productConfig = CONFIG[productName];
+  
+  res.json({
+    success: true,
+    name: productName,
+    allowed: productConfig ? {
+      section: productConfig.sections,
+      subsection: productConfig.subsection,
+      coverage: productConfig.coverages,
+      extension: productConfig.extensions
+    } : null
+  });
+});
+
 // POST endpoint to update product properties by name
 app.post('/api/products/name/:name', (req, res) => {
   const productName = decodeURIComponent(req.params.name);
@@ -400,6 +418,7 @@ app.listen(PORT, () => {
   console.log('    - Parameters: q (required), max_results (optional)');
   console.log('    - Returns: success + clean product objects (no IDs)');
   console.log('  POST /api/products/:id - Update product properties with validation');
+  console.log('  GET /api/products/name/:name/schema - Allowed section/subsection/coverage/extension values');
   console.log('  POST /api/products/name/:name - Update product properties by name');
   console.log('    - Update: section, subsection, coverage');
   console.log('    - Validates against product-specific CONFIG values');